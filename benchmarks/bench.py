@@ -0,0 +1,386 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(HERE), "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, HERE)
+
+from synth import SIZES, generate  # noqa: E402
+
+# Every benchmark runs in a fresh child process so in-process caches start
+# cold and peak RSS belongs to that benchmark alone. A child prints one JSON
+# object: {"metrics": {...}, "info": {...}}. Metrics are "lower is better"
+# and are compared against the baseline; info is recorded only.
+
+# Smallest change worth reporting, by metric unit suffix
+NOISE_FLOOR = {"_ms": 2.0, "_s": 0.01, "_mb": 5.0}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def peak_rss():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2**20
+    return round(own, 1), round(children, 1)
+
+
+def bench_discovery(manifest, root, tmp):
+    from discovery import RepoDiscovery
+    first = []
+
+    def on_repo(path):
+        if not first:
+            first.append(time.perf_counter())
+
+    started = time.perf_counter()
+    discovery = RepoDiscovery([root], on_repo=on_repo)
+    repos = discovery.run()
+    total = time.perf_counter() - started
+    return {"metrics": {"total_s": total, "first_repo_s": (first[0] if first else time.perf_counter()) - started},
+            "info": {"repos": len(repos), "dirs": discovery.scanned}}
+
+
+def bench_discovery_indexed(manifest, root, tmp):
+    from discovery import RepoDiscovery
+    from repo_index import DiscoveryIndex
+    path = os.path.join(tmp, "index.json")
+    RepoDiscovery([root], index=DiscoveryIndex(path)).run()
+    started = time.perf_counter()
+    index = DiscoveryIndex(path)
+    repos = RepoDiscovery([root], index=index).run()
+    return {"metrics": {"total_s": time.perf_counter() - started},
+            "info": {"repos": len(repos), "reused_dirs": index.reused}}
+
+
+def _status_pass(repos, clean_cache=None):
+    from status import repo_status
+    from scheduler import StatusScheduler
+    latencies = []
+
+    def worker(repo):
+        started = time.perf_counter()
+        status = repo_status(repo, clean_cache=clean_cache)
+        latencies.append((time.perf_counter() - started) * 1000)
+        return status
+
+    started = time.perf_counter()
+    scheduler = StatusScheduler(worker)
+    for repo in repos:
+        scheduler.submit(repo)
+    scheduler.join()
+    total = time.perf_counter() - started
+    scheduler.shutdown()
+    return total, latencies
+
+
+def _status_metrics(total, latencies):
+    return {"total_s": total, "p50_ms": percentile(latencies, 50),
+            "p90_ms": percentile(latencies, 90), "p99_ms": percentile(latencies, 99),
+            "max_ms": max(latencies, default=0.0)}
+
+
+def bench_status(manifest, root, tmp):
+    total, latencies = _status_pass(manifest["repos"])
+    return {"metrics": _status_metrics(total, latencies), "info": {"repos": len(latencies)}}
+
+
+def bench_status_fastpath(manifest, root, tmp):
+    from fastpath import CleanCache
+    cache = CleanCache(os.path.join(tmp, "clean.json"))
+    _status_pass(manifest["repos"], cache)
+    # Let directory mtimes fall behind the snapshots' clock margin
+    time.sleep(1.2)
+    cache.hits = cache.misses = 0
+    total, latencies = _status_pass(manifest["repos"], cache)
+    return {"metrics": _status_metrics(total, latencies),
+            "info": {"repos": len(latencies), "hits": cache.hits, "misses": cache.misses}}
+
+
+def bench_sidebar(manifest, root, tmp, rows=5000, batch=200):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QListView
+    from status import RepoStatus
+    from search import SearchIndex
+    from registry import RepoRegistry
+    import gui
+    app = QApplication.instance() or QApplication([])
+    registry = RepoRegistry()
+    model = gui.RepoListModel(registry)
+    proxy = gui.RepoFilterProxy()
+    proxy.setSourceModel(model)
+    proxy.sort(0)
+    view = QListView()
+    view.setModel(proxy)
+    view.setUniformItemSizes(True)
+    view.resize(300, 800)
+    view.show()
+    app.processEvents()
+    statuses = [RepoStatus(f"/synthetic/dir{n % 97}/repo{n}") for n in range(rows)]
+    add_times = []
+    for start in range(0, rows, batch):
+        started = time.perf_counter()
+        model.add_many([registry.add(status) for status in statuses[start:start + batch]])
+        app.processEvents()
+        add_times.append((time.perf_counter() - started) * 1000)
+    update_times = []
+    for start in range(0, rows, batch):
+        fresh = []
+        for status in statuses[start:start + batch]:
+            new = RepoStatus(status.path)
+            new.files = [(".M", "file.txt")]
+            fresh.append(new)
+        started = time.perf_counter()
+        model.update_many([registry.update(status) for status in fresh])
+        app.processEvents()
+        update_times.append((time.perf_counter() - started) * 1000)
+    started = time.perf_counter()
+    proxy.set_filter_text("repo12")
+    app.processEvents()
+    filter_ms = (time.perf_counter() - started) * 1000
+    proxy.set_filter_text("")
+    index = SearchIndex()
+    for status in statuses:
+        index.update(status.path)
+    started = time.perf_counter()
+    ranks = {model.row(registry.get(path).id): rank
+             for rank, (path, _) in enumerate(index.search("rpo12", limit=500))}
+    proxy.set_ranking(ranks)
+    app.processEvents()
+    search_ms = (time.perf_counter() - started) * 1000
+    view.close()
+    return {"metrics": {"add_batch_p50_ms": percentile(add_times, 50), "add_batch_max_ms": max(add_times),
+                        "update_batch_p50_ms": percentile(update_times, 50),
+                        "update_batch_max_ms": max(update_times), "filter_ms": filter_ms,
+                        "search_ms": search_ms},
+            "info": {"rows": rows, "batch": batch}}
+
+
+def bench_changed_files(manifest, root, tmp, rows=50000):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication, QTableView
+    import gui
+    app = QApplication.instance() or QApplication([])
+    model = gui.ChangedFilesModel()
+    view = QTableView()
+    view.setModel(model)
+    view.verticalHeader().setDefaultSectionSize(26)
+    view.resize(800, 600)
+    view.show()
+    app.processEvents()
+    files = [("??" if n % 5 else ".M", f"build/d{n // 500}/out{n}.o") for n in range(rows)]
+    started = time.perf_counter()
+    model.set_files(files)
+    app.processEvents()
+    load_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    model.sort(1, Qt.DescendingOrder)
+    app.processEvents()
+    sort_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    model.set_filter(gui.FILE_FILTERS[2][1], "d7")
+    app.processEvents()
+    filter_ms = (time.perf_counter() - started) * 1000
+    view.close()
+    return {"metrics": {"load_ms": load_ms, "sort_ms": sort_ms, "filter_ms": filter_ms},
+            "info": {"rows": rows}}
+
+
+def bench_registry(manifest, root, tmp, rows=20000):
+    from status import RepoStatus
+    from registry import RepoRegistry
+    registry = RepoRegistry()
+    paths = [f"/synthetic/dir{n % 97}/repo{n}" for n in range(rows)]
+    started = time.perf_counter()
+    for path in paths:
+        registry.add_path(path)
+    add_ms = (time.perf_counter() - started) * 1000
+    fresh = []
+    for n, path in enumerate(paths):
+        status = RepoStatus(path)
+        status.branch = "main"
+        status.files = [(".M", f"src/file{n % 7}.py")] if n % 3 == 0 else []
+        status.checked = 1.0
+        fresh.append(status)
+    started = time.perf_counter()
+    for status in fresh:
+        registry.update(status)
+    update_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for path in paths:
+        registry.get(path)
+    lookup_ms = (time.perf_counter() - started) * 1000
+    footprint = registry.footprint()
+    return {"metrics": {"add_ms": add_ms, "update_ms": update_ms, "lookup_ms": lookup_ms,
+                        "footprint_mb": footprint / 2**20},
+            "info": {"rows": rows, "bytes_per_repo": footprint // rows}}
+
+
+def bench_log(manifest, root, tmp):
+    from gitlog import LogReader
+    from commitcache import CommitCache, CachedLogReader
+    repo = manifest["history"][0]
+    started = time.perf_counter()
+    LogReader(repo).read(200)
+    first_page = time.perf_counter() - started
+    started = time.perf_counter()
+    reader = LogReader(repo)
+    count = 0
+    while not reader.at_end:
+        count += len(reader.read(5000))
+    full = time.perf_counter() - started
+    cache = CommitCache(root=os.path.join(tmp, "commits"))
+    started = time.perf_counter()
+    cache.build(repo)
+    build = time.perf_counter() - started
+    fresh = CommitCache(root=os.path.join(tmp, "commits"))
+    started = time.perf_counter()
+    CachedLogReader(fresh, repo, author="bob").read(200)
+    cached_page = time.perf_counter() - started
+    return {"metrics": {"first_page_ms": first_page * 1000, "full_read_s": full,
+                        "cache_build_s": build, "cached_filtered_page_ms": cached_page * 1000},
+            "info": {"commits": count}}
+
+
+BENCHMARKS = {
+    "discovery": bench_discovery,
+    "discovery_indexed": bench_discovery_indexed,
+    "status": bench_status,
+    "status_fastpath": bench_status_fastpath,
+    "sidebar": bench_sidebar,
+    "changed_files": bench_changed_files,
+    "registry": bench_registry,
+    "log": bench_log,
+}
+
+
+def run_child(name, root):
+    with open(os.path.join(root, ".gitcompass-synth.json")) as f:
+        manifest = json.load(f)
+    with tempfile.TemporaryDirectory(prefix="gitcompass-bench-") as tmp:
+        result = BENCHMARKS[name](manifest, root, tmp)
+    own, children = peak_rss()
+    result["metrics"]["peak_rss_mb"] = own
+    result["info"]["children_peak_rss_mb"] = children
+    json.dump(result, sys.stdout)
+    return 0
+
+
+def run_benchmark(name, root, runs):
+    # Median of each metric over ``runs`` child processes
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, __file__, "--child", name, "--root", root],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {"skipped": lines[-1] if lines else f"exit status {proc.returncode}"}
+        samples.append(json.loads(proc.stdout))
+    metrics = {key: round(statistics.median(s["metrics"][key] for s in samples), 4)
+               for key in samples[0]["metrics"]}
+    return {"metrics": metrics, "info": samples[-1]["info"]}
+
+
+def git_version():
+    try:
+        return subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(results, baseline, threshold):
+    # Returns [(benchmark, metric, base, new, change)] for regressions
+    regressions = []
+    for name, result in results["results"].items():
+        base = baseline.get("results", {}).get(name, {}).get("metrics")
+        if not base or "metrics" not in result:
+            continue
+        for key, new in result["metrics"].items():
+            old = base.get(key)
+            if old is None:
+                continue
+            floor = next((v for suffix, v in NOISE_FLOOR.items() if key.endswith(suffix)), 0.0)
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append((name, key, old, new, (new - old) / old if old else float("inf")))
+    return regressions
+
+
+def print_table(results, baseline=None):
+    base_results = (baseline or {}).get("results", {})
+    for name, result in results["results"].items():
+        if "skipped" in result:
+            print(f"{name:<20} skipped: {result['skipped']}")
+            continue
+        for key, value in result["metrics"].items():
+            line = f"{name:<20} {key:<26} {value:>12.4f}"
+            old = base_results.get(name, {}).get("metrics", {}).get(key)
+            if old:
+                line += f"   baseline {old:>12.4f}  {(value - old) / old:+7.1%}"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark discovery, status, sidebar, changed files and log performance.")
+    parser.add_argument("--root", default=os.path.join(tempfile.gettempdir(), "gitcompass-synth"),
+                        help="synthetic tree to use (generated if missing)")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only these (repeatable)")
+    parser.add_argument("--runs", type=int, default=3, help="child runs per benchmark; the median is kept")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown that counts as a regression (default 0.25)")
+    parser.add_argument("--child", choices=sorted(BENCHMARKS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    root = os.path.abspath(args.root)
+    if args.child:
+        return run_child(args.child, root)
+
+    manifest = generate(root, seed=args.seed, **SIZES[args.size])
+    results = {
+        "meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpus": os.cpu_count(), "git": git_version(),
+                 "size": args.size, "params": manifest["params"], "runs": args.runs},
+        "results": {},
+    }
+    for name in args.only or BENCHMARKS:
+        results["results"][name] = run_benchmark(name, root, args.runs)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("params") != manifest["params"]:
+            print("warning: baseline was measured on a different synthetic tree", file=sys.stderr)
+    print_table(results, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for name, key, old, new, change in regressions:
+            print(f"REGRESSION {name}.{key}: {old:.4f} -> {new:.4f} ({change:+.1%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import subprocess
+
+# Builds a deterministic fake home directory for the benchmarks: plain
+# directories, dependency/virtualenv clutter the scanner should prune,
+# repositories (some nested inside others), a few huge dirty working trees
+# and repositories with deep histories. The same parameters and seed always
+# produce the same tree, and an existing tree built with the same
+# parameters is reused.
+
+SIZES = {
+    "small": dict(dirs=200, repos=50, nested=5, dirty_repos=2, dirty_files=2000,
+                  history_repos=1, history_commits=5000, clutter=20),
+    "medium": dict(dirs=2000, repos=300, nested=30, dirty_repos=4, dirty_files=20000,
+                   history_repos=2, history_commits=50000, clutter=100),
+    "large": dict(dirs=10000, repos=1500, nested=100, dirty_repos=8, dirty_files=100000,
+                  history_repos=4, history_commits=200000, clutter=400),
+}
+MANIFEST = ".gitcompass-synth.json"
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME="Synth", GIT_AUTHOR_EMAIL="synth@example.com",
+               GIT_COMMITTER_NAME="Synth", GIT_COMMITTER_EMAIL="synth@example.com",
+               GIT_CONFIG_NOSYSTEM="1", GIT_CONFIG_GLOBAL=os.devnull)
+AUTHORS = ["alice <alice@example.com>", "bob <bob@example.com>", "carol <carol@example.com>",
+           "dave <dave@example.com>"]
+
+
+def git(*args, cwd=None, stdin=None):
+    subprocess.run(["git", *args], cwd=cwd, env=GIT_ENV, input=stdin, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def fast_import_stream(commits, files_per_commit, tracked_files, rng):
+    # Linear history on main touching a rotating set of files
+    out = []
+    for i in range(commits):
+        author = AUTHORS[rng.randrange(len(AUTHORS))]
+        when = 1_600_000_000 + i * 600
+        msg = f"Change {i}: update module {i % 97}".encode()
+        out.append(f"commit refs/heads/main\nmark :{i + 1}\n"
+                   f"author {author} {when} +0000\ncommitter {author} {when} +0000\n"
+                   f"data {len(msg)}\n".encode() + msg + b"\n")
+        if i:
+            out.append(f"from :{i}\n".encode())
+        paths = range(tracked_files) if i == 0 else (rng.randrange(tracked_files) for _ in range(files_per_commit))
+        for n in paths:
+            body = f"file {n} revision {i}\n".encode()
+            out.append(f"M 644 inline src/pkg{n % 10}/file{n}.txt\ndata {len(body)}\n".encode() + body + b"\n")
+        out.append(b"\n")
+    return b"".join(out)
+
+
+def make_repo(path, rng, commits=1, tracked_files=20, files_per_commit=3):
+    os.makedirs(path, exist_ok=True)
+    git("init", "-q", "-b", "main", path)
+    git("fast-import", "--quiet", cwd=path,
+        stdin=fast_import_stream(commits, files_per_commit, tracked_files, rng))
+    git("reset", "-q", "--hard", "main", cwd=path)
+
+
+def make_dirty(path, count):
+    # Untracked files spread over new directories, plus a few edits
+    for n in range(count):
+        d = os.path.join(path, "generated", f"d{n // 500}")
+        if n % 500 == 0:
+            os.makedirs(d, exist_ok=True)
+        with open(os.path.join(d, f"out{n}.tmp"), "w") as f:
+            f.write("x\n")
+    for root, _, files in os.walk(os.path.join(path, "src")):
+        for name in files[:2]:
+            with open(os.path.join(root, name), "a") as f:
+                f.write("local edit\n")
+
+
+def make_clutter(path):
+    # Trees the scanner should prune without descending
+    modules = os.path.join(path, "node_modules")
+    for n in range(20):
+        d = os.path.join(modules, f"pkg{n}", "lib")
+        os.makedirs(d, exist_ok=True)
+        open(os.path.join(d, "index.js"), "w").close()
+    venv = os.path.join(path, ".venv")
+    os.makedirs(os.path.join(venv, "lib", "site-packages"), exist_ok=True)
+    with open(os.path.join(venv, "pyvenv.cfg"), "w") as f:
+        f.write("home = /usr/bin\n")
+
+
+def generate(root, dirs, repos, nested, dirty_repos, dirty_files, history_repos,
+             history_commits, clutter, seed=0, depth=4, force=False):
+    params = dict(dirs=dirs, repos=repos, nested=nested, dirty_repos=dirty_repos,
+                  dirty_files=dirty_files, history_repos=history_repos,
+                  history_commits=history_commits, clutter=clutter, seed=seed, depth=depth)
+    manifest_path = os.path.join(root, MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["params"] == params and not force:
+            return manifest
+    except (OSError, ValueError, KeyError):
+        pass
+    if os.path.exists(root) and os.listdir(root):
+        if not os.path.exists(manifest_path):
+            raise SystemExit(f"{root} is not empty and was not made by synth.py")
+        shutil.rmtree(root)
+    os.makedirs(root, exist_ok=True)
+    rng = random.Random(seed)
+
+    # Plain directory skeleton, depth-limited
+    all_dirs = [root]
+    for n in range(dirs):
+        parent = rng.choice(all_dirs[-200:]) if rng.random() < 0.7 else root
+        if parent.count(os.sep) - root.count(os.sep) >= depth:
+            parent = root
+        path = os.path.join(parent, f"dir{n}")
+        os.makedirs(path, exist_ok=True)
+        all_dirs.append(path)
+        if n % 3 == 0:
+            with open(os.path.join(path, "notes.txt"), "w") as f:
+                f.write("notes\n")
+
+    repo_paths = []
+    for n in range(repos):
+        path = os.path.join(rng.choice(all_dirs), f"repo{n}")
+        make_repo(path, rng)
+        repo_paths.append(path)
+    nested_paths = []
+    for n in range(min(nested, len(repo_paths))):
+        path = os.path.join(repo_paths[n], "vendor", f"nested{n}")
+        make_repo(path, rng)
+        nested_paths.append(path)
+    dirty_paths = []
+    for n in range(dirty_repos):
+        path = os.path.join(root, "work", f"dirty{n}")
+        make_repo(path, rng, tracked_files=200)
+        make_dirty(path, dirty_files)
+        dirty_paths.append(path)
+    history_paths = []
+    for n in range(history_repos):
+        path = os.path.join(root, "src", f"history{n}")
+        make_repo(path, rng, commits=history_commits, tracked_files=100)
+        history_paths.append(path)
+    for n in range(clutter):
+        make_clutter(rng.choice(all_dirs))
+
+    manifest = {"params": params, "repos": repo_paths + dirty_paths + history_paths,
+                "nested": nested_paths, "dirty": dirty_paths, "history": history_paths}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic home directory for benchmarks.")
+    parser.add_argument("root")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    for name in SIZES["small"]:
+        parser.add_argument("--" + name.replace("_", "-"), type=int, help="override the size preset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="regenerate even if the tree is current")
+    args = parser.parse_args(argv)
+    params = dict(SIZES[args.size])
+    for name in params:
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    manifest = generate(os.path.abspath(args.root), seed=args.seed, force=args.force, **params)
+    print(f"{len(manifest['repos'])} repos, {len(manifest['nested'])} nested, in {args.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from functools import partial
+
+from config import load_config
+from discovery import RepoDiscovery
+from repo_index import DiscoveryIndex
+from fastpath import CleanCache
+from scheduler import StatusScheduler
+from gitfs import object_store
+from status import repo_status
+from export import status_to_dict
+
+
+class Printer:
+    # Serializes output from worker threads; every line is flushed as it is
+    # produced so consumers can stream it
+    def __init__(self, as_json, stream=None):
+        self.as_json = as_json
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+        self.closed = False
+        self.on_close = None
+
+    def write(self, text):
+        with self.lock:
+            if self.closed:
+                return
+            try:
+                self.stream.write(text + "\n")
+                self.stream.flush()
+            except BrokenPipeError:
+                # Output was piped into something like head
+                self.closed = True
+                os.dup2(os.open(os.devnull, os.O_WRONLY), self.stream.fileno())
+        if self.closed and self.on_close:
+            self.on_close()
+
+    def repo(self, path):
+        self.write(json.dumps({"path": path}) if self.as_json else path)
+
+    def status(self, status, timestamp):
+        if self.as_json:
+            self.write(json.dumps(status_to_dict(status, timestamp), ensure_ascii=False))
+        else:
+            self.write(f"{status.emoji}\t{status.name}\t{status.path}\t{status.message}")
+
+
+def discovery_from_args(args, config, on_repo):
+    return RepoDiscovery(
+        args.root or config["scan_roots"],
+        ignore=config["scan_ignore"] + (args.ignore or []),
+        nested=args.nested or config["scan_nested"],
+        workers=args.workers or config["scan_workers"],
+        on_repo=on_repo,
+        index=DiscoveryIndex() if config["scan_index"] and not args.no_index else None,
+        linked=config["scan_linked"])
+
+
+def cmd_scan(args, config):
+    printer = Printer(args.json)
+    discovery = discovery_from_args(args, config, printer.repo)
+    printer.on_close = discovery.cancel
+    discovery.run()
+    return 0
+
+
+def cmd_status(args, config):
+    printer = Printer(args.json)
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    clean_cache = None
+    if config["status_fastpath"] and not args.no_fastpath:
+        clean_cache = CleanCache().load()
+    dirty = []
+
+    def on_result(status):
+        if not status.clean:
+            dirty.append(status.path)
+        elif args.dirty:
+            return
+        printer.status(status, timestamp)
+
+    scheduler = StatusScheduler(partial(repo_status, clean_cache=clean_cache),
+                                on_result=on_result, max_workers=config["status_workers"],
+                                group_of=object_store)
+    printer.on_close = scheduler.cancel
+    if args.paths:
+        repos = [os.path.abspath(p) for p in args.paths]
+        for repo in repos:
+            scheduler.submit(repo)
+    else:
+        # Status work starts while discovery is still walking
+        repos = discovery_from_args(args, config, scheduler.submit).run()
+    scheduler.join()
+    if args.watch:
+        watch(args, config, repos, scheduler, printer)
+    scheduler.shutdown()
+    if clean_cache is not None:
+        try:
+            clean_cache.save()
+        except OSError:
+            pass
+    return 1 if args.dirty and dirty else 0
+
+
+def cmd_sync(args, config):
+    from sync import BulkSync, PULL, FETCH, summary_text
+    printer = Printer(args.json)
+
+    def on_result(item):
+        if args.json:
+            printer.write(json.dumps({
+                "path": item.repo, "host": item.host, "remote": item.remote, "upstream": item.upstream,
+                "ok": item.ok, "skipped": item.skipped, "updated": item.updated,
+                "message": item.message, "elapsed": round(item.elapsed, 3)}, ensure_ascii=False))
+        else:
+            mark = "-" if item.skipped else "✅" if item.ok else "❌"
+            printer.write(f"{mark}\t{item.host}\t{item.upstream or ''}\t{item.repo}\t{item.message}")
+
+    repos = [os.path.abspath(p) for p in args.paths] or discovery_from_args(args, config, None).run()
+    sync = BulkSync(repos, mode=PULL if args.pull else FETCH,
+                    max_workers=args.jobs or config["sync_workers"],
+                    per_host=args.per_host or config["sync_per_host"], on_result=on_result)
+    printer.on_close = sync.cancel
+    items = sync.run()
+    if not args.json:
+        sys.stderr.write(summary_text(items) + "\n")
+    return 1 if any(not i.ok and not i.skipped for i in items) else 0
+
+
+def watch(args, config, repos, scheduler, printer):
+    # Daemon mode: keep re-reading repos as their files change
+    from watcher import RepoWatcher
+    watcher = RepoWatcher(scheduler.submit, backend=config["watch_backend"])
+    watcher.start()
+    for repo in repos:
+        watcher.watch(repo)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="gitcompass", description="Find Git repositories and report their status.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="emit one JSON object per line")
+    common.add_argument("--root", action="append", help="directory to scan (repeatable, default from settings)")
+    common.add_argument("--ignore", action="append", help="extra directory name or path to skip (repeatable)")
+    common.add_argument("--nested", action="store_true", help="also find repositories inside repositories")
+    common.add_argument("--workers", type=int, default=0, help="discovery threads")
+    common.add_argument("--no-index", action="store_true", help="ignore the cached discovery index")
+    sub.add_parser("scan", parents=[common], help="list repositories as they are found")
+    status = sub.add_parser("status", parents=[common], help="report repository status as it is read")
+    status.add_argument("paths", nargs="*", help="repositories to check instead of scanning")
+    status.add_argument("--dirty", action="store_true", help="only print repos that are not clean; exit 1 if any")
+    status.add_argument("--no-fastpath", action="store_true", help="always run git status")
+    status.add_argument("--watch", action="store_true", help="keep running and report repos as they change")
+    sync = sub.add_parser("sync", parents=[common], help="fetch (or pull) every repository")
+    sync.add_argument("paths", nargs="*", help="repositories to sync instead of scanning")
+    sync.add_argument("--pull", action="store_true", help="fast-forward pull instead of fetch")
+    sync.add_argument("--jobs", type=int, default=0, help="git processes at once")
+    sync.add_argument("--per-host", type=int, default=0, help="git processes per remote host")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config()
+    if args.command == "scan":
+        return cmd_scan(args, config)
+    if args.command == "sync":
+        return cmd_sync(args, config)
+    return cmd_status(args, config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+import os
+import re
+import sys
+import json
+import struct
+import time
+import hashlib
+import threading
+import subprocess
+from array import array
+from collections import OrderedDict
+
+import tracing
+from config import cache_path
+from gitcmd import git_command
+from gitfs import git_dir, read_head, list_refs
+from githelper import helpers
+from gitlog import Commit, LogReader
+
+# Commit metadata cached per (repo, rev) and keyed by the rev's tip oid.
+#
+# Commits are stored oldest first so a moved tip only appends: the next
+# query reads ``git log <new tip> ^<cached tip>`` and, when the cached tip
+# is a parent of one of those commits (i.e. history only grew), appends
+# them. Anything else (reset, force push, rebase) rebuilds from scratch.
+#
+# On disk each column is one contiguous array: raw oids, commit times,
+# author ids into an interned author table, parent indices with offsets,
+# and NUL-free subjects in a single UTF-8 blob with offsets.
+
+MAGIC = b"GCCC"
+VERSION = 1
+RECORD_FORMAT = "%H%x1f%P%x1f%an%x1f%ae%x1f%at%x1f%s"
+SECTION = struct.Struct("<I")
+
+
+class CommitHistory:
+    def __init__(self, rev, tip=None, hash_size=20):
+        self.rev = rev
+        self.tip = tip
+        self.hash_size = hash_size
+        self.oids = bytearray()
+        self.times = array("q")
+        self.author_ids = array("I")
+        self.authors = []  # [(name, email)]
+        self.parent_offsets = array("I", [0])
+        self.parents = array("i")  # commit index, -1 outside the cache (shallow)
+        self.subject_offsets = array("I", [0])
+        self.subjects = bytearray()
+        self._author_index = None
+        self._oid_index = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def oid(self, i):
+        return self.oids[i * self.hash_size:(i + 1) * self.hash_size].hex()
+
+    def subject(self, i):
+        return self.subjects[self.subject_offsets[i]:self.subject_offsets[i + 1]].decode("utf-8", "replace")
+
+    def parent_oids(self, i):
+        return [self.oid(p) for p in self.parents[self.parent_offsets[i]:self.parent_offsets[i + 1]] if p >= 0]
+
+    def commit(self, i, refs=""):
+        oid = self.oid(i)
+        name, email = self.authors[self.author_ids[i]]
+        return Commit(oid, oid[:7], name, email, self.times[i], refs, self.subject(i))
+
+    def matching(self, author=None, start=None):
+        # Indices newest first, optionally limited to authors matching the
+        # (case-insensitive) regex, like git log -i --author
+        ids = None
+        if author:
+            try:
+                pattern = re.compile(author, re.IGNORECASE)
+                ids = {n for n, (name, email) in enumerate(self.authors)
+                       if pattern.search(f"{name} <{email}>")}
+            except re.error:
+                needle = author.lower()
+                ids = {n for n, (name, email) in enumerate(self.authors)
+                       if needle in f"{name} <{email}>".lower()}
+        author_ids = self.author_ids
+        for i in range(len(self) - 1 if start is None else start, -1, -1):
+            if ids is None or author_ids[i] in ids:
+                yield i
+
+    def append(self, records):
+        # records: (oid, [parent oids], name, email, time, subject), oldest
+        # first; any iterable, consumed once, so it may stream from git.
+        # Parents are resolved once every commit is in, since a parent with a
+        # skewed clock can be listed after its child.
+        if self._oid_index is None:
+            size = self.hash_size
+            self._oid_index = {bytes(self.oids[i * size:(i + 1) * size]): i for i in range(len(self))}
+        if self._author_index is None:
+            self._author_index = {a: n for n, a in enumerate(self.authors)}
+        pending = bytearray()  # raw parent oids, until every commit is indexed
+        counts = array("I")
+        for oid, parents, name, email, at, subject in records:
+            raw = bytes.fromhex(oid)
+            self._oid_index[raw] = len(self.times)
+            self.oids += raw
+            self.times.append(at)
+            key = (name, email)
+            aid = self._author_index.get(key)
+            if aid is None:
+                aid = self._author_index[key] = len(self.authors)
+                self.authors.append(key)
+            self.author_ids.append(aid)
+            self.subjects += subject.encode("utf-8")
+            self.subject_offsets.append(len(self.subjects))
+            for parent in parents:
+                pending += bytes.fromhex(parent)
+            counts.append(len(parents))
+        size = self.hash_size
+        pos = 0
+        for n in counts:
+            for _ in range(n):
+                self.parents.append(self._oid_index.get(bytes(pending[pos:pos + size]), -1))
+                pos += size
+            self.parent_offsets.append(len(self.parents))
+
+    def to_bytes(self):
+        header = json.dumps({"rev": self.rev, "tip": self.tip, "hash_size": self.hash_size,
+                             "byteorder": sys.byteorder, "authors": self.authors}).encode()
+        out = [MAGIC, struct.pack("<II", VERSION, len(header)), header]
+        for column in (bytes(self.oids), self.times.tobytes(), self.author_ids.tobytes(),
+                       self.parent_offsets.tobytes(), self.parents.tobytes(),
+                       self.subject_offsets.tobytes(), bytes(self.subjects)):
+            out.append(SECTION.pack(len(column)))
+            out.append(column)
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError("not a commit cache")
+        version, header_len = struct.unpack_from("<II", data, 4)
+        if version != VERSION:
+            raise ValueError(f"commit cache version {version}")
+        pos = 12 + header_len
+        header = json.loads(data[12:pos])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError("commit cache from another byte order")
+        history = cls(header["rev"], header["tip"], header["hash_size"])
+        history.authors = [tuple(a) for a in header["authors"]]
+        columns = []
+        for _ in range(7):
+            size, = SECTION.unpack_from(data, pos)
+            pos += SECTION.size
+            columns.append(data[pos:pos + size])
+            pos += size
+        history.oids = bytearray(columns[0])
+        for arr, column in zip((history.times, history.author_ids, history.parent_offsets,
+                                history.parents, history.subject_offsets),
+                               columns[1:6]):
+            del arr[:]
+            arr.frombytes(column)
+        history.subjects = bytearray(columns[6])
+        if (len(history.oids) != len(history) * history.hash_size
+                or len(history.parent_offsets) != len(history) + 1
+                or len(history.subject_offsets) != len(history) + 1
+                or history.subject_offsets[-1] != len(history.subjects)):
+            raise ValueError("truncated commit cache")
+        return history
+
+
+def parse_record(record):
+    fields = record.lstrip(b"\n").decode("utf-8", "replace").split("\x1f")
+    if len(fields) != 6:
+        return None
+    oid, parents, name, email, at, subject = fields
+    return oid, parents.split(), name, email, int(at or 0), subject
+
+
+def read_records(repo, *revs, reverse=False, chunk_size=65536):
+    # Yields (oid, [parents], name, email, time, subject) newest first, or
+    # oldest first with reverse, as git's output arrives; raises
+    # RuntimeError at the end if git failed
+    args = ["log", "-z", f"--format={RECORD_FORMAT}", *(["--reverse"] if reverse else []), *revs, "--"]
+    started_ns = time.perf_counter_ns()
+    size = 0
+    proc = subprocess.Popen(git_command(repo, *args), stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        buf = b""
+        while True:
+            chunk = proc.stdout.read1(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            records = (buf + chunk).split(b"\0")
+            buf = records.pop()
+            for record in records:
+                parsed = parse_record(record)
+                if parsed:
+                    yield parsed
+        parsed = parse_record(buf) if buf.strip() else None
+        if parsed:
+            yield parsed
+        err = proc.stderr.read().decode("utf-8", "replace").strip()
+        if proc.wait() != 0:
+            raise RuntimeError(err or "git log failed")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+        if tracing.enabled:
+            tracing.record_git(args, repo, started_ns, time.perf_counter_ns(), proc.returncode, size)
+
+
+def decorations(gitdir):
+    # {oid: "HEAD -> main, origin/main, tag: v1"} like git log's %D
+    names = {}
+    branch, head = read_head(gitdir)
+    for ref, oid in sorted(list_refs(gitdir).items()):
+        if ref.startswith("refs/heads/"):
+            name = ref[len("refs/heads/"):]
+            if name == branch:
+                name = f"HEAD -> {name}"
+        elif ref.startswith("refs/remotes/"):
+            name = ref[len("refs/remotes/"):]
+        elif ref.startswith("refs/tags/"):
+            name = f"tag: {ref[len('refs/tags/'):]}"
+        else:
+            continue
+        names.setdefault(oid, []).append(name)
+    if head and branch is None:
+        names.setdefault(head, []).insert(0, "HEAD")
+    for oid, labels in names.items():
+        labels.sort(key=lambda n: not n.startswith("HEAD"))
+    return {oid: ", ".join(labels) for oid, labels in names.items()}
+
+
+class CommitCache:
+    """Commit metadata for (repo, rev) pairs, on disk and in a small LRU.
+
+    ``get`` returns an up-to-date CommitHistory, catching up on new commits
+    when the tip only moved forward, or None when nothing usable is cached
+    (``build`` then reads the whole history once).
+    """
+
+    def __init__(self, root=None, max_loaded=8):
+        self.root = root
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()  # path: CommitHistory
+        self._locks = {}
+        self._building = set()
+        self._lock = threading.Lock()
+
+    def path_for(self, repo, rev):
+        name = hashlib.sha1(repo.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+        key = hashlib.sha1(rev.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+        if self.root:
+            path = os.path.join(self.root, name, key + ".bin")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return path
+        return cache_path("commits", name, key + ".bin")
+
+    def _path_lock(self, path):
+        with self._lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _remember(self, path, history):
+        with self._lock:
+            self._loaded[path] = history
+            self._loaded.move_to_end(path)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+
+    def _load(self, path):
+        with self._lock:
+            history = self._loaded.get(path)
+        if history is not None:
+            return history
+        try:
+            with open(path, "rb") as f:
+                history = CommitHistory.from_bytes(f.read())
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        self._remember(path, history)
+        return history
+
+    def _save(self, path, history):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(history.to_bytes())
+        os.replace(tmp, path)
+        self._remember(path, history)
+
+    def get(self, repo, rev="HEAD"):
+        tip = helpers.resolve(repo, rev)
+        if tip is None:
+            return None
+        with self._lock:
+            if (repo, rev) in self._building:
+                return None  # stream from git rather than wait for the build
+        path = self.path_for(repo, rev)
+        with self._path_lock(path):
+            history = self._load(path)
+            if history is None:
+                return None
+            if history.tip == tip:
+                return history
+            try:
+                records = list(read_records(repo, tip, f"^{history.tip}"))
+            except RuntimeError:
+                return None
+            old = history.tip
+            if not any(old in parents for _, parents, _, _, _, _ in records):
+                return None  # history was rewritten, not extended
+            # Appending in place is safe for readers already walking this
+            # history: they only visit indices below the length they started at
+            history.append(records[::-1])
+            history.tip = tip
+            self._save(path, history)
+            return history
+
+    def build(self, repo, rev="HEAD"):
+        tip = helpers.resolve(repo, rev)
+        if tip is None:
+            return None
+        path = self.path_for(repo, rev)
+        with self._path_lock(path):
+            # Streamed straight into the columns, never held as records
+            history = CommitHistory(rev, tip, len(tip) // 2)
+            history.append(read_records(repo, tip, reverse=True))
+            self._save(path, history)
+            return history
+
+    def build_async(self, repo, rev="HEAD"):
+        key = (repo, rev)
+        with self._lock:
+            if key in self._building:
+                return
+            self._building.add(key)
+
+        def work():
+            try:
+                self.build(repo, rev)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._building.discard(key)
+        threading.Thread(target=work, daemon=True).start()
+
+
+class CachedLogReader:
+    """LogReader interface answered from a CommitCache when possible.
+
+    The cache is consulted on the first ``read`` (which callers make off
+    the GUI thread). If it has nothing for this rev the reader streams
+    from git as before and the cache is filled in the background for the
+    next query.
+    """
+
+    def __init__(self, cache, repo, rev=None, author=None):
+        self.cache = cache
+        self.repo = repo
+        self.rev = rev or "HEAD"
+        self.author = author
+        self.history = None
+        self.fallback = None
+        self.refs = {}
+        self._positions = None
+        self._done = False
+        self._closed = False
+        self._error = None
+        self._lock = threading.Lock()
+
+    @property
+    def at_end(self):
+        return self.fallback.at_end if self.fallback else self._done
+
+    @property
+    def error(self):
+        if self._error is None and self.fallback:
+            return self.fallback.error
+        return self._error
+
+    @error.setter
+    def error(self, message):
+        self._error = message
+
+    @property
+    def cached(self):
+        return self.history is not None
+
+    def _open(self):
+        try:
+            self.history = self.cache.get(self.repo, self.rev)
+        except Exception:
+            self.history = None
+        if self.history is None:
+            self.fallback = LogReader(self.repo, rev=self.rev, author=self.author)
+            if helpers.resolve(self.repo, self.rev):
+                self.cache.build_async(self.repo, self.rev)
+            return
+        self.refs = decorations(git_dir(self.repo))
+        self._positions = self.history.matching(self.author)
+
+    def read(self, count):
+        with self._lock:
+            if self._closed:
+                return []
+            if self.history is None and self.fallback is None:
+                self._open()
+                if self._closed and self.fallback:
+                    self.fallback.close()  # close() may have run before it existed
+            if self.fallback:
+                return self.fallback.read(count)
+            commits = []
+            for i in self._positions:
+                oid = self.history.oid(i)
+                commits.append(self.history.commit(i, self.refs.get(oid, "")))
+                if len(commits) == count:
+                    return commits
+            self._done = True
+            return commits
+
+    def close(self):
+        self._closed = True
+        self._done = True
+        if self.fallback:
+            self.fallback.close()
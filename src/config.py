@@ -0,0 +1,55 @@
+import os
+import json
+
+CONFIG_FILE = os.path.expanduser("~/.gitcompassrc.json")
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "gitcompass")
+
+DEFAULTS = {
+    "default_branch": "",
+    "scan_roots": ["~"],
+    "scan_ignore": [],
+    "scan_nested": False,
+    "scan_linked": True,  # also list submodules and linked worktrees of found repos
+    "scan_workers": 0,  # 0 means pick from the CPU count
+    "scan_index": True,  # reuse ~/.cache/gitcompass/index.json between launches
+    "status_workers": 0,  # 0 means one per CPU core
+    "status_fastpath": True,  # skip git for repos unchanged since they were last clean
+    "status_tiered": True,  # slow repos get a quick status (no untracked scan) before the full one
+    "status_deadline": 0.5,  # seconds a full status may take before a repo counts as slow
+    "status_fsmonitor": False,  # use git's untracked cache (and fsmonitor on macOS/Windows) for slow repos
+    "batch_max_age": 30,  # seconds before Batch Status re-reads a repo
+    "watch": True,  # refresh repos when their files change
+    "watch_backend": "auto",  # "inotify", "poll" or "auto"
+    "refresh": True,  # re-read repos in the background, active ones more often
+    "refresh_budget": 0.05,  # share of one CPU core background refreshes may use
+    "refresh_on_battery": False,  # keep refreshing while on battery power
+    "log_cache": True,  # keep commit metadata in ~/.cache/gitcompass/commits for the log view
+    "job_workers": 0,  # git operations (push, pull, clone...) run at once; 0 means 4
+    "sync_workers": 0,  # Fetch/Pull All: git processes at once; 0 means 8
+    "sync_per_host": 2,  # Fetch/Pull All: git processes per remote host
+    "maintenance_workers": 0,  # Maintenance: git processes at once; 0 means 2
+    "trace": False,  # record timings for the Diagnostics panel (also GITCOMPASS_TRACE=1)
+}
+
+
+def load_config():
+    config = dict(DEFAULTS)
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE) as f:
+                config.update(json.load(f))
+        except Exception:
+            pass
+    return config
+
+
+def save_config(config):
+    with open(CONFIG_FILE, "w") as f:
+        json.dump(config, f, indent=2)
+
+
+def cache_path(*parts):
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
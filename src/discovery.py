@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+
+import tracing
+from gitfs import git_dir, worktree_paths, submodule_paths
+
+# Directory names that never contain repositories worth listing and are
+# expensive to walk.
+DEFAULT_IGNORE = {
+    ".git", "node_modules", "__pycache__", ".venv", "venv", ".tox", ".nox",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".cache", ".npm", ".yarn",
+    ".cargo", ".rustup", ".gradle", ".m2", ".Trash", "site-packages",
+}
+
+
+def default_workers():
+    return max(4, min(16, (os.cpu_count() or 1) * 2))
+
+
+class RepoDiscovery:
+    """Single-pass, parallel repository walk.
+
+    Each directory is read once with ``os.scandir``. Walking stops below a
+    repository unless ``nested`` is set, ignored names/paths are pruned, and
+    progress is reported as the finished fraction of the tree: every
+    directory hands an equal share of its own weight to each child, so the
+    estimate only ever grows and needs no pre-count. With ``linked``, each
+    repository's checked-out submodules (from ``.gitmodules``) and linked
+    worktrees (from the worktree registry, wherever they live) are reported
+    too, each path once.
+    """
+
+    def __init__(self, roots, ignore=None, nested=False, workers=None,
+                 on_repo=None, on_progress=None, progress_interval=0.1, index=None, linked=True):
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in roots]
+        self.ignore_names = set(DEFAULT_IGNORE)
+        self.ignore_paths = set()
+        for entry in ignore or []:
+            entry = entry.strip()
+            if not entry:
+                continue
+            if os.sep in entry or entry.startswith("~"):
+                self.ignore_paths.add(os.path.abspath(os.path.expanduser(entry)))
+            else:
+                self.ignore_names.add(entry)
+        self.nested = nested
+        self.linked = linked
+        self.workers = workers or default_workers()
+        self.on_repo = on_repo
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.index = index
+        if index is not None:
+            with tracing.span("index load", "discovery"):
+                index.load(self.fingerprint())
+        self.repos = []
+        self._seen = set()
+        self.scanned = 0
+        self.done_weight = 0.0
+        self._stack = []
+        self._busy = 0
+        self._cancelled = False
+        self._cond = threading.Condition()
+        self._last_report = 0.0
+        self._started_ns = 0
+
+    def fingerprint(self):
+        # Anything that changes which children get walked invalidates the index
+        return [sorted(self.roots), sorted(self.ignore_names),
+                sorted(self.ignore_paths), bool(self.nested)]
+
+    def cancel(self):
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        self._started_ns = time.perf_counter_ns()
+        roots = [r for r in self.roots if os.path.isdir(r)]
+        if roots:
+            share = 1.0 / len(roots)
+            self._stack = [(root, share) for root in roots]
+        if self.workers <= 1:
+            self._work()
+        else:
+            threads = [threading.Thread(target=self._work, daemon=True)
+                       for _ in range(self.workers)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        if tracing.enabled:
+            tracing.record("walk", "discovery", self._started_ns, time.perf_counter_ns(),
+                           {"dirs": self.scanned, "repos": len(self.repos), "workers": self.workers,
+                            "index_reused": self.index.reused if self.index is not None else 0})
+        if self._cancelled:
+            return self.repos
+        if self.index is not None:
+            try:
+                with tracing.span("index save", "discovery"):
+                    self.index.save(self.repos)
+            except OSError:
+                pass
+        if self.on_progress:
+            self.on_progress(1.0, self.scanned)
+        return self.repos
+
+    def _work(self):
+        with tracing.span("worker", "discovery"):
+            self._walk()
+
+    def _walk(self):
+        cond = self._cond
+        while True:
+            with cond:
+                while not self._stack and self._busy and not self._cancelled:
+                    cond.wait()
+                if self._cancelled or not self._stack:
+                    cond.notify_all()
+                    return
+                path, weight = self._stack.pop()
+                self._busy += 1
+            children, is_repo = self.scan_dir(path)
+            if is_repo:
+                self._found(path)
+            with cond:
+                self._busy -= 1
+                self.scanned += 1
+                if children:
+                    share = weight / len(children)
+                    self._stack.extend((child, share) for child in children)
+                    cond.notify(len(children))
+                else:
+                    self.done_weight += weight
+                    if not self._stack and not self._busy:
+                        cond.notify_all()
+            self._report()
+
+    def scan_dir(self, path):
+        # Returns (child directories to descend into, whether path is a repo)
+        if self.index is None:
+            return self._list_dir(path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return [], False
+        cached = self.index.lookup(path, mtime_ns)
+        if cached is not None:
+            return [os.path.join(path, name) for name in cached[2]], cached[1]
+        children, is_repo = self._list_dir(path)
+        self.index.record(path, mtime_ns, is_repo, children)
+        return children, is_repo
+
+    def _list_dir(self, path):
+        is_repo = False
+        children = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    if name == ".git":
+                        is_repo = True
+                        continue
+                    if name == "pyvenv.cfg":
+                        # A virtualenv: nothing below it is ours
+                        return [], False
+                    if name in self.ignore_names:
+                        continue
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
+                    children.append(entry.path)
+        except OSError:
+            return [], False
+        if is_repo and not self.nested:
+            return [], True
+        if self.ignore_paths:
+            children = [c for c in children if c not in self.ignore_paths]
+        return children, is_repo
+
+    def _found(self, path):
+        with self._cond:
+            if path in self._seen:
+                return
+            self._seen.add(path)
+            self.repos.append(path)
+            first = len(self.repos) == 1
+        if first and tracing.enabled:
+            tracing.record("first repo", "discovery", self._started_ns, time.perf_counter_ns(), {"repo": path})
+        if self.on_repo:
+            self.on_repo(path)
+        if self.linked:
+            for linked in self._linked(path):
+                self._found(linked)
+
+    def _linked(self, path):
+        gitdir = git_dir(path)
+        if not gitdir:
+            return []
+        linked = worktree_paths(gitdir)
+        if not self.nested:
+            linked += submodule_paths(path)
+        if self.ignore_paths:
+            linked = [p for p in linked
+                      if not any(p == i or p.startswith(i + os.sep) for i in self.ignore_paths)]
+        return linked
+
+    def _report(self):
+        if not self.on_progress:
+            return
+        now = time.monotonic()
+        if now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        self.on_progress(min(self.done_weight, 1.0), self.scanned)
@@ -0,0 +1,89 @@
+import os
+import csv
+import json
+import time
+
+from status import RepoStatus
+
+FIELDS = ["path", "name", "branch", "oid", "upstream", "ahead", "behind", "staged",
+          "unstaged", "untracked", "conflicted", "changed", "message", "error",
+          "checked", "exported_at", "files"]
+INT_FIELDS = {"ahead", "behind", "staged", "unstaged", "untracked", "conflicted"}
+LEGACY_EXPORT_FILE = os.path.expanduser("~/.gitcompass_export.txt")
+
+
+def export_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def status_to_dict(status, exported_at):
+    record = {name: getattr(status, name) for name in FIELDS if name in RepoStatus.__slots__}
+    record["changed"] = status.changed
+    record["message"] = status.message
+    record["exported_at"] = exported_at
+    record["files"] = status.files
+    return record
+
+
+def status_from_dict(record):
+    status = RepoStatus(record["path"], record.get("name") or None)
+    for name in RepoStatus.__slots__:
+        if name in ("path", "name", "files") or record.get(name) in (None, ""):
+            continue
+        value = record[name]
+        if name in INT_FIELDS:
+            value = int(value)
+        elif name == "checked":
+            value = float(value)
+        setattr(status, name, value)
+    files = record.get("files")
+    if isinstance(files, str):
+        # CSV stores the file list as a JSON cell
+        files = json.loads(files) if files else None
+    if files is not None:
+        status.files = [tuple(f) for f in files]
+    return status
+
+
+def export_statuses(statuses, path, fmt=None):
+    # Streams one record per repo; returns the number written
+    fmt = fmt or export_format(path)
+    exported_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    count = 0
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for status in statuses:
+                record = status_to_dict(status, exported_at)
+                record["files"] = "" if status.files is None else json.dumps(status.files, ensure_ascii=False)
+                writer.writerow(record)
+                count += 1
+        else:
+            for status in statuses:
+                record = status_to_dict(status, exported_at)
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+    os.replace(tmp, path)
+    return count
+
+
+def import_statuses(path):
+    # Yields RepoStatus records from a JSONL, CSV or legacy name|path|msg file
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for record in csv.DictReader(f):
+                if record.get("path"):
+                    yield status_from_dict(record)
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                yield status_from_dict(json.loads(line))
+                continue
+            parts = line.split("|")
+            if len(parts) == 3:
+                yield RepoStatus(parts[1], parts[0])
@@ -0,0 +1,256 @@
+import os
+import json
+import mmap
+import stat
+import struct
+import threading
+
+from config import cache_path
+from gitfs import git_dir, read_head, resolve_ref, upstream_ref, read_config, config_get
+
+# Subprocess-free "nothing changed" check.
+#
+# A verdict is only trusted relative to a snapshot taken right after a real
+# ``git status`` reported a clean working tree: HEAD, the upstream tip and the
+# index file must be unchanged, every index entry's cached stat data must
+# still match the file on disk, and every directory holding tracked files,
+# and every directory below those holding none (empty, or only ignored
+# files), must be older than the snapshot (so nothing was created or removed
+# in it). Anything else falls back to git.
+
+ENTRY = struct.Struct(">10I")
+CE_EXTENDED = 0x4000
+CE_STAGEMASK = 0x3000
+CE_NAMEMASK = 0x0FFF
+CE_EXT_SKIP_WORKTREE = 0x4000
+CE_EXT_INTENT_TO_ADD = 0x2000
+S_IFGITLINK = 0o160000
+# Filesystem timestamps come from a coarse clock that can trail time_ns()
+CLOCK_MARGIN_NS = 1_000_000_000
+# Directories without tracked files worth checking before git is cheaper
+UNTRACKED_DIR_LIMIT = 2000
+
+
+class IndexUnsupported(Exception):
+    pass
+
+
+def _varint(buf, pos):
+    c = buf[pos]
+    pos += 1
+    value = c & 0x7F
+    while c & 0x80:
+        c = buf[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (c & 0x7F)
+    return value, pos
+
+
+def read_index(path, hash_size=20):
+    # Returns [(path bytes, mtime_s, mtime_ns, ino, size, mode)] for all entries.
+    # Raises IndexUnsupported for conflicts, sparse/split indexes and entries
+    # git would not stat (skip-worktree, intent-to-add).
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        if buf[:4] != b"DIRC":
+            raise IndexUnsupported("bad signature")
+        version, count = struct.unpack_from(">II", buf, 4)
+        if version not in (2, 3, 4):
+            raise IndexUnsupported(f"index version {version}")
+        pos = 12
+        prev = b""
+        entries = []
+        for _ in range(count):
+            (_, _, mtime_s, mtime_ns, _, ino, mode, _, _, size) = ENTRY.unpack_from(buf, pos)
+            flags_pos = pos + 40 + hash_size
+            flags, = struct.unpack_from(">H", buf, flags_pos)
+            cur = flags_pos + 2
+            if flags & CE_EXTENDED:
+                ext, = struct.unpack_from(">H", buf, cur)
+                cur += 2
+                if ext & (CE_EXT_SKIP_WORKTREE | CE_EXT_INTENT_TO_ADD):
+                    raise IndexUnsupported("skip-worktree or intent-to-add entry")
+            if flags & CE_STAGEMASK:
+                raise IndexUnsupported("unmerged entry")
+            if version == 4:
+                strip, cur = _varint(buf, cur)
+                end = buf.find(b"\0", cur)
+                name = prev[:len(prev) - strip] + buf[cur:end]
+                pos = end + 1
+                prev = name
+            else:
+                length = flags & CE_NAMEMASK
+                if length == CE_NAMEMASK:
+                    length = buf.find(b"\0", cur) - cur
+                name = buf[cur:cur + length]
+                # Entries are NUL padded to a multiple of eight bytes
+                pos += (cur - pos + length + 8) & ~7
+            if stat.S_ISDIR(mode):
+                raise IndexUnsupported("sparse index")
+            entries.append((name, mtime_s, mtime_ns, ino, size, mode))
+        end = len(buf) - hash_size
+        while pos + 8 <= end:
+            sig = buf[pos:pos + 4]
+            ext_size, = struct.unpack_from(">I", buf, pos + 4)
+            if sig in (b"link", b"sdir"):
+                raise IndexUnsupported("split or sparse index")
+            pos += 8 + ext_size
+        return entries
+
+
+def _matches(entry, st):
+    _, mtime_s, mtime_ns, ino, size, mode = entry
+    if int(st.st_mtime) & 0xFFFFFFFF != mtime_s:
+        return False
+    if mtime_ns and st.st_mtime_ns % 1_000_000_000 != mtime_ns:
+        return False
+    if st.st_size & 0xFFFFFFFF != size:
+        return False
+    if ino and st.st_ino & 0xFFFFFFFF != ino:
+        return False
+    if stat.S_IFMT(mode) != stat.S_IFMT(st.st_mode):
+        return False
+    if stat.S_ISREG(mode) and (mode & 0o100) != (st.st_mode & 0o100):
+        return False
+    return True
+
+
+def repo_index(gitdir):
+    # Entries of a repository's index, in the repository's hash format
+    config = read_config(gitdir)
+    hash_size = 32 if config_get(config, "extensions.objectformat") == "sha256" else 20
+    return read_index(os.path.join(gitdir, "index"), hash_size)
+
+
+def worktree_unchanged(repo, gitdir, since_ns):
+    try:
+        index_mtime_ns = os.stat(os.path.join(gitdir, "index")).st_mtime_ns
+        entries = repo_index(gitdir)
+    except (OSError, IndexUnsupported, struct.error, ValueError):
+        return False
+    dirs = {b""}
+    root = os.fsencode(repo)
+    for entry in entries:
+        if stat.S_IFMT(entry[5]) == S_IFGITLINK:
+            return False  # submodule state needs git
+        name = entry[0]
+        try:
+            st = os.lstat(os.path.join(root, name))
+        except OSError:
+            return False
+        if not _matches(entry, st) or st.st_mtime_ns >= index_mtime_ns:
+            # Changed, or "racily clean" and therefore ambiguous
+            return False
+        slash = name.rfind(b"/")
+        while slash > 0:
+            parent = name[:slash]
+            if parent in dirs:
+                break
+            dirs.add(parent)
+            slash = parent.rfind(b"/")
+    # A file created in a directory without tracked files only shows in that
+    # directory's mtime, so those are listed and checked as well
+    stack = list(dirs)
+    untracked = 0
+    while stack:
+        d = stack.pop()
+        try:
+            path = os.path.join(root, d)
+            if os.stat(path).st_mtime_ns >= since_ns:
+                return False
+            with os.scandir(path) as it:
+                subdirs = [e.name for e in it if e.name != b".git" and e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return False
+        for name in subdirs:
+            sub = d + b"/" + name if d else name
+            if sub not in dirs:
+                untracked += 1
+                if untracked > UNTRACKED_DIR_LIMIT:
+                    return False
+                stack.append(sub)
+    try:
+        if os.stat(os.path.join(gitdir, "info", "exclude")).st_mtime_ns >= since_ns:
+            return False
+    except OSError:
+        pass
+    return True
+
+
+class CleanCache:
+    """Snapshots of repositories last seen with a clean working tree."""
+
+    def __init__(self, path=None):
+        self.path = path or cache_path("clean.json")
+        self.snapshots = {}  # repo: [head, upstream_oid, index_mtime_ns, index_size, verified_ns, branch, upstream, ahead, behind]
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.snapshots = json.load(f)
+        except (OSError, ValueError):
+            self.snapshots = {}
+        return self
+
+    def save(self):
+        with self.lock:
+            data = dict(self.snapshots)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _state(repo):
+        gitdir = git_dir(repo)
+        if not gitdir:
+            return None
+        branch, head = read_head(gitdir)
+        up = upstream_ref(gitdir, branch)
+        up_oid = resolve_ref(gitdir, up) if up else None
+        try:
+            st = os.stat(os.path.join(gitdir, "index"))
+        except OSError:
+            return None
+        return gitdir, branch, head, up_oid, st.st_mtime_ns, st.st_size
+
+    def remember(self, status, started_ns):
+        # Called with a fresh git status; started_ns is time.time_ns() from
+        # just before git was started
+        if status.error or status.files or status.conflicted:
+            with self.lock:
+                self.snapshots.pop(status.path, None)
+            return
+        state = self._state(status.path)
+        if state is None or state[2] != status.oid:
+            return
+        _, branch, head, up_oid, index_mtime_ns, index_size = state
+        with self.lock:
+            self.snapshots[status.path] = [head, up_oid, index_mtime_ns, index_size,
+                                           started_ns - CLOCK_MARGIN_NS,
+                                           status.branch, status.upstream, status.ahead, status.behind]
+
+    def forget(self, repo):
+        with self.lock:
+            self.snapshots.pop(repo, None)
+
+    def check(self, status):
+        # Fills ``status`` and returns True when the snapshot still holds
+        with self.lock:
+            snap = self.snapshots.get(status.path)
+        if snap is None:
+            return False
+        state = self._state(status.path)
+        ok = (state is not None
+              and [state[2], state[3], state[4], state[5]] == snap[:4]
+              and worktree_unchanged(status.path, state[0], snap[4]))
+        if not ok:
+            self.misses += 1
+            return False
+        self.hits += 1
+        status.oid = snap[0]
+        status.branch, status.upstream, status.ahead, status.behind = snap[5:9]
+        status.files = []
+        return True
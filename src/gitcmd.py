@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+import shutil
+import subprocess
+from functools import lru_cache
+
+import tracing
+
+
+def git_command(repo, *args):
+    return ["git", "-C", repo, *args] if repo else ["git", *args]
+
+
+@lru_cache(maxsize=None)
+def low_priority_prefix():
+    # Runs a command at low CPU priority and, on Linux, idle I/O priority
+    if os.name == "nt":
+        return ()
+    prefix = ("nice", "-n", "10") if shutil.which("nice") else ()
+    if sys.platform.startswith("linux") and shutil.which("ionice"):
+        prefix += ("ionice", "-c", "3")
+    return prefix
+
+
+def run_git(repo, *args, text=True, timeout=None, env=None, low_priority=False):
+    # env holds extra variables on top of the current environment
+    kwargs = dict(capture_output=True, text=text, timeout=timeout,
+                  env=dict(os.environ, **env) if env else None, stdin=subprocess.DEVNULL)
+    command = git_command(repo, *args)
+    if low_priority:
+        command = [*low_priority_prefix(), *command]
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    if not tracing.enabled:
+        return subprocess.run(command, **kwargs)
+    start = time.perf_counter_ns()
+    try:
+        result = subprocess.run(command, **kwargs)
+    except subprocess.TimeoutExpired:
+        tracing.record_git(args, repo, start, time.perf_counter_ns(), None, 0)
+        raise
+    tracing.record_git(args, repo, start, time.perf_counter_ns(), result.returncode,
+                       len(result.stdout or "") + len(result.stderr or ""))
+    return result
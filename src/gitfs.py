@@ -0,0 +1,312 @@
+import os
+import threading
+
+# Reading git metadata straight from the .git directory, for callers that
+# must not fork a git process per query.
+
+
+def git_dir(repo):
+    path = os.path.join(repo, ".git")
+    if os.path.isdir(path):
+        return path
+    try:
+        with open(path) as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if line.startswith("gitdir:"):
+        target = line[len("gitdir:"):].strip()
+        return os.path.normpath(os.path.join(repo, target))
+    return None
+
+
+def common_dir(gitdir):
+    try:
+        with open(os.path.join(gitdir, "commondir")) as f:
+            return os.path.normpath(os.path.join(gitdir, f.read().strip()))
+    except OSError:
+        return gitdir
+
+
+def worktree_paths(gitdir):
+    # Checkouts of linked worktrees registered in the common dir
+    base = os.path.join(common_dir(gitdir), "worktrees")
+    try:
+        names = os.listdir(base)
+    except OSError:
+        return []
+    paths = []
+    for name in names:
+        target = _read_first_line(os.path.join(base, name, "gitdir"))
+        if target and target.endswith(".git"):
+            path = os.path.dirname(os.path.normpath(os.path.join(base, name, target)))
+            if os.path.exists(os.path.join(path, ".git")):
+                paths.append(path)
+    return paths
+
+
+def submodule_paths(repo):
+    # Checked-out submodules listed in the repository's .gitmodules
+    try:
+        with open(os.path.join(repo, ".gitmodules"), encoding="utf-8", errors="replace") as f:
+            modules = parse_config(f.read())
+    except OSError:
+        return []
+    paths = []
+    for key, values in modules.items():
+        if key.startswith("submodule.") and key.endswith(".path") and values:
+            rel = values[-1]
+            if not rel or os.path.isabs(rel) or ".." in rel.replace("\\", "/").split("/"):
+                continue
+            path = os.path.normpath(os.path.join(repo, rel))
+            if os.path.exists(os.path.join(path, ".git")):
+                paths.append(path)
+    return paths
+
+
+def repo_link(repo):
+    # ("worktree", main checkout), ("submodule", superproject) or None for a
+    # stand-alone repository
+    gitdir = git_dir(repo)
+    if not gitdir or os.path.isdir(os.path.join(repo, ".git")):
+        parent = os.path.dirname(repo)
+        while parent != os.path.dirname(parent):
+            if os.path.exists(os.path.join(parent, ".git")):
+                if repo in submodule_paths(parent):
+                    return "submodule", parent
+                return None
+            parent = os.path.dirname(parent)
+        return None
+    commondir = common_dir(gitdir)
+    if commondir != gitdir:
+        if os.path.basename(commondir) == ".git":
+            return "worktree", os.path.dirname(commondir)
+        return "worktree", None  # checkout of a bare repository
+    if "modules" not in gitdir.split(os.sep):
+        return None  # e.g. git init --separate-git-dir
+    parent = os.path.dirname(repo)
+    while parent != os.path.dirname(parent):
+        if os.path.exists(os.path.join(parent, ".git")):
+            return "submodule", parent
+        parent = os.path.dirname(parent)
+    return None
+
+
+def object_store(repo):
+    # Checkouts that share an object store (worktrees, or clones borrowing
+    # objects through alternates) return the same key
+    gitdir = git_dir(repo)
+    if not gitdir:
+        return repo
+    commondir = common_dir(gitdir)
+    alternate = _read_first_line(os.path.join(commondir, "objects", "info", "alternates"))
+    if alternate and not alternate.startswith("#"):
+        objects = os.path.normpath(os.path.join(commondir, "objects", alternate))
+        return os.path.realpath(os.path.dirname(objects))
+    return os.path.realpath(commondir)
+
+
+def _read_first_line(path):
+    try:
+        with open(path, "rb") as f:
+            return f.readline().strip().decode("utf-8", "replace")
+    except OSError:
+        return None
+
+
+_packed = {}
+_packed_lock = threading.Lock()
+
+
+def packed_refs(commondir):
+    # Cached per file, re-read only when packed-refs changes
+    path = os.path.join(commondir, "packed-refs")
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    with _packed_lock:
+        cached = _packed.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+    refs = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if line[:1] in (b"#", b"^"):
+                continue
+            parts = line.strip().split(b" ", 1)
+            if len(parts) == 2:
+                refs[parts[1].decode("utf-8", "replace")] = parts[0].decode()
+    with _packed_lock:
+        _packed[path] = (key, refs)
+    return refs
+
+
+def _ref_dir(gitdir, ref):
+    # HEAD and per-worktree refs live in the worktree's own git dir
+    if ref == "HEAD" or ref.startswith(("refs/bisect/", "refs/worktree/", "refs/rewritten/")):
+        return gitdir
+    return common_dir(gitdir)
+
+
+def resolve_ref(gitdir, ref, depth=0):
+    if depth > 5:
+        return None
+    base = _ref_dir(gitdir, ref)
+    value = _read_first_line(os.path.join(base, ref))
+    if value is None:
+        return packed_refs(common_dir(gitdir)).get(ref)
+    if value.startswith("ref:"):
+        return resolve_ref(gitdir, value[4:].strip(), depth + 1)
+    return value or None
+
+
+def read_head(gitdir):
+    # Returns (branch or None if detached, commit oid or None if unborn)
+    value = _read_first_line(os.path.join(gitdir, "HEAD"))
+    if value is None:
+        return None, None
+    if value.startswith("ref:"):
+        ref = value[4:].strip()
+        branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+        return branch, resolve_ref(gitdir, ref)
+    return None, value
+
+
+def list_refs(gitdir, prefix="refs/"):
+    # {refname: oid} for loose and packed refs under prefix; loose refs win
+    commondir = common_dir(gitdir)
+    refs = {r: oid for r, oid in packed_refs(commondir).items() if r.startswith(prefix)}
+    base = os.path.join(commondir, *prefix.rstrip("/").split("/"))
+    for root, _, files in os.walk(base):
+        for name in files:
+            ref = os.path.relpath(os.path.join(root, name), commondir).replace(os.sep, "/")
+            value = _read_first_line(os.path.join(root, name))
+            if value and not value.startswith("ref:"):
+                refs[ref] = value
+    return refs
+
+
+def resolve_name(gitdir, name):
+    # Commit-ish for a branch, tag or ref name, in git's lookup order; None
+    # for anything else (revision expressions, abbreviated oids)
+    if not name or ".." in name or name.startswith("/") or "\\" in name:
+        return None
+    if name == "HEAD" or name.startswith("refs/"):
+        return resolve_ref(gitdir, name)
+    for ref in (f"refs/{name}", f"refs/tags/{name}", f"refs/heads/{name}",
+                f"refs/remotes/{name}", f"refs/remotes/{name}/HEAD"):
+        oid = resolve_ref(gitdir, ref)
+        if oid:
+            return oid
+    return None
+
+
+def local_branches(gitdir):
+    names = set()
+    heads = os.path.join(common_dir(gitdir), "refs", "heads")
+    for root, _, files in os.walk(heads):
+        for name in files:
+            names.add(os.path.relpath(os.path.join(root, name), heads).replace(os.sep, "/"))
+    for ref in packed_refs(common_dir(gitdir)):
+        if ref.startswith("refs/heads/"):
+            names.add(ref[len("refs/heads/"):])
+    return sorted(names)
+
+
+def _unquote(value):
+    out = []
+    quoted = False
+    i = 0
+    while i < len(value):
+        c = value[i]
+        if c == '"':
+            quoted = not quoted
+        elif c == "\\" and i + 1 < len(value):
+            i += 1
+            out.append({"n": "\n", "t": "\t", "b": "\b"}.get(value[i], value[i]))
+        elif c in "#;" and not quoted:
+            break
+        else:
+            out.append(c)
+        i += 1
+    return "".join(out).strip()
+
+
+def parse_config(text):
+    # {"section.subsection.key": [values]}, sections/keys lower-cased as git does
+    config = {}
+    section = ""
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1:line.index("]")] if "]" in line else line[1:]
+            if '"' in header:
+                name, _, sub = header.partition('"')
+                section = name.strip().lower() + "." + sub.rsplit('"', 1)[0].replace('\\"', '"')
+            else:
+                section = header.strip().lower()
+            rest = line[line.index("]") + 1:].strip() if "]" in line else ""
+            if not rest:
+                continue
+            line = rest
+        key, sep, value = line.partition("=")
+        key = section + "." + key.strip().lower()
+        config.setdefault(key, []).append(_unquote(value) if sep else "true")
+    return config
+
+
+_configs = {}
+_configs_lock = threading.Lock()
+
+
+def read_config(gitdir):
+    path = os.path.join(common_dir(gitdir), "config")
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    with _configs_lock:
+        cached = _configs.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+    with open(path, encoding="utf-8", errors="replace") as f:
+        config = parse_config(f.read())
+    with _configs_lock:
+        _configs[path] = (key, config)
+    return config
+
+
+def config_get(config, key, default=None):
+    # Last value wins, as with ``git config --get``
+    section, _, rest = key.partition(".")
+    sub, _, name = rest.rpartition(".")
+    key = section.lower() + ("." + sub if sub else "") + "." + name.lower()
+    values = config.get(key)
+    return values[-1] if values else default
+
+
+def remote_url(repo, remote="origin"):
+    gitdir = git_dir(repo)
+    if not gitdir:
+        return None
+    return config_get(read_config(gitdir), f"remote.{remote}.url")
+
+
+def upstream_ref(gitdir, branch):
+    if not branch:
+        return None
+    config = read_config(gitdir)
+    remote = config_get(config, f"branch.{branch}.remote")
+    merge = config_get(config, f"branch.{branch}.merge")
+    if not remote or not merge:
+        return None
+    if remote == ".":
+        return merge
+    if merge.startswith("refs/heads/"):
+        return f"refs/remotes/{remote}/{merge[len('refs/heads/'):]}"
+    return None
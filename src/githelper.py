@@ -0,0 +1,163 @@
+import time
+import atexit
+import threading
+import subprocess
+from collections import OrderedDict
+
+import tracing
+from gitcmd import git_command
+from gitfs import git_dir, resolve_name
+
+# Revision lookups over long-lived ``git cat-file`` processes, so
+# a query is a pipe round-trip instead of a fork/exec. Names gitfs can
+# resolve on its own never reach git at all.
+
+
+class CatFile:
+    """``git cat-file --batch-check`` for one repository.
+
+    The process is started on first use and serves requests one at a time;
+    a helper that dies or answers garbage is closed and restarted on the
+    next request.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.last_used = time.monotonic()
+        self.closed = False
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def _running(self):
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            started = time.perf_counter_ns()
+            proc = self._proc = subprocess.Popen(git_command(self.repo, "cat-file", "--batch-check"),
+                                                 stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                                 stderr=subprocess.DEVNULL)
+            if tracing.enabled:
+                tracing.record("cat-file start", "githelper", started, time.perf_counter_ns(),
+                               {"repo": self.repo})
+        return proc
+
+    def info(self, rev):
+        # (oid, type, size), or None if rev names no object
+        if not rev or "\n" in rev:
+            return None
+        with self._lock:
+            self.last_used = time.monotonic()
+            started = time.perf_counter_ns() if tracing.enabled else 0
+            try:
+                proc = self._running()
+                proc.stdin.write(rev.encode() + b"\n")
+                proc.stdin.flush()
+                header = proc.stdout.readline().decode("utf-8", "replace").split()
+                if not header:
+                    self._close_locked()  # EOF: the helper died
+                    return None
+                if header[-1] in ("missing", "ambiguous"):
+                    return None
+                return header[0], header[1], int(header[2])
+            except (OSError, ValueError, IndexError):
+                self._close_locked()
+                return None
+            finally:
+                if tracing.enabled:
+                    tracing.record("batch-check", "githelper", started, time.perf_counter_ns(),
+                                   {"repo": self.repo, "rev": rev})
+                if self.closed:
+                    # Evicted while the caller held on to it
+                    self._close_locked()
+
+    def _close_locked(self):
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._close_locked()
+
+
+class HelperPool:
+    """Keeps at most ``max_helpers`` CatFile helpers, least recently used
+    evicted first. Helpers idle for ``idle_timeout`` seconds are closed by a
+    reaper thread that exits once the pool is empty.
+    """
+
+    def __init__(self, max_helpers=16, idle_timeout=30.0):
+        self.max_helpers = max_helpers
+        self.idle_timeout = idle_timeout
+        self._helpers = OrderedDict()  # repo: CatFile
+        self._reaper = None
+        self._cond = threading.Condition()
+
+    def helper(self, repo):
+        evicted = None
+        with self._cond:
+            helper = self._helpers.get(repo)
+            if helper is None:
+                helper = self._helpers[repo] = CatFile(repo)
+                if len(self._helpers) > self.max_helpers:
+                    _, evicted = self._helpers.popitem(last=False)
+                if self._reaper is None:
+                    self._reaper = threading.Thread(target=self._reap, daemon=True)
+                    self._reaper.start()
+            else:
+                self._helpers.move_to_end(repo)
+        if evicted is not None:
+            evicted.close()
+        return helper
+
+    def __len__(self):
+        with self._cond:
+            return len(self._helpers)
+
+    def resolve(self, repo, rev):
+        # Object id rev names; ref and branch names are read from disk first
+        gitdir = git_dir(repo)
+        if not gitdir:
+            return None
+        oid = resolve_name(gitdir, rev)
+        if oid:
+            return oid
+        info = self.helper(repo).info(rev)
+        return info[0] if info else None
+
+    def _reap(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.idle_timeout / 2)
+                now = time.monotonic()
+                idle = [repo for repo, h in self._helpers.items() if now - h.last_used > self.idle_timeout]
+                closing = [self._helpers.pop(repo) for repo in idle]
+                done = not self._helpers
+                if done:
+                    self._reaper = None
+            for helper in closing:
+                helper.close()
+            if done:
+                return
+
+    def close(self):
+        with self._cond:
+            helpers = list(self._helpers.values())
+            self._helpers.clear()
+            self._cond.notify_all()
+        for helper in helpers:
+            helper.close()
+
+
+helpers = HelperPool()
+atexit.register(helpers.close)
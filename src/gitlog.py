@@ -0,0 +1,138 @@
+import os
+import time
+import signal
+import threading
+import subprocess
+
+import tracing
+from gitcmd import git_command
+
+# One commit per NUL-terminated record, fields split by the unit separator
+LOG_FORMAT = "%H%x1f%h%x1f%an%x1f%ae%x1f%at%x1f%D%x1f%s"
+
+
+class Commit:
+    __slots__ = ("oid", "short", "author", "email", "time", "refs", "subject")
+
+    def __init__(self, oid, short, author, email, time, refs, subject):
+        self.oid = oid
+        self.short = short
+        self.author = author
+        self.email = email
+        self.time = time
+        self.refs = refs
+        self.subject = subject
+
+
+def parse_commit(record):
+    fields = record.decode("utf-8", "replace").split("\x1f")
+    if len(fields) != 7:
+        return None
+    oid, short, author, email, at, refs, subject = fields
+    return Commit(oid, short, author, email, int(at or 0), refs, subject)
+
+
+def log_args(rev=None, author=None, paths=None):
+    args = ["log", "-z", f"--format={LOG_FORMAT}", "--no-color"]
+    if author:
+        args.extend([f"--author={author}", "--regexp-ignore-case"])
+    args.append(rev or "HEAD")
+    if paths:
+        args.append("--")
+        args.extend(paths)
+    return args
+
+
+class LogReader:
+    """Streams ``git log`` output a page at a time.
+
+    git is started on the first ``read`` and left blocked on its pipe
+    between pages, so only as much history is walked as has been asked
+    for. ``close`` stops git early, or keeps it from starting at all; it
+    does not wait for a ``read`` in progress.
+    """
+
+    def __init__(self, repo, rev=None, author=None, paths=None, chunk_size=65536):
+        self.repo = repo
+        self.args = log_args(rev, author, paths)
+        self.chunk_size = chunk_size
+        self.at_end = False
+        self.error = None
+        self._closed = False
+        self._proc = None
+        self._buf = b""
+        self._started_ns = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self._started_ns = time.perf_counter_ns()
+        self._proc = subprocess.Popen(
+            git_command(self.repo, *self.args), stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True)
+
+    def read(self, count):
+        # Returns up to ``count`` commits; fewer only at the end of history
+        with self._lock:
+            if self.at_end or self._closed:
+                return []
+            if self._proc is None:
+                self._start()
+                if self._closed:
+                    # close() ran while git was starting and may have missed it
+                    self._stop(self._proc)
+                    return []
+            commits = []
+            while len(commits) < count:
+                end = self._buf.find(b"\0")
+                if end < 0:
+                    chunk = self._proc.stdout.read1(self.chunk_size)
+                    if not chunk:
+                        self._finish()
+                        if self._buf.strip():
+                            commit = parse_commit(self._buf.strip(b"\n"))
+                            if commit:
+                                commits.append(commit)
+                        self._buf = b""
+                        break
+                    self._buf += chunk
+                    self._bytes += len(chunk)
+                    continue
+                record = self._buf[:end].lstrip(b"\n")
+                self._buf = self._buf[end + 1:]
+                commit = parse_commit(record)
+                if commit:
+                    commits.append(commit)
+            return commits
+
+    def _finish(self):
+        self.at_end = True
+        self._proc.stdout.close()
+        err = self._proc.stderr.read().decode("utf-8", "replace").strip()
+        self._proc.stderr.close()
+        returncode = self._proc.wait()
+        if returncode != 0 and not self._closed:
+            self.error = err.splitlines()[0] if err else "git log failed"
+        if tracing.enabled:
+            tracing.record_git(self.args, self.repo, self._started_ns, time.perf_counter_ns(),
+                               returncode, self._bytes)
+
+    def close(self):
+        self._closed = True
+        self.at_end = True
+        proc = self._proc
+        if proc is not None:
+            self._stop(proc)
+
+    def _stop(self, proc):
+        self.at_end = True
+        if proc.poll() is not None:
+            return
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except OSError:
+            proc.terminate()
+        proc.wait()
+        if tracing.enabled:
+            tracing.record_git(self.args, self.repo, self._started_ns, time.perf_counter_ns(),
+                               proc.returncode, self._bytes)
@@ -0,0 +1,1876 @@
+import sys
+import os
+import time
+import shutil
+import subprocess
+import threading
+from functools import partial, lru_cache
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QLineEdit, QLabel, QProgressBar, QMessageBox, QHeaderView, QInputDialog,
+    QListView, QSplitter, QSizePolicy, QGroupBox, QDialog, QTableView, QComboBox, QTabWidget,
+    QCheckBox, QFileDialog
+)
+from PyQt5.QtCore import (
+    Qt, QThread, QObject, QTimer, pyqtSignal, QSize, QAbstractListModel, QAbstractTableModel,
+    QModelIndex, QSortFilterProxyModel
+)
+from PyQt5.QtGui import QPalette, QColor, QFont
+
+from config import load_config, save_config
+from discovery import RepoDiscovery
+from repo_index import DiscoveryIndex
+from fastpath import CleanCache
+from watcher import RepoWatcher
+from scheduler import StatusScheduler, PRIORITY_SELECTED, PRIORITY_VISIBLE, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from status import RepoStatus, repo_status, describe_change, supersedes, commit_message, parse_porcelain_v2
+from tiered import StatusCosts, TieredStatus
+from export import export_statuses, import_statuses, LEGACY_EXPORT_FILE
+from jobs import GitJob, JobQueue, DONE, CANCELLED
+from gitcmd import run_git
+from sync import BulkSync, FETCH, PULL, summary_text
+from maintenance import BulkMaintenance, survey, flagged, summary_text as maintenance_summary
+from gitlog import LogReader
+from commitcache import CommitCache, CachedLogReader
+from gitfs import git_dir, local_branches, read_head, repo_link, object_store, remote_url
+from search import SearchIndex
+from registry import RepoRegistry
+from refresh import RefreshPlanner, PowerSource
+import tracing
+
+def auto_commit_step(repo, job):
+    # GitJob step: commit whatever ``add`` staged, named in the message
+    result = run_git(repo, "status", "--porcelain=v2", "-z", text=False)
+    if result.returncode != 0:
+        job.output.append(result.stderr.decode("utf-8", "replace").strip() or "git status failed")
+        return None
+    files = parse_porcelain_v2(result.stdout, RepoStatus(repo)).files
+    if not files:
+        job.output.append("No changes to commit.")
+        return None
+    return ["commit", "-m", commit_message(files)]
+
+
+class GitScannerThread(QThread):
+    progress = pyqtSignal(int)
+    repo_found = pyqtSignal(str)
+    scan_complete = pyqtSignal()
+
+    def __init__(self, roots=None, ignore=None, nested=False, workers=None, use_index=True, on_repo=None,
+                 linked=True):
+        super().__init__()
+        self.discovery = RepoDiscovery(
+            roots or ["~"], ignore=ignore, nested=nested, workers=workers,
+            on_repo=on_repo or self.repo_found.emit, on_progress=self.report_progress,
+            index=DiscoveryIndex() if use_index else None, linked=linked)
+        self.last_percent = 0
+
+    def report_progress(self, fraction, scanned):
+        percent = int(fraction * 100)
+        if percent > self.last_percent:
+            self.last_percent = percent
+            self.progress.emit(percent)
+
+    def cancel(self):
+        self.discovery.cancel()
+
+    def run(self):
+        self.discovery.run()
+        self.scan_complete.emit()
+
+class ResultBatcher(QObject):
+    """Buffers results from worker threads and hands them to the GUI in batches.
+
+    The first result into an empty buffer arms a single-shot timer, so the
+    GUI thread sees at most one delivery per ``interval_ms`` (or one per
+    ``max_batch`` results when they arrive faster than that). Repeated
+    statuses or change notices for the same repo are coalesced.
+    """
+    wake = pyqtSignal()
+    flush_now = pyqtSignal()
+
+    def __init__(self, handler, interval_ms=50, max_batch=500, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._repos = []
+        self._statuses = {}
+        self._changed = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self.wake.connect(self._arm)
+        self.flush_now.connect(self.flush)
+
+    def _pending(self):
+        return len(self._repos) + len(self._statuses) + len(self._changed)
+
+    def _pushed(self, was_empty, size):
+        if was_empty:
+            self.wake.emit()
+        elif size == self.max_batch:
+            self.flush_now.emit()
+
+    def add_repo(self, repo_path):
+        with self._lock:
+            was_empty = not self._pending()
+            self._repos.append(repo_path)
+            size = self._pending()
+        self._pushed(was_empty, size)
+
+    def add_status(self, status):
+        with self._lock:
+            was_empty = not self._pending()
+            if supersedes(status, self._statuses.get(status.path)):
+                self._statuses[status.path] = status
+            size = self._pending()
+        self._pushed(was_empty, size)
+
+    def add_change(self, repo_path):
+        with self._lock:
+            was_empty = not self._pending()
+            self._changed.add(repo_path)
+            size = self._pending()
+        self._pushed(was_empty, size)
+
+    def _arm(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    @tracing.traced("gui")
+    def flush(self):
+        self._timer.stop()
+        with self._lock:
+            repos, statuses, changed = self._repos, self._statuses, self._changed
+            self._repos, self._statuses, self._changed = [], {}, set()
+        if repos or statuses or changed:
+            self.handler(repos, list(statuses.values()), changed)
+
+PATH_ROLE = Qt.UserRole
+SORT_ROLE = Qt.UserRole + 1
+LINK_LABELS = {"worktree": "Worktree", "submodule": "Submodule"}
+
+# Checkouts sharing an object store, for grouping status work; a repo's
+# store practically never changes while the app runs
+repo_group = lru_cache(maxsize=None)(object_store)
+
+
+class RepoListModel(QAbstractListModel):
+    # Sidebar rows, one per registry record, keyed by record id; rows are only
+    # ever appended, so updates touch a single index (or one span per batch),
+    # and only rows whose record version moved since they were drawn.
+    # Worktrees and submodules sort directly under the checkout they belong
+    # to and are drawn indented.
+    def __init__(self, registry, parent=None):
+        super().__init__(parent)
+        self.registry = registry
+        self._records = []  # RepoRecord per row
+        self._shown = []  # record version each row was last drawn at
+        self._rows = {}  # record id: row
+        self._links = {}  # repo_path: (kind, parent path)
+        self._children = {}  # parent path: [repo paths]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        status = self._records[index.row()].status
+        link = self._links.get(status.path)
+        if role == Qt.DisplayRole:
+            if link:
+                indent = "    " * self._depth(status.path)
+                name = os.path.basename(status.path) if link[0] == "worktree" else status.name
+                return f"{indent}↳ {status.emoji} {name}"
+            return f"{status.emoji} {status.name}"
+        if role == Qt.ToolTipRole:
+            tip = f"{status.short_path}\n{status.message}"
+            if link:
+                tip += f"\n{LINK_LABELS[link[0]]} of {link[1]}"
+            return tip
+        if role == PATH_ROLE:
+            return status.path
+        if role == SORT_ROLE:
+            return self._sort_key(status.path)
+        return None
+
+    def _sort_key(self, path, depth=0):
+        # Children sort right after their parent: "parent key" + "\x01" + own name
+        status = self.registry.status(path)
+        name = (status.name if status else os.path.basename(path)).lower()
+        link = self._links.get(path)
+        if not link or depth > 8:
+            return f"{name}\x00{path}"
+        return f"{self._sort_key(link[1], depth + 1)}\x01{os.path.basename(path).lower()}\x00{path}"
+
+    def _depth(self, path):
+        depth = 0
+        while path in self._links and depth < 8:
+            path = self._links[path][1]
+            depth += 1
+        return depth
+
+    def _descendants(self, paths):
+        # Rows whose sort key depends on any of ``paths``
+        rows = []
+        stack = list(paths)
+        while stack:
+            for child in self._children.get(stack.pop(), ()):
+                record = self.registry.get(child)
+                row = None if record is None else self._rows.get(record.id)
+                if row is not None:
+                    rows.append(row)
+                stack.append(child)
+        return rows
+
+    def row(self, record_id):
+        return self._rows.get(record_id)
+
+    @tracing.traced("gui")
+    def add_many(self, records):
+        new = [r for r in records if r.id not in self._rows]
+        if not new:
+            return
+        for record in new:
+            link = repo_link(record.path)
+            if link and link[1]:
+                self._links[record.path] = link
+                self._children.setdefault(link[1], []).append(record.path)
+        first = len(self._records)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        for record in new:
+            self._rows[record.id] = len(self._records)
+            self._records.append(record)
+            self._shown.append(record.version)
+        self.endInsertRows()
+        # Children listed before their parent arrived sort under it now
+        rows = self._descendants([r.path for r in new])
+        rows = [r for r in rows if r < first]
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+
+    @tracing.traced("gui")
+    def update_many(self, records):
+        # Redraws rows whose record version moved; returns those records
+        moved = []
+        rows = []
+        for record in records:
+            row = self._rows.get(record.id)
+            if row is not None and self._shown[row] != record.version:
+                self._shown[row] = record.version
+                moved.append(record)
+                rows.append(row)
+                # A new name re-sorts the rows listed under this one
+                rows.extend(self._descendants([record.path]))
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+        return moved
+
+    def remove(self, record_id):
+        row = self._rows.get(record_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        record = self._records.pop(row)
+        del self._shown[row]
+        self._rows = {r.id: i for i, r in enumerate(self._records)}
+        link = self._links.pop(record.path, None)
+        if link:
+            self._children[link[1]].remove(record.path)
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._records = []
+        self._shown = []
+        self._rows = {}
+        self._links = {}
+        self._children = {}
+        self.endResetModel()
+
+
+class RepoFilterProxy(QSortFilterProxyModel):
+    # Either a plain substring filter, or a ranking from the search index that
+    # both picks and orders the rows shown
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filter_text = ""
+        self.ranks = None  # source row: rank while a search is active
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+
+    def set_filter_text(self, text):
+        self.filter_text = text.lower()
+        self.invalidateFilter()
+
+    def set_ranking(self, ranks):
+        self.ranks = ranks
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.ranks is not None:
+            return source_row in self.ranks
+        if not self.filter_text:
+            return True
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return (self.filter_text in index.data(SORT_ROLE)
+                or self.filter_text in index.data(PATH_ROLE).lower())
+
+    def lessThan(self, left, right):
+        if self.ranks is not None:
+            return self.ranks.get(left.row(), 0) < self.ranks.get(right.row(), 0)
+        return super().lessThan(left, right)
+
+
+# Changed-file filters by porcelain XY code
+FILE_FILTERS = [
+    ("All changes", None),
+    ("Staged", lambda xy: xy[0] not in ".?!" and "U" not in xy),
+    ("Unstaged", lambda xy: xy[1] not in ".?!" and "U" not in xy),
+    ("Untracked", lambda xy: xy == "??"),
+    ("Conflicts", lambda xy: "U" in xy or xy in ("AA", "DD")),
+    ("Deleted", lambda xy: "D" in xy),
+]
+
+
+class ChangedFilesModel(QAbstractTableModel):
+    # Reads straight from RepoStatus.files; sorting and filtering reorder a
+    # list of row numbers, and cells are only built for rows the view paints
+    COLUMNS = ["", "File", "Status"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font = QFont("Arial", 13)
+        self.files = []
+        self.order = []  # visible rows as indices into self.files
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self.kind_filter = None
+        self.text_filter = ""
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        xy, path = self.files[self.order[index.row()]]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 1:
+                return path
+            icon, label = describe_change(xy)
+            return icon if col == 0 else label
+        if role == Qt.FontRole and col:
+            return self.font
+        if role == Qt.TextAlignmentRole and col == 0:
+            return Qt.AlignCenter
+        if role == Qt.ToolTipRole:
+            return f"{xy}  {path}"
+        return None
+
+    def set_files(self, files):
+        files = files or []
+        if files == self.files:
+            return
+        self.beginResetModel()
+        self.files = files
+        self.order = self._visible_rows()
+        self.endResetModel()
+
+    def set_filter(self, kind=None, text=""):
+        self.kind_filter = kind
+        self.text_filter = text.lower()
+        self.beginResetModel()
+        self.order = self._visible_rows()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        self.order = self._visible_rows()
+        self.layoutChanged.emit()
+
+    def _visible_rows(self):
+        files, kind, text = self.files, self.kind_filter, self.text_filter
+        rows = range(len(files))
+        if kind is not None or text:
+            rows = [i for i in rows
+                    if (kind is None or kind(files[i][0])) and (not text or text in files[i][1].lower())]
+        if self.sort_column == 1:
+            key = lambda i: files[i][1]
+        elif self.sort_column in (0, 2):
+            key = lambda i: (describe_change(files[i][0])[1], files[i][1])
+        else:
+            return list(rows)
+        return sorted(rows, key=key, reverse=self.sort_order == Qt.DescendingOrder)
+
+
+class ExportThread(QThread):
+    exported = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, statuses, path):
+        super().__init__()
+        self.statuses = statuses
+        self.path = path
+
+    def run(self):
+        try:
+            self.exported.emit(export_statuses(self.statuses, self.path))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class LogModel(QAbstractTableModel):
+    # Commit history read a page at a time as the view scrolls. Pages are
+    # read off the GUI thread; a query change bumps the generation so pages
+    # still in flight for the old query are dropped.
+    COLUMNS = ["Commit", "Date", "Author", "Refs", "Subject"]
+    page_ready = pyqtSignal(int, object)
+    loaded = pyqtSignal()
+
+    def __init__(self, commit_cache=None, page_size=200, parent=None):
+        super().__init__(parent)
+        self.commit_cache = commit_cache
+        self.page_size = page_size
+        self.commits = []
+        self.reader = None
+        self.fetching = False
+        self.generation = 0
+        self.page_ready.connect(self._add_page)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.commits)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        commit = self.commits[index.row()]
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return commit.short
+            if col == 1:
+                return time.strftime("%Y-%m-%d %H:%M", time.localtime(commit.time))
+            if col == 2:
+                return commit.author
+            if col == 3:
+                return commit.refs
+            return commit.subject
+        if role == Qt.ToolTipRole:
+            return f"{commit.oid}\n{commit.author} <{commit.email}>\n\n{commit.subject}"
+        return None
+
+    def set_query(self, repo, rev=None, author=None):
+        self.close()
+        self.generation += 1
+        self.beginResetModel()
+        self.commits = []
+        if self.commit_cache is not None:
+            self.reader = CachedLogReader(self.commit_cache, repo, rev=rev or None, author=author or None)
+        else:
+            self.reader = LogReader(repo, rev=rev or None, author=author or None)
+        self.fetching = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (not parent.isValid() and self.reader is not None
+                and not self.reader.at_end and not self.fetching)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.fetching = True
+        threading.Thread(target=self._read_page, args=(self.reader, self.generation, self.page_size),
+                         daemon=True).start()
+
+    def _read_page(self, reader, generation, count):
+        # Always answers, so a failed read cannot leave the model fetching
+        try:
+            commits = reader.read(count)
+        except Exception as e:
+            commits = []
+            reader.error = str(e) or type(e).__name__
+            reader.close()
+        self.page_ready.emit(generation, commits)
+
+    def _add_page(self, generation, commits):
+        if generation != self.generation:
+            return
+        self.fetching = False
+        if commits:
+            first = len(self.commits)
+            self.beginInsertRows(QModelIndex(), first, first + len(commits) - 1)
+            self.commits.extend(commits)
+            self.endInsertRows()
+        self.loaded.emit()
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+
+
+class LogDialog(QDialog):
+    def __init__(self, manager, repo, author=""):
+        super().__init__(manager)
+        self.repo = repo
+        self.setWindowTitle(f"Log - {os.path.basename(repo)}")
+        self.setStyleSheet(manager.styleSheet())
+        self.resize(1000, 600)
+        layout = QVBoxLayout(self)
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Branch:"))
+        self.branch_box = QComboBox()
+        self.branch_box.setEditable(True)
+        self.branch_box.addItem("HEAD")
+        gitdir = git_dir(repo)
+        if gitdir:
+            self.branch_box.addItems(local_branches(gitdir))
+        filter_layout.addWidget(self.branch_box, 1)
+        filter_layout.addWidget(QLabel("Author:"))
+        self.author_edit = QLineEdit(author)
+        self.author_edit.setPlaceholderText("All authors")
+        filter_layout.addWidget(self.author_edit, 2)
+        layout.addLayout(filter_layout)
+        self.model = LogModel(manager.commit_cache, parent=self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QTableView.SelectRows)
+        self.view.setEditTriggers(QTableView.NoEditTriggers)
+        self.view.verticalHeader().hide()
+        # Fixed row heights let the view skip measuring rows it does not draw
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(24)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        for col, width in enumerate((80, 130, 150, 160)):
+            self.view.setColumnWidth(col, width)
+        layout.addWidget(self.view)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+
+        # Filters restart the reader once typing pauses
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(self.apply_filters)
+        self.author_edit.textChanged.connect(self.filter_timer.start)
+        self.branch_box.currentTextChanged.connect(self.filter_timer.start)
+        self.model.loaded.connect(self.update_status)
+        self.apply_filters()
+
+    def apply_filters(self):
+        self.status_label.setText("Loading...")
+        self.model.set_query(self.repo, self.branch_box.currentText().strip(), self.author_edit.text().strip())
+
+    def update_status(self):
+        reader = self.model.reader
+        count = len(self.model.commits)
+        if reader.error:
+            self.status_label.setText(f"❌ {reader.error}")
+        elif reader.at_end:
+            self.status_label.setText(f"{count} commits")
+        else:
+            self.status_label.setText(f"{count} commits loaded, scroll for more")
+        if getattr(reader, "cached", False):
+            self.status_label.setText(self.status_label.text() + " (from cache)")
+
+    def done(self, result):
+        self.filter_timer.stop()
+        self.model.close()
+        super().done(result)
+
+
+class JobBridge(QObject):
+    # JobQueue callbacks arrive on worker threads; these signals queue them
+    # onto the GUI thread
+    updated = pyqtSignal(object)
+    finished = pyqtSignal(object)
+
+
+class BatchStatusDialog(QDialog):
+    # Opens from the cached status records and refreshes the stale ones in
+    # the background, updating rows as results arrive
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.manager = manager
+        self.setWindowTitle("Batch Status - All Repositories")
+        self.setStyleSheet(manager.styleSheet())
+        self.resize(900, 500)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("All repositories and their statuses:"))
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Status", "Name", "Path", "Message"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.progress = QProgressBar()
+        layout.addWidget(self.progress)
+        btn_layout = QHBoxLayout()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel)
+        btn_layout.addWidget(self.cancel_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.rows = {}
+        statuses = manager.registry.statuses()
+        self.table.setRowCount(len(statuses))
+        for row, status in enumerate(statuses):
+            self.rows[status.path] = row
+            self.set_row(row, status)
+
+        config = load_config()
+        stale = [s.path for s in statuses if s.is_stale(config["batch_max_age"])]
+        self.total = len(stale)
+        self.completed = 0
+        self.progress.setRange(0, max(self.total, 1))
+        self.progress.setValue(0 if self.total else 1)
+        self.cancel_btn.setEnabled(bool(self.total))
+        self.results = ResultBatcher(self.apply_results, parent=self)
+        self.scheduler = StatusScheduler(
+            partial(repo_status, clean_cache=manager.clean_cache),
+            on_result=self.results.add_status, max_workers=config["status_workers"], group_of=repo_group)
+        for repo in stale:
+            self.scheduler.submit(repo)
+
+    def set_row(self, row, status):
+        for col, text in enumerate((status.emoji, status.name, status.short_path, status.message)):
+            self.table.setItem(row, col, QTableWidgetItem(text))
+
+    def apply_results(self, repos, statuses, changed):
+        for status in statuses:
+            row = self.rows.get(status.path)
+            if row is not None:
+                self.set_row(row, status)
+        self.manager.apply_results([], statuses, ())
+        self.completed += len(statuses)
+        self.progress.setValue(self.completed)
+        if self.completed >= self.total:
+            self.cancel_btn.setEnabled(False)
+
+    def cancel(self):
+        self.scheduler.cancel()
+        self.cancel_btn.setEnabled(False)
+        self.progress.setFormat(f"Cancelled after {self.completed} of {self.total}")
+
+    def done(self, result):
+        self.scheduler.shutdown(wait=False)
+        super().done(result)
+
+
+class SyncDialog(QDialog):
+    # Fetch/Pull All: fans out over every repo with global and per-host
+    # limits and fills a summary table as repos finish
+    item_done = pyqtSignal(object)
+
+    def __init__(self, manager, mode):
+        super().__init__(manager)
+        self.manager = manager
+        self.setWindowTitle("Fetch All" if mode == FETCH else "Pull All")
+        self.setStyleSheet(manager.styleSheet())
+        self.resize(1000, 500)
+        layout = QVBoxLayout(self)
+        self.summary = QLabel("")
+        layout.addWidget(self.summary)
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["", "Name", "Host", "Upstream", "Result", "Time"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.progress = QProgressBar()
+        layout.addWidget(self.progress)
+        btn_layout = QHBoxLayout()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel)
+        btn_layout.addWidget(self.cancel_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        config = load_config()
+        self.sync = BulkSync(manager.registry.paths(), mode=mode, max_workers=config["sync_workers"],
+                             per_host=config["sync_per_host"], on_result=self.item_done.emit)
+        # Rows follow the plan order, so repos sharing a remote sit together
+        self.rows = {}
+        self.table.setRowCount(self.sync.total)
+        for row, item in enumerate(self.sync.items):
+            self.rows[item.repo] = row
+            self.set_row(row, item, "⏳", "Waiting...")
+        self.finished_items = []
+        self.progress.setRange(0, max(self.sync.total, 1))
+        self.progress.setValue(0)
+        self.item_done.connect(self.add_result)
+        self.thread = threading.Thread(target=self.sync.run, daemon=True)
+        self.thread.start()
+
+    def set_row(self, row, item, icon, message):
+        status = self.manager.registry.status(item.repo)
+        name = status.name if status else os.path.basename(item.repo)
+        time_text = f"{item.elapsed:.1f}s" if item.elapsed else ""
+        for col, text in enumerate((icon, name, item.host, item.upstream or "", message, time_text)):
+            self.table.setItem(row, col, QTableWidgetItem(text))
+
+    def add_result(self, item):
+        icon = "➖" if item.skipped else "✅" if item.ok else "❌"
+        self.set_row(self.rows[item.repo], item, icon, item.message)
+        self.finished_items.append(item)
+        self.progress.setValue(len(self.finished_items))
+        self.summary.setText(summary_text(self.finished_items))
+        if item.ok:
+            self.manager.refresh_repo(item.repo)
+        if len(self.finished_items) >= self.sync.total:
+            self.cancel_btn.setEnabled(False)
+
+    def cancel(self):
+        self.sync.cancel()
+        self.cancel_btn.setEnabled(False)
+        self.progress.setFormat(f"Cancelled after {len(self.finished_items)} of {self.sync.total}")
+
+    def done(self, result):
+        self.sync.cancel()
+        super().done(result)
+
+
+class MaintenanceDialog(QDialog):
+    # Object store health of every repo, worst first; flagged stores get
+    # git maintenance in a small low-priority pool, with status timed before
+    # and after
+    surveyed = pyqtSignal(object)
+    item_done = pyqtSignal(object)
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.manager = manager
+        self.setWindowTitle("Maintenance")
+        self.setStyleSheet(manager.styleSheet())
+        self.resize(1100, 520)
+        layout = QVBoxLayout(self)
+        self.summary = QLabel("Checking repositories...")
+        layout.addWidget(self.summary)
+        self.table = QTableWidget(0, 9)
+        self.table.setHorizontalHeaderLabels(["", "Name", "Loose", "Packs", "Commit-graph", "Tasks",
+                                              "Status before", "Status after", "Result"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.progress = QProgressBar()
+        layout.addWidget(self.progress)
+        btn_layout = QHBoxLayout()
+        self.run_btn = QPushButton("Run Maintenance")
+        self.run_btn.setEnabled(False)
+        self.run_btn.clicked.connect(self.run)
+        btn_layout.addWidget(self.run_btn)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+        btn_layout.addWidget(self.cancel_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.items = []
+        self.rows = {}
+        self.finished_items = []
+        self.maintenance = None
+        self.progress.setRange(0, 0)
+        self.surveyed.connect(self.show_survey)
+        self.item_done.connect(self.add_result)
+        paths = manager.registry.paths()
+        self.thread = threading.Thread(target=lambda: self.surveyed.emit(survey(paths)), daemon=True)
+        self.thread.start()
+
+    def show_survey(self, items):
+        self.items = items
+        self.table.setRowCount(len(items))
+        for row, item in enumerate(items):
+            self.rows[item.repo] = row
+            icon = "➖" if item.skipped else "⚠️" if item.tasks else "✅"
+            self.set_row(row, item, icon)
+        need = flagged(items)
+        self.summary.setText(f"{len(need)} of {len(items)} object stores need maintenance")
+        self.progress.setRange(0, max(len(need), 1))
+        self.progress.setValue(0 if need else 1)
+        self.run_btn.setText(f"Run Maintenance ({len(need)})")
+        self.run_btn.setEnabled(bool(need))
+
+    def set_row(self, row, item, icon):
+        status = self.manager.registry.status(item.repo)
+        name = status.name if status else os.path.basename(item.repo)
+        before, after = (f"{t * 1000:.0f} ms" if t is not None else "" for t in (item.before, item.after))
+        values = (icon, name, str(item.loose), str(item.packs), "yes" if item.commit_graph else "no",
+                  ", ".join(item.tasks), before, after, item.message)
+        for col, text in enumerate(values):
+            self.table.setItem(row, col, QTableWidgetItem(text))
+
+    def run(self):
+        config = load_config()
+        self.run_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.maintenance = BulkMaintenance(flagged(self.items), max_workers=config["maintenance_workers"],
+                                           on_result=self.item_done.emit, costs=self.manager.status_costs)
+        for item in self.maintenance.items:
+            self.set_row(self.rows[item.repo], item, "⏳")
+        self.thread = threading.Thread(target=self.maintenance.run, daemon=True)
+        self.thread.start()
+
+    def add_result(self, item):
+        self.set_row(self.rows[item.repo], item, "✅" if item.ok else "❌")
+        self.finished_items.append(item)
+        self.progress.setValue(len(self.finished_items))
+        self.summary.setText(maintenance_summary(self.finished_items))
+        if item.ok:
+            self.manager.refresh_repo(item.repo)
+        if len(self.finished_items) >= self.maintenance.total:
+            self.cancel_btn.setEnabled(False)
+
+    def cancel(self):
+        if self.maintenance:
+            self.maintenance.cancel()
+        self.cancel_btn.setEnabled(False)
+        self.progress.setFormat(f"Cancelled after {len(self.finished_items)}")
+
+    def done(self, result):
+        if self.maintenance:
+            self.maintenance.cancel()
+        super().done(result)
+
+
+class DiagnosticsDialog(QDialog):
+    # Slowest repos and git commands plus aggregate counters from the tracer
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.setWindowTitle("Diagnostics")
+        self.setStyleSheet(manager.styleSheet())
+        self.resize(1000, 560)
+        layout = QVBoxLayout(self)
+        self.enabled_check = QCheckBox(f"Record timings (or set {tracing.ENV_VAR}=1)")
+        self.enabled_check.setChecked(tracing.enabled)
+        self.enabled_check.toggled.connect(self.set_enabled)
+        layout.addWidget(self.enabled_check)
+        tabs = QTabWidget()
+        self.repos_table = self.make_table(["Repository", "git calls", "Total ms", "Max ms"])
+        tabs.addTab(self.repos_table, "Slowest repos")
+        self.commands_table = self.make_table(["ms", "Command", "Repository", "Exit", "Bytes"])
+        tabs.addTab(self.commands_table, "Slowest git commands")
+        self.counters_table = self.make_table(["Counter", "Count", "Total ms", "Mean ms", "Max ms"])
+        tabs.addTab(self.counters_table, "Counters")
+        layout.addWidget(tabs)
+        btn_layout = QHBoxLayout()
+        for text, slot in (("Refresh", self.refresh), ("Reset", self.reset),
+                           ("Export trace...", self.export), ("Close", self.accept)):
+            btn = QPushButton(text)
+            btn.clicked.connect(slot)
+            btn_layout.addWidget(btn)
+        layout.addLayout(btn_layout)
+        self.refresh()
+
+    def make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSortingEnabled(True)
+        return table
+
+    def fill(self, table, rows):
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                item = QTableWidgetItem()
+                if isinstance(value, float):
+                    item.setData(Qt.DisplayRole, round(value, 2))
+                elif isinstance(value, int):
+                    item.setData(Qt.DisplayRole, value)
+                else:
+                    item.setText("" if value is None else str(value))
+                table.setItem(r, c, item)
+        table.setSortingEnabled(True)
+
+    def refresh(self):
+        self.fill(self.repos_table, tracing.slowest_repos(100))
+        self.fill(self.commands_table, [(ms, cmd, repo, rc, size) for ms, cmd, repo, rc, size
+                                        in tracing.slowest_commands()])
+        counters = sorted(tracing.counters().items(), key=lambda kv: -kv[1][1])
+        self.fill(self.counters_table, [(name, count, total, total / count if count else 0.0, peak)
+                                        for name, (count, total, peak) in counters])
+
+    def set_enabled(self, on):
+        if on:
+            tracing.enable()
+        else:
+            tracing.disable()
+        config = load_config()
+        config["trace"] = on
+        save_config(config)
+
+    def reset(self):
+        tracing.reset()
+        self.refresh()
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", os.path.expanduser("~/gitcompass-trace.json"), "Chrome trace (*.json)")
+        if not path:
+            return
+        try:
+            count = tracing.export_chrome(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Trace", f"Export failed: {e}")
+            return
+        QMessageBox.information(self, "Export Trace",
+                                f"Wrote {count} events to {path}\nOpen it in ui.perfetto.dev or chrome://tracing.")
+
+
+class GitManager(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.threads = []  # Keep references to all threads
+        self.setWindowTitle("GitCompass - Git Repository Manager")
+        self.setGeometry(100, 100, 1100, 650)
+        self.registry = RepoRegistry()
+        self.selected_repo = None
+        self.search_index = SearchIndex()
+        self.search_version = 0  # index version the current search ran against
+        self.results = ResultBatcher(self.apply_results, parent=self)
+        config = load_config()
+        if config["trace"]:
+            tracing.enable()
+        self.clean_cache = CleanCache().load() if config["status_fastpath"] else None
+        self.commit_cache = CommitCache() if config["log_cache"] else None
+        self.status_costs = None
+        status_worker = partial(repo_status, clean_cache=self.clean_cache)
+        if config["status_tiered"]:
+            self.status_costs = StatusCosts().load()
+            status_worker = TieredStatus(
+                self.status_costs, self.clean_cache, deadline=config["status_deadline"],
+                resubmit=lambda repo: self.status_scheduler.submit(repo, PRIORITY_BACKGROUND),
+                accelerate=config["status_fsmonitor"])
+        self.status_scheduler = StatusScheduler(
+            status_worker,
+            on_result=self.results.add_status,
+            max_workers=config["status_workers"], group_of=repo_group)
+        self.job_bridge = JobBridge(self)
+        self.job_bridge.updated.connect(self.job_updated)
+        self.job_bridge.finished.connect(self.job_finished)
+        self.jobs = JobQueue(self.job_bridge.updated.emit, self.job_bridge.finished.emit,
+                             max_jobs=config["job_workers"])
+        self.job_messages = {}  # job id: (success, failure) messages
+        self.watcher = None
+        if config["watch"]:
+            self.watcher = RepoWatcher(self.results.add_change, backend=config["watch_backend"])
+            self.watcher.start()
+        self.refresh_planner = None
+        if config["refresh"]:
+            self.refresh_planner = RefreshPlanner(self.status_costs, budget=config["refresh_budget"])
+            self.power = None if config["refresh_on_battery"] else PowerSource()
+            self.refresh_timer = QTimer(self)
+            self.refresh_timer.setInterval(1000)
+            self.refresh_timer.timeout.connect(self.refresh_tick)
+            self.refresh_timer.start()
+        self.init_ui()
+
+    def show_welcome(self):
+        welcome_flag = os.path.expanduser("~/.gitcompass_welcomed")
+        if not os.path.exists(welcome_flag):
+            QMessageBox.information(self, "Welcome to GitCompass!",
+                "Welcome to GitCompass!\n\nA beautiful, Discord-themed Git repository manager.\n\nSelect a repository and use the action buttons below to get started.\n\nEnjoy hacking!\n\n- Goal651")
+            with open(welcome_flag, "w") as f:
+                f.write("1\n")
+
+    def init_ui(self):
+        self.set_discord_theme()
+        splitter = QSplitter(Qt.Horizontal)
+        self.setCentralWidget(splitter)
+
+        # Sidebar: Repo list
+        sidebar_widget = QWidget()
+        sidebar_layout = QVBoxLayout(sidebar_widget)
+        sidebar_layout.setContentsMargins(0, 0, 0, 0)
+        sidebar_layout.setSpacing(0)
+        sidebar_label = QLabel("Repositories")
+        sidebar_label.setFont(QFont("Arial", 15, QFont.Bold))
+        sidebar_label.setStyleSheet("padding: 16px 0 8px 16px; color: #fff;")
+        sidebar_layout.addWidget(sidebar_label)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search name, path, remote, branch...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setStyleSheet('''
+            QLineEdit {
+                background-color: #2f3136;
+                color: #fff;
+                border: 1px solid #18191c;
+                border-radius: 4px;
+                padding: 6px;
+                margin: 0 12px 8px 12px;
+                font-size: 15px;
+            }
+        ''')
+        # Queries run once typing pauses, not on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(120)
+        self.search_timer.timeout.connect(lambda: self.filter_repos(self.search_edit.text()))
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        self.search_edit.returnPressed.connect(self.select_first_match)
+        sidebar_layout.addWidget(self.search_edit)
+        self.repo_model = RepoListModel(self.registry, self)
+        self.repo_proxy = RepoFilterProxy(self)
+        self.repo_proxy.setSourceModel(self.repo_model)
+        self.repo_proxy.sort(0)
+        self.repo_list = QListView()
+        self.repo_list.setModel(self.repo_proxy)
+        self.repo_list.setUniformItemSizes(True)
+        self.repo_list.setEditTriggers(QListView.NoEditTriggers)
+        self.repo_list.setAlternatingRowColors(True)
+        self.repo_list.setStyleSheet('''
+            QListView {
+                background-color: #23272a;
+                color: #fff;
+                border-right: 2px solid #18191c;
+                font-size: 17px;
+                padding: 0 0 0 0;
+            }
+            QListView::item {
+                padding: 10px 0 10px 12px;
+            }
+            QListView::item:selected {
+                background-color: #5865f2;
+                color: #fff;
+            }
+            QListView::item:hover {
+                background-color: #4752c4;
+            }
+        ''')
+        self.repo_list.setFixedWidth(300)
+        self.repo_list.selectionModel().currentChanged.connect(self.sidebar_select_repo)
+        # Lambdas drop the signal arguments, which the traced wrapper would forward
+        self.repo_list.verticalScrollBar().valueChanged.connect(lambda *_: self.prioritize_visible())
+        self.repo_proxy.rowsInserted.connect(lambda *_: self.prioritize_visible())
+        sidebar_layout.addWidget(self.repo_list)
+        sidebar_layout.addStretch(1)
+        sidebar_widget.setStyleSheet('''
+            QWidget {
+                background-color: #23272a;
+                border-right: 2px solid #18191c;
+            }
+        ''')
+        splitter.addWidget(sidebar_widget)
+
+        # Main panel: Actions and details
+        main_panel = QWidget()
+        main_panel.setStyleSheet('''
+            QWidget {
+                background-color: #36393f;
+                border-left: 2px solid #18191c;
+            }
+        ''')
+        main_layout = QVBoxLayout(main_panel)
+        main_layout.setContentsMargins(32, 32, 32, 32)
+        main_layout.setSpacing(18)
+
+        # Repo details/status at top
+        self.repo_title = QLabel("")
+        self.repo_title.setFont(QFont("Arial", 22, QFont.Bold))
+        self.repo_title.setStyleSheet("color: #fff; padding-bottom: 2px;")
+        main_layout.addWidget(self.repo_title)
+        self.repo_path_label = QLabel("")
+        self.repo_path_label.setFont(QFont("Arial", 13))
+        self.repo_path_label.setStyleSheet("color: #b9bbbe; padding-bottom: 2px;")
+        main_layout.addWidget(self.repo_path_label)
+        self.repo_status_label = QLabel("")
+        self.repo_status_label.setFont(QFont("Arial", 15))
+        self.repo_status_label.setStyleSheet("color: #fff; padding-bottom: 8px;")
+        main_layout.addWidget(self.repo_status_label)
+
+        # Button bar for repo actions (at top, below status)
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(14)
+        # Explicitly create each button with the correct variable name
+        self.add_commit_btn = QPushButton("📝 Add & Commit")
+        self.add_commit_btn.setToolTip("Add all changes and commit (Ctrl+C)")
+        self.add_commit_btn.clicked.connect(self.add_commit)
+        self.add_commit_btn.setShortcut("Ctrl+C")
+        btn_layout.addWidget(self.add_commit_btn)
+
+        self.push_btn = QPushButton("⬆️ Push")
+        self.push_btn.setToolTip("Push to remote (Ctrl+P)")
+        self.push_btn.clicked.connect(self.push)
+        self.push_btn.setShortcut("Ctrl+P")
+        btn_layout.addWidget(self.push_btn)
+
+        self.pull_btn = QPushButton("⬇️ Pull")
+        self.pull_btn.setToolTip("Pull latest changes (Ctrl+L)")
+        self.pull_btn.clicked.connect(self.pull)
+        self.pull_btn.setShortcut("Ctrl+L")
+        btn_layout.addWidget(self.pull_btn)
+
+        self.status_btn = QPushButton("📋 Status")
+        self.status_btn.setToolTip("Show git status (Ctrl+S)")
+        self.status_btn.clicked.connect(self.show_status)
+        self.status_btn.setShortcut("Ctrl+S")
+        btn_layout.addWidget(self.status_btn)
+
+        self.log_btn = QPushButton("📜 Log")
+        self.log_btn.setToolTip("Browse the commit log (Ctrl+G)")
+        self.log_btn.clicked.connect(self.show_log)
+        self.log_btn.setShortcut("Ctrl+G")
+        btn_layout.addWidget(self.log_btn)
+
+        self.stash_btn = QPushButton("📦 Stash")
+        self.stash_btn.setToolTip("Stash changes (Ctrl+T)")
+        self.stash_btn.clicked.connect(self.stash)
+        self.stash_btn.setShortcut("Ctrl+T")
+        btn_layout.addWidget(self.stash_btn)
+
+        self.pop_stash_btn = QPushButton("📤 Pop Stash")
+        self.pop_stash_btn.setToolTip("Pop latest stash (Ctrl+O)")
+        self.pop_stash_btn.clicked.connect(self.pop_stash)
+        self.pop_stash_btn.setShortcut("Ctrl+O")
+        btn_layout.addWidget(self.pop_stash_btn)
+
+        self.advanced_log_btn = QPushButton("🔍 Advanced Log")
+        self.advanced_log_btn.setToolTip("Filter the log by author or branch (Ctrl+A)")
+        self.advanced_log_btn.clicked.connect(self.advanced_log)
+        self.advanced_log_btn.setShortcut("Ctrl+A")
+        btn_layout.addWidget(self.advanced_log_btn)
+
+        self.delete_repo_btn = QPushButton("🗑️ Delete Repo")
+        self.delete_repo_btn.setToolTip("Delete selected repository")
+        self.delete_repo_btn.clicked.connect(self.delete_repo)
+        btn_layout.addWidget(self.delete_repo_btn)
+
+        self.clone_repo_btn = QPushButton("➕ Clone Repo")
+        self.clone_repo_btn.setToolTip("Clone a new repository")
+        self.clone_repo_btn.clicked.connect(self.clone_repo)
+        btn_layout.addWidget(self.clone_repo_btn)
+
+        self.sync_btn = QPushButton("🔃 Fetch/Pull All")
+        self.sync_btn.setToolTip("Fetch or pull every repository")
+        self.sync_btn.clicked.connect(self.sync_all)
+        btn_layout.addWidget(self.sync_btn)
+
+        self.batch_status_btn = QPushButton("📊 Batch Status")
+        self.batch_status_btn.setToolTip("Show status for all repositories")
+        self.batch_status_btn.clicked.connect(self.batch_status)
+        btn_layout.addWidget(self.batch_status_btn)
+
+        self.export_btn = QPushButton("💾 Export")
+        self.export_btn.setToolTip("Export repository list/statuses")
+        self.export_btn.clicked.connect(self.export_repos)
+        btn_layout.addWidget(self.export_btn)
+
+        self.import_btn = QPushButton("📂 Import")
+        self.import_btn.setToolTip("Import repository list/statuses")
+        self.import_btn.clicked.connect(self.import_repos)
+        btn_layout.addWidget(self.import_btn)
+
+        self.rescan_btn = QPushButton("🔄 Rescan")
+        self.rescan_btn.setToolTip("Scan for repositories again (F5)")
+        self.rescan_btn.clicked.connect(self.rescan)
+        self.rescan_btn.setShortcut("F5")
+        btn_layout.addWidget(self.rescan_btn)
+
+        self.settings_btn = QPushButton("⚙️ Settings")
+        self.settings_btn.setToolTip("Settings/configuration")
+        self.settings_btn.clicked.connect(self.show_settings)
+        btn_layout.addWidget(self.settings_btn)
+
+        self.diagnostics_btn = QPushButton("🩺 Diagnostics")
+        self.diagnostics_btn.setToolTip("Timings for scans, git commands and UI refreshes")
+        self.diagnostics_btn.clicked.connect(self.show_diagnostics)
+        btn_layout.addWidget(self.diagnostics_btn)
+
+        self.maintenance_btn = QPushButton("🧹 Maintenance")
+        self.maintenance_btn.setToolTip("Check object stores and run git maintenance on slow repositories")
+        self.maintenance_btn.clicked.connect(self.show_maintenance)
+        btn_layout.addWidget(self.maintenance_btn)
+
+        self.help_btn = QPushButton("❓ Help/About")
+        self.help_btn.setToolTip("Show help/about dialog")
+        self.help_btn.clicked.connect(self.show_help)
+        btn_layout.addWidget(self.help_btn)
+        main_layout.addLayout(btn_layout)
+
+        # Changed files widget (always visible)
+        self.changed_files_group = QGroupBox("Changed Files")
+        self.changed_files_group.setStyleSheet('''
+            QGroupBox {
+                font-size: 16px;
+                font-weight: bold;
+                border: 2px solid #5865f2;
+                border-radius: 8px;
+                margin-top: 10px;
+                background-color: #23272a;
+                color: #fff;
+            }
+            QGroupBox:title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 3px 0 3px;
+            }
+        ''')
+        self.changed_files_model = ChangedFilesModel(self)
+        self.changed_files_widget = QTableView()
+        self.changed_files_widget.setModel(self.changed_files_model)
+        self.changed_files_widget.setSelectionBehavior(QTableView.SelectRows)
+        self.changed_files_widget.setEditTriggers(QTableView.NoEditTriggers)
+        self.changed_files_widget.setAlternatingRowColors(True)
+        self.changed_files_widget.setWordWrap(False)
+        self.changed_files_widget.verticalHeader().hide()
+        # Fixed row heights so the view never measures rows it does not draw
+        self.changed_files_widget.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.changed_files_widget.verticalHeader().setDefaultSectionSize(26)
+        header = self.changed_files_widget.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        header.resizeSection(0, 40)
+        header.resizeSection(2, 220)
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.changed_files_widget.setSortingEnabled(True)
+        self.changed_files_widget.setStyleSheet('''
+            QTableView {
+                font-size: 15px;
+                background-color: #36393f;
+                color: #fff;
+                border-radius: 6px;
+                border: 1px solid #23272a;
+                alternate-background-color: #2f3136;
+            }
+            QTableView::item:selected {
+                background-color: #5865f2;
+                color: #fff;
+            }
+        ''')
+        files_filter_layout = QHBoxLayout()
+        self.files_kind_box = QComboBox()
+        self.files_kind_box.addItems([label for label, _ in FILE_FILTERS])
+        self.files_kind_box.currentIndexChanged.connect(self.filter_changed_files)
+        files_filter_layout.addWidget(self.files_kind_box)
+        self.files_filter_edit = QLineEdit()
+        self.files_filter_edit.setPlaceholderText("Filter files...")
+        self.files_filter_edit.textChanged.connect(self.filter_changed_files)
+        files_filter_layout.addWidget(self.files_filter_edit, 1)
+        vbox = QVBoxLayout()
+        vbox.addLayout(files_filter_layout)
+        vbox.addWidget(self.changed_files_widget)
+        self.changed_files_group.setLayout(vbox)
+        main_layout.addWidget(self.changed_files_group)
+
+        # Background git operations
+        job_layout = QHBoxLayout()
+        self.job_label = QLabel("")
+        self.job_label.setFont(QFont("Arial", 13))
+        self.job_label.setStyleSheet("color: #b9bbbe;")
+        job_layout.addWidget(self.job_label, 1)
+        self.cancel_jobs_btn = QPushButton("⏹ Cancel")
+        self.cancel_jobs_btn.setToolTip("Cancel running git operations")
+        self.cancel_jobs_btn.clicked.connect(lambda: self.jobs.cancel())
+        self.cancel_jobs_btn.hide()
+        job_layout.addWidget(self.cancel_jobs_btn)
+        main_layout.addLayout(job_layout)
+
+        # Progress bar at bottom
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        self.progress_bar.setStyleSheet('''
+            QProgressBar {
+                background-color: #23272a;
+                color: #fff;
+                border-radius: 6px;
+                text-align: center;
+                font-size: 16px;
+                margin-top: 18px;
+            }
+            QProgressBar::chunk {
+                background-color: #5865f2;
+            }
+        ''')
+        main_layout.addWidget(self.progress_bar)
+
+        splitter.addWidget(main_panel)
+        splitter.setSizes([320, 900])
+
+        # Show welcome dialog on first launch
+        self.show_welcome()
+
+        # Start scanning (moved to end to avoid AttributeError)
+        self.start_scan()
+
+    def start_scan(self):
+        config = load_config()
+        self.scanner = GitScannerThread(
+            roots=config["scan_roots"], ignore=config["scan_ignore"],
+            nested=config["scan_nested"], workers=config["scan_workers"],
+            use_index=config["scan_index"], on_repo=self.results.add_repo, linked=config["scan_linked"])
+        self.threads.append(self.scanner)
+        self.scanner.progress.connect(self.progress_bar.setValue)
+        self.scanner.scan_complete.connect(self.results.flush)
+        self.scanner.scan_complete.connect(lambda: self.progress_bar.setValue(100))
+        self.scanner.finished.connect(self.reap_threads)
+        self.progress_bar.setValue(0)
+        self.scanner.start()
+
+    def rescan(self):
+        self.scanner.cancel()
+        self.scanner.wait()
+        self.status_scheduler.cancel()
+        if self.watcher:
+            self.watcher.clear()
+        self.results.flush()
+        self.registry.clear()
+        if self.refresh_planner is not None:
+            self.refresh_planner.clear()
+        self.selected_repo = None
+        self.repo_model.clear()
+        self.search_index.clear()
+        self.refresh_main_panel()
+        self.start_scan()
+
+    def reap_threads(self):
+        self.threads = [t for t in self.threads if t.isRunning()]
+
+    def set_discord_theme(self):
+        palette = QPalette()
+        palette.setColor(QPalette.Window, QColor(54, 57, 63))  # Discord dark background
+        palette.setColor(QPalette.WindowText, Qt.white)
+        palette.setColor(QPalette.Base, QColor(47, 49, 54))
+        palette.setColor(QPalette.AlternateBase, QColor(54, 57, 63))
+        palette.setColor(QPalette.ToolTipBase, Qt.white)
+        palette.setColor(QPalette.ToolTipText, Qt.white)
+        palette.setColor(QPalette.Text, Qt.white)
+        palette.setColor(QPalette.Button, QColor(88, 101, 242))  # Discord blurple
+        palette.setColor(QPalette.ButtonText, Qt.white)
+        palette.setColor(QPalette.Highlight, QColor(88, 101, 242))
+        palette.setColor(QPalette.HighlightedText, Qt.white)
+        palette.setColor(QPalette.BrightText, Qt.red)
+        self.setPalette(palette)
+        self.setStyleSheet('''
+            QTableWidget, QLineEdit, QLabel, QProgressBar {
+                font-size: 14px;
+            }
+            QTableWidget {
+                background-color: #36393f;
+                color: #fff;
+                gridline-color: #23272a;
+                selection-background-color: #5865f2;
+                selection-color: #fff;
+            }
+            QHeaderView::section {
+                background-color: #23272a;
+                color: #fff;
+                font-weight: bold;
+            }
+            QLineEdit {
+                background-color: #23272a;
+                color: #fff;
+                border: 1px solid #5865f2;
+                border-radius: 4px;
+                padding: 4px;
+            }
+            QPushButton {
+                background-color: #5865f2;
+                color: #fff;
+                border-radius: 4px;
+                padding: 6px 12px;
+            }
+            QPushButton:hover {
+                background-color: #4752c4;
+            }
+            QProgressBar {
+                background-color: #23272a;
+                color: #fff;
+                border-radius: 4px;
+                text-align: center;
+            }
+            QProgressBar::chunk {
+                background-color: #5865f2;
+            }
+        ''')
+
+    @tracing.traced("gui")
+    def apply_results(self, repos, statuses, changed):
+        # One batch from ResultBatcher: new repos, finished statuses, changed repos
+        new = [record for record in map(self.registry.add_path, repos) if record]
+        self.repo_model.add_many(new)
+        for record in new:
+            self.search_index.update(record.path)
+            if self.refresh_planner is not None:
+                self.refresh_planner.add(record.path)
+            self.refresh_repo(record.path)
+            if self.watcher:
+                self.watcher.watch(record.path)
+        fresh = [record for record in map(self.registry.update, statuses) if record]
+        if self.refresh_planner is not None:
+            for record in fresh:
+                self.refresh_planner.refreshed(record.status)
+        # Statuses that show nothing new are stored but not redrawn or reindexed
+        moved = self.repo_model.update_many(fresh)
+        for record in moved:
+            status = record.status
+            self.search_index.update(status.path, status.name, remote_url(status.path), status.branch)
+        if self.search_edit.text().strip() and self.search_index.version != self.search_version:
+            self.search_timer.start()
+        for repo_path in changed:
+            if self.refresh_planner is not None:
+                self.refresh_planner.touch(repo_path)
+            self.refresh_repo(repo_path)
+        if any(record.path == self.selected_repo for record in moved):
+            self.refresh_main_panel()
+
+    def add_repo(self, repo_path):
+        self.apply_results([repo_path], [], ())
+
+    def refresh_tick(self):
+        # Background refresh of repos whose deadline passed, unless the window
+        # is out of sight, the machine is on battery or status work is queued
+        planner = self.refresh_planner
+        battery = self.power is not None and self.power.on_battery()
+        planner.paused = self.isMinimized() or not self.isVisible() or battery
+        if self.status_scheduler.pending():
+            return
+        for repo in planner.due():
+            if repo in self.registry:
+                self.refresh_repo(repo, PRIORITY_BACKGROUND)
+
+    def refresh_repo(self, repo_path, priority=PRIORITY_NORMAL):
+        if repo_path not in self.registry:
+            return
+        if repo_path == self.selected_repo:
+            priority = PRIORITY_SELECTED
+        self.status_scheduler.submit(repo_path, priority)
+
+    @tracing.traced("gui")
+    def refresh_main_panel(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            self.repo_title.setText("")
+            self.repo_path_label.setText("")
+            self.repo_status_label.setText("")
+            self.changed_files_model.set_files(None)
+            self.changed_files_group.setTitle("Changed Files")
+            for btn in [self.add_commit_btn, self.push_btn, self.pull_btn, self.status_btn, self.log_btn, self.stash_btn, self.pop_stash_btn, self.advanced_log_btn, self.delete_repo_btn]:
+                btn.setEnabled(False)
+            return
+        status = self.registry.status(repo) or RepoStatus(repo)
+        self.repo_title.setText(f"{status.emoji} {status.name}")
+        self.repo_path_label.setText(f"{status.short_path}")
+        branch = status.branch or "(detached)"
+        if status.upstream:
+            branch += f" → {status.upstream}"
+        self.repo_status_label.setText(f"<b>Status:</b> {status.message} &nbsp; <b>Branch:</b> {branch}")
+        for btn in [self.add_commit_btn, self.push_btn, self.pull_btn, self.status_btn, self.log_btn, self.stash_btn, self.pop_stash_btn, self.advanced_log_btn, self.delete_repo_btn]:
+            btn.setEnabled(True)
+        self.changed_files_model.set_files(status.files)
+        self.update_changed_files_title()
+        self.changed_files_group.show()
+        self.changed_files_widget.show()
+
+    def filter_changed_files(self, *_):
+        kind = FILE_FILTERS[self.files_kind_box.currentIndex()][1]
+        self.changed_files_model.set_filter(kind, self.files_filter_edit.text())
+        self.update_changed_files_title()
+
+    def update_changed_files_title(self):
+        model = self.changed_files_model
+        title = "Changed Files"
+        if model.files:
+            shown, total = model.rowCount(), len(model.files)
+            title += f" ({total:,})" if shown == total else f" ({shown:,} of {total:,})"
+        self.changed_files_group.setTitle(title)
+
+    @tracing.traced("gui")
+    def filter_repos(self, text):
+        self.search_version = self.search_index.version
+        if not text.strip():
+            self.repo_proxy.set_ranking(None)
+        else:
+            ranks = {}
+            for rank, (path, _) in enumerate(self.search_index.search(text, limit=500)):
+                record = self.registry.get(path)
+                row = None if record is None else self.repo_model.row(record.id)
+                if row is not None:
+                    ranks[row] = rank
+            self.repo_proxy.set_ranking(ranks)
+        self.prioritize_visible()
+
+    def select_first_match(self):
+        self.search_timer.stop()
+        self.filter_repos(self.search_edit.text())
+        if self.repo_proxy.rowCount():
+            self.repo_list.setCurrentIndex(self.repo_proxy.index(0, 0))
+
+    def sidebar_select_repo(self, current, previous=None):
+        self.selected_repo = current.data(PATH_ROLE) if current.isValid() else None
+        if self.selected_repo:
+            self.status_scheduler.prioritize([self.selected_repo], PRIORITY_SELECTED)
+        if self.refresh_planner is not None:
+            self.refresh_planner.select(self.selected_repo)
+        self.refresh_main_panel()
+
+    @tracing.traced("gui")
+    def prioritize_visible(self):
+        viewport = self.repo_list.viewport().rect()
+        first = self.repo_list.indexAt(viewport.topLeft()).row()
+        last = self.repo_list.indexAt(viewport.bottomLeft()).row()
+        if first < 0:
+            return
+        if last < 0:
+            last = self.repo_proxy.rowCount() - 1
+        visible = [self.repo_proxy.index(i, 0).data(PATH_ROLE) for i in range(first, last + 1)]
+        self.status_scheduler.prioritize(visible, PRIORITY_VISIBLE)
+
+    def get_selected_repo(self):
+        return self.selected_repo
+
+    def add_commit(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("Commit Message")
+        msg_box.setText("Generate commit message automatically?")
+        msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+        choice = msg_box.exec_()
+        if choice == QMessageBox.Cancel:
+            return
+        if choice == QMessageBox.Yes:
+            status = self.registry.status(repo)
+            if status and not status.partial and not status.is_stale(load_config()["batch_max_age"]):
+                if not status.files:
+                    QMessageBox.warning(self, "Error", "No changes to commit.")
+                    return
+                commit = ["commit", "-m", commit_message(status.files)]
+            else:
+                # Too old to trust: read what got staged on the job's thread
+                commit = partial(auto_commit_step, repo)
+        else:
+            commit_msg, ok = QInputDialog.getText(self, "Commit Message", "Enter commit message:")
+            if not ok or not commit_msg:
+                return
+            commit = ["commit", "-m", commit_msg]
+        self.start_job(GitJob(f"Commit {os.path.basename(repo)}", repo, [["add", "."], commit]),
+                       "✅ Changes committed successfully.", "❌ Commit failed.")
+
+    def push(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        gitdir = git_dir(repo)
+        branch_list = local_branches(gitdir) if gitdir else []
+        if not branch_list:
+            QMessageBox.warning(self, "Error", "No branches found.")
+            return
+        branch, ok = QInputDialog.getItem(self, "Select Branch", "Branch to push:", branch_list, editable=False)
+        if not ok or not branch:
+            return
+        self.start_job(GitJob(f"Push {os.path.basename(repo)}", repo, [["push", "--progress", "origin", branch]]),
+                       f"✅ Pushed to remote branch '{branch}'.", "❌ Push failed.")
+
+    def pull(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        gitdir = git_dir(repo)
+        # Detached HEAD pulls the remote's HEAD, as ``rev-parse --abbrev-ref`` gave
+        branch_name = (read_head(gitdir)[0] or "HEAD") if gitdir else "main"
+        self.start_job(GitJob(f"Pull {os.path.basename(repo)}", repo, [["pull", "--progress", "origin", branch_name]]),
+                       f"✅ Pulled latest changes for branch '{branch_name}'.", "❌ Pull failed.")
+
+    def show_status(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        result = subprocess.run(["git", "-C", repo, "status"], capture_output=True, text=True)
+        QMessageBox.information(self, "Git Status", result.stdout)
+
+    def show_log(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        LogDialog(self, repo).exec_()
+
+    def stash(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        self.start_job(GitJob(f"Stash {os.path.basename(repo)}", repo, [["stash"]]),
+                       "✅ Changes stashed successfully.", "❌ Failed to stash changes.")
+
+    def pop_stash(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        self.start_job(GitJob(f"Pop stash {os.path.basename(repo)}", repo, [["stash", "pop"]]),
+                       "✅ Latest stash applied successfully.", "❌ Failed to pop stash.")
+
+    def advanced_log(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        dialog = LogDialog(self, repo)
+        dialog.author_edit.setFocus()
+        dialog.exec_()
+
+    def delete_repo(self):
+        repo = self.get_selected_repo()
+        if not repo:
+            return
+        name = os.path.basename(repo)
+        confirm = QMessageBox.question(self, "Delete Repository", f"Are you sure you want to delete '{name}'? This cannot be undone.", QMessageBox.Yes | QMessageBox.No)
+        if confirm != QMessageBox.Yes:
+            return
+        confirm2, ok = QInputDialog.getText(self, "Confirm Deletion", "Type 'delete' to permanently remove this repository:")
+        if not ok or confirm2 != "delete":
+            QMessageBox.information(self, "Cancelled", "Deletion cancelled.")
+            return
+        try:
+            shutil.rmtree(repo)
+            QMessageBox.information(self, "Success", "✅ Repository deleted successfully.")
+            record = self.registry.remove(repo)
+            if self.refresh_planner is not None:
+                self.refresh_planner.remove(repo)
+            if self.watcher:
+                self.watcher.unwatch(repo)
+            if record is not None:
+                self.repo_model.remove(record.id)
+            self.search_index.remove(repo)
+            self.filter_repos(self.search_edit.text())
+            self.selected_repo = None
+            self.refresh_main_panel()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"❌ Failed to delete repository. {e}")
+
+    def clone_repo(self):
+        url, ok1 = QInputDialog.getText(self, "Clone Repository", "Enter the git repository URL:")
+        if not ok1 or not url:
+            return
+        dest, ok2 = QInputDialog.getText(self, "Clone Repository", "Enter the destination directory (leave blank for default):")
+        if not ok2:
+            return
+        if not dest:
+            # Where a plain "git clone <url>" would put it
+            dest = url.rstrip("/").split("/")[-1].split(":")[-1]
+            if dest.endswith(".git"):
+                dest = dest[:-4]
+        dest = os.path.abspath(os.path.expanduser(dest))
+        self.start_job(GitJob(f"Clone {os.path.basename(dest)}", None, [["clone", "--progress", url, dest]], target=dest),
+                       "✅ Repository cloned successfully.", "❌ Failed to clone repository.")
+
+    def start_job(self, job, success, failure):
+        self.job_messages[job.id] = (success, failure)
+        self.jobs.submit(job)
+
+    def job_updated(self, job):
+        if job.finished:
+            return
+        self.cancel_jobs_btn.show()
+        running = [j for j in self.jobs.jobs() if not j.finished]
+        text = job.title
+        if job.phase:
+            text += f": {job.phase}"
+        if len(running) > 1:
+            text += f" (+{len(running) - 1} more)"
+        self.job_label.setText(text)
+        if job.percent is None:
+            self.progress_bar.setRange(0, 0)  # busy indicator until git reports progress
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(job.percent)
+
+    def job_finished(self, job):
+        success, failure = self.job_messages.pop(job.id)
+        if job.state == DONE:
+            self.statusBar().showMessage(f"{job.title}: {success}", 5000)
+            if job.repo is None:
+                self.add_repo(job.target)  # clone
+        elif job.state == CANCELLED:
+            self.statusBar().showMessage(f"{job.title}: cancelled", 5000)
+        else:
+            QMessageBox.critical(self, "Error", f"{failure}\n\n{job.error}".rstrip())
+        # Only the repo the job touched needs re-reading
+        if job.target in self.registry:
+            self.refresh_repo(job.target)
+        remaining = [j for j in self.jobs.jobs() if not j.finished]
+        if remaining:
+            self.job_updated(remaining[-1])
+            return
+        self.cancel_jobs_btn.hide()
+        self.job_label.setText(success if job.state == DONE else "")
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(100)
+
+    def sync_all(self):
+        if not self.registry:
+            return
+        box = QMessageBox(self)
+        box.setWindowTitle("Fetch/Pull All")
+        box.setText(f"Update all {len(self.registry)} repositories?\n\n"
+                    "Fetch only downloads; Pull also fast-forwards each checked-out branch.")
+        fetch_btn = box.addButton("Fetch All", QMessageBox.AcceptRole)
+        pull_btn = box.addButton("Pull All", QMessageBox.AcceptRole)
+        box.addButton(QMessageBox.Cancel)
+        box.exec_()
+        if box.clickedButton() not in (fetch_btn, pull_btn):
+            return
+        dialog = SyncDialog(self, FETCH if box.clickedButton() is fetch_btn else PULL)
+        dialog.exec_()
+
+    def batch_status(self):
+        dialog = BatchStatusDialog(self)
+        dialog.exec_()
+
+    def export_repos(self):
+        default = os.path.expanduser("~/gitcompass_export.jsonl")
+        export_file, _ = QFileDialog.getSaveFileName(
+            self, "Export Repositories", default, "JSON Lines (*.jsonl);;CSV (*.csv)")
+        if not export_file:
+            return
+        # Records are replaced, never mutated, so a shallow snapshot is safe to
+        # hand to the writer thread
+        statuses = self.registry.statuses()
+        self.export_thread = ExportThread(statuses, export_file)
+        self.export_thread.exported.connect(
+            lambda count: QMessageBox.information(self, "Export", f"Exported {count} repositories to {export_file}"))
+        self.export_thread.failed.connect(
+            lambda error: QMessageBox.critical(self, "Export", f"Export failed: {error}"))
+        self.threads.append(self.export_thread)
+        self.export_thread.finished.connect(self.reap_threads)
+        self.export_thread.start()
+
+    def import_repos(self):
+        start = LEGACY_EXPORT_FILE if os.path.exists(LEGACY_EXPORT_FILE) else os.path.expanduser("~")
+        import_file, _ = QFileDialog.getOpenFileName(
+            self, "Import Repositories", start, "Exports (*.jsonl *.csv *.txt);;All files (*)")
+        if not import_file:
+            return
+        try:
+            statuses = list(import_statuses(import_file))
+        except Exception as e:
+            QMessageBox.critical(self, "Import", f"Import failed: {e}")
+            return
+        added = self.seed_statuses(statuses)
+        QMessageBox.information(self, "Import", f"Imported {len(statuses)} repositories ({added} new) from {import_file}")
+
+    def seed_statuses(self, statuses):
+        # Adds imported records as-is; repos present on this machine are
+        # re-read in the background
+        new = [record for record in map(self.registry.add, statuses) if record]
+        self.repo_model.add_many(new)
+        for record in new:
+            if os.path.isdir(record.path):
+                if self.refresh_planner is not None:
+                    self.refresh_planner.add(record.path)
+                self.status_scheduler.submit(record.path, PRIORITY_BACKGROUND)
+                if self.watcher:
+                    self.watcher.watch(record.path)
+        return len(new)
+
+    def show_settings(self):
+        config = load_config()
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Settings")
+        dialog.setStyleSheet(self.styleSheet())
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel("Set default branch (used for push/pull):"))
+        branch_edit = QLineEdit(config["default_branch"])
+        layout.addWidget(branch_edit)
+        layout.addWidget(QLabel("Ignore while scanning (comma-separated names or paths):"))
+        ignore_edit = QLineEdit(", ".join(config["scan_ignore"]))
+        layout.addWidget(ignore_edit)
+        nested_check = QCheckBox("Find repositories nested inside other repositories")
+        nested_check.setChecked(bool(config["scan_nested"]))
+        layout.addWidget(nested_check)
+        save_btn = QPushButton("Save")
+        layout.addWidget(save_btn)
+        def save():
+            config["default_branch"] = branch_edit.text()
+            config["scan_ignore"] = [p.strip() for p in ignore_edit.text().split(",") if p.strip()]
+            config["scan_nested"] = nested_check.isChecked()
+            save_config(config)
+            dialog.accept()
+        save_btn.clicked.connect(save)
+        dialog.setLayout(layout)
+        dialog.exec_()
+
+    def show_diagnostics(self):
+        DiagnosticsDialog(self).exec_()
+
+    def show_maintenance(self):
+        MaintenanceDialog(self).exec_()
+
+    def show_help(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Help / About GitCompass")
+        dialog.setStyleSheet(self.styleSheet())
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel("<b>GitCompass v1.0.0</b> - Your Git Repository Navigator"))
+        layout.addWidget(QLabel("<b>Features:</b>"))
+        layout.addWidget(QLabel("- Scan and manage all your Git repositories from one place."))
+        layout.addWidget(QLabel("- See status indicators for uncommitted and unpushed changes."))
+        layout.addWidget(QLabel("- Add/commit, push, pull, view status, and see recent commit log."))
+        layout.addWidget(QLabel("- Stash, pop, advanced log, delete, clone, batch status, export/import."))
+        layout.addWidget(QLabel("- User-friendly, Discord-themed interface."))
+        layout.addWidget(QLabel("<br>Status Legend: 🟢 Clean  🟡 Uncommitted changes  🟠 Unpushed commits"))
+        layout.addWidget(QLabel("<br>Created by Goal651. Enjoy hacking!"))
+        dialog.setLayout(layout)
+        dialog.exec_()
+
+    def closeEvent(self, event):
+        # Wait for all threads to finish before closing
+        self.scanner.cancel()
+        self.jobs.shutdown()
+        self.status_scheduler.shutdown()
+        if self.watcher:
+            self.watcher.stop()
+        for cache in (self.clean_cache, self.status_costs):
+            if cache is not None:
+                try:
+                    cache.save()
+                except OSError:
+                    pass
+        for thread in self.threads:
+            if thread.isRunning():
+                thread.quit()
+                thread.wait()
+        event.accept()
+
+def run(argv=None):
+    app = QApplication(sys.argv if argv is None else argv)
+    window = GitManager()
+    window.show()
+    return app.exec_()
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,233 @@
+import os
+import re
+import time
+import signal
+import itertools
+import threading
+import subprocess
+from collections import deque
+
+import tracing
+from gitcmd import git_command
+
+# "Receiving objects:  45% (123/456), 1.2 MiB | 3.4 MiB/s"
+PROGRESS_RE = re.compile(r"^(?:remote: )?([A-Za-z][A-Za-z ]*?):\s+(\d{1,3})%")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def parse_progress(line):
+    # (phase, percent) for a git --progress line, else None
+    match = PROGRESS_RE.match(line)
+    if not match:
+        return None
+    return match.group(1), min(int(match.group(2)), 100)
+
+
+def default_job_workers():
+    return 4
+
+
+class GitJob:
+    """One user-requested git operation, possibly several commands long.
+
+    ``steps`` is a list of argument lists run in order inside ``repo`` (or
+    ``cwd`` when ``repo`` is None, as for clone); the job stops at the
+    first command that fails. A step may instead be a callable that gets
+    the job on the worker thread and returns the argument list, or None
+    (after adding the reason to ``output``) to fail the job.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, title, repo, steps, cwd=None, target=None):
+        self.id = next(self._ids)
+        self.title = title
+        self.repo = repo
+        self.steps = steps
+        self.cwd = cwd
+        self.target = target or repo  # repo whose status changes when this finishes
+        self.state = QUEUED
+        self.phase = ""
+        self.percent = None
+        self.output = deque(maxlen=200)
+        self.returncode = None
+        self._proc = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    @property
+    def error(self):
+        # Last lines git printed, for failure reports
+        lines = [l for l in self.output if parse_progress(l) is None]
+        return "\n".join(lines[-8:])
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            proc = self._proc
+        if proc is not None and proc.poll() is None:
+            try:
+                os.killpg(proc.pid, signal.SIGTERM)
+            except (OSError, AttributeError):
+                proc.terminate()
+
+    def run(self, on_update=None):
+        self.state = RUNNING
+        for args in self.steps:
+            if callable(args):
+                args = args(self)
+                if args is None:
+                    self.returncode = 1
+                    self.state = FAILED
+                    return
+            returncode = self._run_step(args, on_update)
+            if self._cancelled:
+                self.state = CANCELLED
+                return
+            if returncode != 0:
+                self.returncode = returncode
+                self.state = FAILED
+                return
+        self.returncode = 0
+        self.state = DONE
+
+    def _run_step(self, args, on_update):
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0", LC_ALL="C")
+        with self._lock:
+            if self._cancelled:
+                return None
+            # Own process group so cancel also stops git's helpers (ssh,
+            # remote-https, pack-objects)
+            self._proc = subprocess.Popen(
+                git_command(self.repo, *args), cwd=self.cwd, env=env,
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                start_new_session=True)
+        proc = self._proc
+        start = time.perf_counter_ns()
+        size = 0
+        buf = b""
+        while True:
+            chunk = proc.stdout.read1(65536)
+            if not chunk:
+                break
+            size += len(chunk)
+            # Progress meters redraw with \r, ordinary output ends with \n
+            parts = re.split(rb"[\r\n]", buf + chunk)
+            buf = parts.pop()
+            self._lines(parts, on_update)
+        if buf:
+            self._lines([buf], on_update)
+        proc.stdout.close()
+        returncode = proc.wait()
+        if tracing.enabled:
+            tracing.record_git(args, self.repo, start, time.perf_counter_ns(), returncode, size)
+        return returncode
+
+    def _lines(self, parts, on_update):
+        changed = False
+        for part in parts:
+            line = part.decode("utf-8", "replace").strip()
+            if not line:
+                continue
+            progress = parse_progress(line)
+            if progress is None:
+                self.output.append(line)
+                continue
+            if progress != (self.phase, self.percent):
+                self.phase, self.percent = progress
+                changed = True
+            if progress[1] == 100:
+                self.output.append(line)
+        if changed and on_update:
+            on_update(self)
+
+
+class JobQueue:
+    """Runs GitJobs on background threads.
+
+    Up to ``max_jobs`` run at once; jobs for the same repository run one
+    after another so they never contend for its index lock.
+    ``on_update(job)`` fires when a job's progress phase or percentage
+    changes and ``on_finished(job)`` once it has ended; both are called
+    from worker threads.
+    """
+
+    def __init__(self, on_update=None, on_finished=None, max_jobs=None):
+        self.on_update = on_update
+        self.on_finished = on_finished
+        self.max_jobs = max_jobs or default_job_workers()
+        self._waiting = deque()
+        self._running = {}  # job id: job
+        self._busy_repos = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, job):
+        with self._lock:
+            if self._closed:
+                return None
+            self._waiting.append(job)
+            self._start_ready()
+        if self.on_update:
+            self.on_update(job)
+        return job
+
+    def jobs(self):
+        with self._lock:
+            return list(self._running.values()) + list(self._waiting)
+
+    def cancel(self, job_id=None):
+        # Cancels one job, or every queued and running job
+        with self._lock:
+            waiting = [j for j in self._waiting if job_id in (None, j.id)]
+            for job in waiting:
+                self._waiting.remove(job)
+            running = [j for j in self._running.values() if job_id in (None, j.id)]
+        for job in waiting:
+            job.state = CANCELLED
+            if self.on_finished:
+                self.on_finished(job)
+        for job in running:
+            job.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        self.cancel()
+
+    def _start_ready(self):
+        for job in list(self._waiting):
+            if len(self._running) >= self.max_jobs:
+                return
+            key = job.target
+            if key is not None and key in self._busy_repos:
+                continue
+            self._waiting.remove(job)
+            self._running[job.id] = job
+            if key is not None:
+                self._busy_repos.add(key)
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        try:
+            job.run(self.on_update)
+        except Exception as e:
+            job.output.append(str(e))
+            job.state = FAILED
+        finally:
+            with self._lock:
+                self._running.pop(job.id, None)
+                self._busy_repos.discard(job.target)
+                if not self._closed:
+                    self._start_ready()
+            if self.on_finished:
+                self.on_finished(job)
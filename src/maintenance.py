@@ -0,0 +1,237 @@
+import os
+import re
+import time
+import threading
+import subprocess
+from functools import lru_cache
+
+from gitcmd import run_git
+from gitfs import git_dir, common_dir, resolve_ref
+from status import repo_status
+
+# git's own defaults for gc.auto and gc.autoPackLimit
+LOOSE_LIMIT = 6700
+PACK_LIMIT = 50
+
+# Fallbacks for git older than 2.30, which has no ``git maintenance`` tasks
+LEGACY_TASKS = {
+    "gc": ["gc", "--quiet"],
+    "commit-graph": ["commit-graph", "write", "--reachable"],
+    "incremental-repack": ["multi-pack-index", "write"],
+}
+
+
+def default_maintenance_workers():
+    # Repacking is disk-bound; more than a couple at once just thrash
+    return 2
+
+
+@lru_cache(maxsize=None)
+def git_version():
+    try:
+        out = run_git(None, "version").stdout
+    except OSError:
+        return (0, 0)
+    match = re.search(r"(\d+)\.(\d+)", out)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+class MaintenanceItem:
+    __slots__ = ("repo", "store", "loose", "packs", "pack_bytes", "commit_graph", "midx",
+                 "tasks", "score", "ok", "skipped", "message", "elapsed", "before", "after")
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.store = None  # objects directory; shared by worktrees
+        self.loose = 0  # estimated, the way ``git gc --auto`` does
+        self.packs = 0
+        self.pack_bytes = 0
+        self.commit_graph = False
+        self.midx = False
+        self.tasks = []
+        self.score = 0.0
+        self.ok = False
+        self.skipped = False
+        self.message = ""
+        self.elapsed = 0.0
+        self.before = None  # full status wall time, seconds
+        self.after = None
+
+
+def _count(path, test):
+    try:
+        with os.scandir(path) as it:
+            return sum(1 for entry in it if test(entry.name))
+    except OSError:
+        return 0
+
+
+def health(repo):
+    # Reads object store metrics from disk, without git
+    item = MaintenanceItem(repo)
+    gitdir = git_dir(repo)
+    if not gitdir:
+        item.skipped = True
+        item.message = "Not a git repository"
+        return item
+    objects = item.store = os.path.join(common_dir(gitdir), "objects")
+    # One fan-out directory out of 256 stands in for all of them
+    item.loose = _count(os.path.join(objects, "17"), lambda name: len(name) == 38) * 256
+    pack_dir = os.path.join(objects, "pack")
+    try:
+        with os.scandir(pack_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".pack"):
+                    item.packs += 1
+                    item.pack_bytes += entry.stat().st_size
+                elif entry.name == "multi-pack-index":
+                    item.midx = True
+    except OSError:
+        pass
+    info = os.path.join(objects, "info")
+    item.commit_graph = (os.path.exists(os.path.join(info, "commit-graph"))
+                         or os.path.exists(os.path.join(info, "commit-graphs", "commit-graph-chain"))
+                         or not resolve_ref(gitdir, "HEAD"))  # no commits to graph yet
+    item.tasks = tasks_for(item)
+    item.score = (item.loose / LOOSE_LIMIT + item.packs / PACK_LIMIT
+                  + (0.5 if "commit-graph" in item.tasks else 0.0)
+                  + (0.25 if "incremental-repack" in item.tasks else 0.0))
+    if not item.tasks:
+        item.message = "Healthy"
+    return item
+
+
+def tasks_for(item):
+    # Maintenance tasks worth running; gc also writes the commit-graph
+    if item.loose >= LOOSE_LIMIT or item.packs >= PACK_LIMIT:
+        return ["gc"]
+    if item.packs == 0 and item.loose == 0:
+        return []  # empty, or nothing but a few loose objects
+    tasks = []
+    if not item.commit_graph:
+        tasks.append("commit-graph")
+    if item.packs > 1 and not item.midx:
+        tasks.append("incremental-repack")
+    return tasks
+
+
+def survey(repos):
+    # Health of every object store, worst first. Checkouts sharing a store
+    # (linked worktrees) are listed once, under the first one seen.
+    items = []
+    stores = set()
+    for repo in repos:
+        item = health(repo)
+        if item.store is not None:
+            if item.store in stores:
+                continue
+            stores.add(item.store)
+        items.append(item)
+    items.sort(key=lambda i: (i.skipped, -i.score, i.repo))
+    return items
+
+
+def flagged(items):
+    return [item for item in items if item.tasks and not item.skipped]
+
+
+class BulkMaintenance:
+    """Runs maintenance tasks over many repositories in parallel.
+
+    At most ``max_workers`` git processes run at once, each at low CPU and
+    I/O priority. Every repository's full ``git status`` is timed before and
+    after its tasks (and recorded in ``costs`` when given), so the effect is
+    visible per repository. ``on_result(item)`` is called from worker
+    threads as each repository finishes.
+    """
+
+    def __init__(self, items, max_workers=None, on_result=None, timeout=1800, costs=None):
+        self.items = list(items)
+        self.max_workers = max_workers or default_maintenance_workers()
+        self.on_result = on_result
+        self.timeout = timeout
+        self.costs = costs
+        self._queue = [i for i in self.items if i.tasks and not i.skipped]
+        self.total = len(self._queue)
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            self._queue.clear()
+
+    def run(self):
+        # Blocks until every queued item has been handled; returns the items
+        threads = [threading.Thread(target=self._work, daemon=True)
+                   for _ in range(min(self.max_workers, len(self._queue)))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.items
+
+    def _take(self):
+        with self._lock:
+            if self._cancelled or not self._queue:
+                return None
+            return self._queue.pop(0)
+
+    def _work(self):
+        while True:
+            item = self._take()
+            if item is None:
+                return
+            self._maintain(item)
+            if self.on_result:
+                self.on_result(item)
+
+    def _time_status(self, repo, runs=2):
+        # Best of a few runs, so the first one warming the page cache does
+        # not count against "before"
+        best = None
+        for _ in range(runs):
+            started = time.monotonic()
+            repo_status(repo, costs=self.costs)
+            elapsed = time.monotonic() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _maintain(self, item):
+        item.before = self._time_status(item.repo)
+        if git_version() >= (2, 30):
+            commands = [["maintenance", "run", "--quiet", *(f"--task={t}" for t in item.tasks)]]
+        else:
+            commands = [LEGACY_TASKS[t] for t in item.tasks]
+        started = time.monotonic()
+        for args in commands:
+            try:
+                result = run_git(item.repo, *args, timeout=self.timeout, low_priority=True)
+            except subprocess.TimeoutExpired:
+                item.message = f"Timed out after {self.timeout}s"
+                item.elapsed = time.monotonic() - started
+                return
+            except OSError as e:
+                item.message = str(e)
+                item.elapsed = time.monotonic() - started
+                return
+            if result.returncode != 0:
+                lines = [l for l in result.stderr.strip().splitlines() if l.strip()]
+                item.message = lines[0] if lines else f"git {args[0]} failed"
+                item.elapsed = time.monotonic() - started
+                return
+        item.elapsed = time.monotonic() - started
+        item.ok = True
+        item.after = self._time_status(item.repo)
+        item.message = "Done: " + ", ".join(item.tasks)
+
+
+def summary_text(items):
+    done = [i for i in items if i.ok]
+    failed = sum(1 for i in items if not i.ok and not i.skipped and i.message and i.tasks)
+    text = f"{len(done)} maintained, {failed} failed"
+    if done:
+        before = sum(i.before for i in done)
+        after = sum(i.after for i in done)
+        text += f"; status {before * 1000:.0f} ms → {after * 1000:.0f} ms"
+    return text
@@ -0,0 +1,231 @@
+import os
+import sys
+import glob
+import heapq
+import random
+import itertools
+import threading
+import subprocess
+import time
+
+from status import status_signature
+
+# Seconds between refreshes: active repos start at the minimum and each
+# refresh that finds nothing new doubles the wait, up to the maximum
+MIN_INTERVAL = 15.0
+MAX_INTERVAL = 30 * 60.0
+SELECTED_INTERVAL = 5.0
+# Assumed cost of a status nobody has timed yet, in seconds
+DEFAULT_COST = 0.05
+
+
+def on_battery():
+    # True when the machine is known to be running on battery power
+    try:
+        if sys.platform.startswith("linux"):
+            supplies = glob.glob("/sys/class/power_supply/*")
+            mains = [s for s in supplies if _read(os.path.join(s, "type")) == "Mains"]
+            batteries = [s for s in supplies if _read(os.path.join(s, "type")) == "Battery"]
+            if not mains or not batteries:
+                return False
+            return not any(_read(os.path.join(s, "online")) == "1" for s in mains)
+        if sys.platform == "darwin":
+            out = subprocess.run(["pmset", "-g", "batt"], capture_output=True, text=True, timeout=2).stdout
+            return "Battery Power" in out
+        if sys.platform == "win32":
+            import ctypes
+
+            class SystemPowerStatus(ctypes.Structure):
+                _fields_ = [("ACLineStatus", ctypes.c_byte), ("BatteryFlag", ctypes.c_byte),
+                            ("BatteryLifePercent", ctypes.c_byte), ("SystemStatusFlag", ctypes.c_byte),
+                            ("BatteryLifeTime", ctypes.c_ulong), ("BatteryFullLifeTime", ctypes.c_ulong)]
+
+            power = SystemPowerStatus()
+            if ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(power)):
+                return power.ACLineStatus == 0
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    return False
+
+
+class PowerSource:
+    """Last known ``on_battery()``, re-sampled at most every ``interval``
+    seconds on a background thread, so callers never wait on the check
+    (which runs ``pmset`` on macOS).
+    """
+
+    def __init__(self, interval=60.0):
+        self.interval = interval
+        self.battery = False
+        self._checked = None
+        self._busy = False
+        self._lock = threading.Lock()
+
+    def on_battery(self):
+        now = time.monotonic()
+        with self._lock:
+            if not self._busy and (self._checked is None or now - self._checked >= self.interval):
+                self._busy = True
+                self._checked = now
+                threading.Thread(target=self._sample, daemon=True).start()
+            return self.battery
+
+    def _sample(self):
+        battery = False
+        try:
+            battery = on_battery()
+        finally:
+            with self._lock:
+                self.battery = battery
+                self._busy = False
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+class RefreshPlanner:
+    """Decides which repositories get a background status refresh, and when.
+
+    Every repository has a refresh deadline. Activity (a file change, a
+    selection, a refresh that found something new) brings it back to
+    ``min_interval``; each refresh that finds nothing doubles the wait, up
+    to ``max_interval``, so dormant repositories cost almost nothing. The
+    selected repository is refreshed every ``selected_interval``.
+
+    ``due`` hands out repositories whose deadline has passed, limited by a
+    budget: refreshes may use about ``budget`` of one core on average,
+    charged at each repository's learned status cost, with at most
+    ``burst`` seconds saved up. While paused nothing is due and no budget
+    accrues.
+    """
+
+    def __init__(self, costs=None, budget=0.05, burst=2.0, min_interval=MIN_INTERVAL,
+                 max_interval=MAX_INTERVAL, selected_interval=SELECTED_INTERVAL):
+        self.costs = costs
+        self.budget = budget
+        self.burst = burst
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.selected_interval = selected_interval
+        self.selected = None
+        self.paused = False
+        self._interval = {}  # repo: current backoff interval
+        self._entry = {}  # repo: heap entry [deadline, seq, repo]
+        self._signature = {}  # repo: status_signature of the last status
+        self._heap = []
+        self._counter = itertools.count()
+        self._allowance = burst
+        self._last_tick = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._interval)
+
+    def add(self, repo, now=None):
+        with self._lock:
+            if repo not in self._interval:
+                self._interval[repo] = self.min_interval
+                self._schedule(repo, self.min_interval, now)
+
+    def remove(self, repo):
+        with self._lock:
+            self._interval.pop(repo, None)
+            self._signature.pop(repo, None)
+            entry = self._entry.pop(repo, None)
+            if entry is not None:
+                entry[2] = None
+
+    def clear(self):
+        with self._lock:
+            self._interval.clear()
+            self._signature.clear()
+            self._entry.clear()
+            self._heap = []
+
+    def select(self, repo, now=None):
+        with self._lock:
+            self.selected = repo
+            if repo in self._interval:
+                self._interval[repo] = self.min_interval
+                self._schedule(repo, self.selected_interval, now)
+
+    def touch(self, repo, now=None):
+        # Something happened in repo: refresh it soon again
+        with self._lock:
+            if repo in self._interval:
+                self._interval[repo] = self.min_interval
+                self._schedule(repo, self._wait(repo), now)
+
+    def refreshed(self, status, now=None):
+        # A status for status.path arrived; back off unless it changed. A
+        # quick partial status is followed by the full one, which is judged.
+        repo = status.path
+        with self._lock:
+            if repo not in self._interval or status.partial:
+                return
+            signature = status_signature(status)
+            old = self._signature.get(repo)
+            self._signature[repo] = signature
+            if old is not None and old != signature:
+                self._interval[repo] = self.min_interval
+            elif old is not None:
+                self._interval[repo] = min(self._interval[repo] * 2, self.max_interval)
+            self._schedule(repo, self._wait(repo), now)
+
+    def interval(self, repo):
+        with self._lock:
+            return self._wait(repo) if repo in self._interval else None
+
+    def due(self, now=None):
+        # Repositories to refresh now, most overdue first, within the budget
+        now = time.monotonic() if now is None else now
+        repos = []
+        with self._lock:
+            elapsed = max(0.0, now - self._last_tick)
+            self._last_tick = now
+            if self.paused:
+                return repos
+            self._allowance = min(self.burst, self._allowance + elapsed * self.budget)
+            while self._heap and self._allowance > 0:
+                deadline, _, repo = self._heap[0]
+                if repo is None:
+                    heapq.heappop(self._heap)
+                    continue
+                if deadline > now:
+                    break
+                heapq.heappop(self._heap)
+                del self._entry[repo]
+                self._allowance -= self._cost(repo)
+                repos.append(repo)
+                # Not refreshed again until its status comes back (or
+                # nothing comes back within the longest wait)
+                self._schedule(repo, self.max_interval, now)
+        return repos
+
+    def _wait(self, repo):
+        if repo == self.selected:
+            return self.selected_interval
+        return self._interval[repo]
+
+    def _cost(self, repo):
+        estimate = self.costs.estimate(repo) if self.costs is not None else None
+        return DEFAULT_COST if estimate is None else estimate
+
+    def _schedule(self, repo, wait, now):
+        now = time.monotonic() if now is None else now
+        old = self._entry.get(repo)
+        if old is not None:
+            old[2] = None
+        # Jitter keeps repos found together from coming due together forever
+        entry = [now + wait * random.uniform(0.9, 1.1), next(self._counter), repo]
+        self._entry[repo] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entry) + 64:
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
@@ -0,0 +1,108 @@
+import sys
+
+from status import RepoStatus, status_signature, supersedes
+
+
+class RepoRecord:
+    __slots__ = ("id", "path", "status", "version")
+
+    def __init__(self, id, path, status):
+        self.id = id
+        self.path = path
+        self.status = status
+        self.version = 0  # bumped every time a stored status shows something new
+
+
+class RepoRegistry:
+    """Every repository the GUI knows about, in the order it was added.
+
+    Records are looked up by path, and carry an integer id that is never
+    reused. Paths are interned, and each stored status is made to share its
+    record's path string, so a path is held once however many places refer
+    to it. A record's ``version`` is bumped whenever a stored status differs
+    from the one it replaced in anything shown (``status_signature``), so
+    views can skip records that did not move since they last drew them.
+    """
+
+    def __init__(self):
+        self._by_path = {}  # path: RepoRecord, in insertion order
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._by_path)
+
+    def __contains__(self, path):
+        return path in self._by_path
+
+    def __iter__(self):
+        return iter(list(self._by_path.values()))
+
+    def paths(self):
+        return list(self._by_path)
+
+    def statuses(self):
+        return [record.status for record in self._by_path.values()]
+
+    def get(self, path):
+        return self._by_path.get(path)
+
+    def status(self, path):
+        record = self._by_path.get(path)
+        return None if record is None else record.status
+
+    def add(self, status):
+        # Registers status.path with status as its first record; returns the
+        # new record, or None if the path is already registered
+        if status.path in self._by_path:
+            return None
+        path = status.path = sys.intern(status.path)
+        record = RepoRecord(self._next_id, path, status)
+        self._next_id += 1
+        self._by_path[path] = record
+        return record
+
+    def add_path(self, path):
+        return self.add(RepoStatus(path))
+
+    def update(self, status):
+        # Stores status if it is newer than what the record holds; returns the
+        # record, or None if the path is unknown or the status is stale
+        record = self._by_path.get(status.path)
+        if record is None or not supersedes(status, record.status):
+            return None
+        status.path = record.path
+        if status_signature(status) != status_signature(record.status):
+            record.version += 1
+        record.status = status
+        return record
+
+    def remove(self, path):
+        return self._by_path.pop(path, None)
+
+    def clear(self):
+        # Ids are never reused, even across a clear
+        self._by_path = {}
+
+    def footprint(self):
+        # Approximate bytes held by the registry and the statuses it stores,
+        # counting each distinct string once
+        seen = set()
+        total = sys.getsizeof(self._by_path)
+
+        def size(obj):
+            if obj is None or id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        for record in self._by_path.values():
+            total += size(record) + size(record.id) + size(record.path)
+            status = record.status
+            total += size(status)
+            for attr in RepoStatus.__slots__:
+                value = getattr(status, attr)
+                total += size(value)
+                if attr == "files" and value:
+                    for entry in value:
+                        total += size(entry) + size(entry[0]) + size(entry[1])
+        return total
@@ -0,0 +1,62 @@
+import os
+import json
+
+from config import cache_path
+
+
+class DiscoveryIndex:
+    """On-disk record of the last discovery walk.
+
+    For every walked directory we keep its mtime, whether it is a repository
+    and which children were descended into. A directory's mtime only moves
+    when entries are added to or removed from it, so an unchanged mtime lets
+    the next walk reuse the child list instead of listing the directory.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = path or cache_path("index.json")
+        self.fingerprint = None
+        self.dirs = {}  # path: [mtime_ns, is_repo, [child names]]
+        self.repos = []
+        self.seen = {}
+        self.reused = 0
+
+    def load(self, fingerprint):
+        self.fingerprint = fingerprint
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == self.VERSION and data.get("fingerprint") == fingerprint:
+            self.dirs = data.get("dirs", {})
+            self.repos = data.get("repos", [])
+        return self
+
+    def lookup(self, path, mtime_ns):
+        entry = self.dirs.get(path)
+        if entry is None or entry[0] != mtime_ns:
+            return None
+        if entry[1] and not os.path.lexists(os.path.join(path, ".git")):
+            return None
+        self.seen[path] = entry
+        self.reused += 1
+        return entry
+
+    def record(self, path, mtime_ns, is_repo, children):
+        self.seen[path] = [mtime_ns, is_repo, [os.path.basename(c) for c in children]]
+
+    def save(self, repos):
+        data = {
+            "version": self.VERSION,
+            "fingerprint": self.fingerprint,
+            "repos": sorted(repos),
+            "dirs": self.seen,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self.dirs, self.repos, self.seen = self.seen, data["repos"], {}
@@ -0,0 +1,182 @@
+import os
+import heapq
+import itertools
+import threading
+
+# Lower runs first
+PRIORITY_SELECTED = 0
+PRIORITY_VISIBLE = 1
+PRIORITY_NORMAL = 2
+PRIORITY_BACKGROUND = 3
+
+
+def default_status_workers():
+    return max(2, os.cpu_count() or 1)
+
+
+class StatusScheduler:
+    """Runs ``worker(repo)`` for queued repositories on a bounded thread pool.
+
+    Each repository is queued at most once; submitting it again with a more
+    urgent priority moves it forward. Worker threads are started on demand
+    and exit (and are dropped) after ``idle_timeout`` seconds without work.
+    ``cancel`` empties the queue and discards results still in flight.
+
+    With ``group_of``, a worker that finishes a repository next takes another
+    queued member of the same group (e.g. worktrees sharing an object store)
+    as long as nothing more urgent is waiting, so shared refs and packs are
+    still warm in the page cache.
+    """
+
+    def __init__(self, worker, on_result=None, max_workers=None, idle_timeout=2.0, group_of=None):
+        self.worker = worker
+        self.group_of = group_of
+        self.on_result = on_result
+        self.max_workers = max_workers or default_status_workers()
+        self.idle_timeout = idle_timeout
+        self._heap = []
+        self._queued = {}  # repo: heap entry [priority, seq, repo]
+        self._groups = {}  # group: queued repos
+        self._group = {}  # repo: group, for queued repos
+        self._threads = set()
+        self._busy = 0
+        self._generation = 0
+        self._closed = False
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def submit(self, repo, priority=PRIORITY_NORMAL):
+        group = None
+        if self.group_of is not None:
+            try:
+                group = self.group_of(repo)
+            except Exception:
+                group = None
+        with self._cond:
+            if self._closed:
+                return False
+            entry = self._queued.get(repo)
+            if entry is not None:
+                if priority >= entry[0]:
+                    return True
+                entry[2] = None  # superseded, skipped when popped
+            entry = [priority, next(self._counter), repo]
+            self._queued[repo] = entry
+            heapq.heappush(self._heap, entry)
+            if group is not None:
+                self._group[repo] = group
+                self._groups.setdefault(group, set()).add(repo)
+            self._spawn()
+            self._cond.notify()
+        return True
+
+    def prioritize(self, repos, priority):
+        # Only bumps repos that are still waiting; nothing new is queued
+        with self._cond:
+            queued = [r for r in repos if r in self._queued]
+        for repo in queued:
+            self.submit(repo, priority)
+
+    def pending(self):
+        with self._cond:
+            return len(self._queued)
+
+    def active(self):
+        with self._cond:
+            return self._busy
+
+    def worker_count(self):
+        with self._cond:
+            return len(self._threads)
+
+    def join(self, timeout=None):
+        # Blocks until nothing is queued or running; returns False on timeout
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queued and not self._busy, timeout)
+
+    def cancel(self):
+        with self._cond:
+            self._heap.clear()
+            self._queued.clear()
+            self._groups.clear()
+            self._group.clear()
+            self._generation += 1
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._queued.clear()
+            self._groups.clear()
+            self._group.clear()
+            self._generation += 1
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for t in threads:
+                t.join()
+
+    def _spawn(self):
+        idle = len(self._threads) - self._busy
+        if idle < len(self._queued) and len(self._threads) < self.max_workers:
+            t = threading.Thread(target=self._run, daemon=True)
+            self._threads.add(t)
+            t.start()
+
+    def _pop(self, group=None):
+        # Returns (repo, its group), preferring a member of ``group``
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None, None
+        members = self._groups.get(group) if group is not None else None
+        if members:
+            entry = min((self._queued[r] for r in members), key=lambda e: (e[0], e[1]))
+            if entry[0] <= self._heap[0][0]:
+                repo = entry[2]
+                entry[2] = None  # skipped when it reaches the top of the heap
+                return repo, self._dequeue(repo)
+        repo = heapq.heappop(self._heap)[2]
+        return repo, self._dequeue(repo)
+
+    def _dequeue(self, repo):
+        del self._queued[repo]
+        group = self._group.pop(repo, None)
+        if group is not None:
+            members = self._groups[group]
+            members.discard(repo)
+            if not members:
+                del self._groups[group]
+        return group
+
+    def _run(self):
+        me = threading.current_thread()
+        group = None
+        while True:
+            with self._cond:
+                repo, group = self._pop(group)
+                while repo is None and not self._closed:
+                    if not self._cond.wait(self.idle_timeout):
+                        repo, group = self._pop()
+                        break
+                    repo, group = self._pop()
+                if repo is None:
+                    # Idle or shut down: reap this worker
+                    self._threads.discard(me)
+                    return
+                generation = self._generation
+                self._busy += 1
+            try:
+                try:
+                    result = self.worker(repo)
+                except Exception:
+                    result = None
+                with self._cond:
+                    current = generation == self._generation
+                if current and result is not None and self.on_result:
+                    self.on_result(result)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    if not self._busy:
+                        self._cond.notify_all()
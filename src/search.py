@@ -0,0 +1,268 @@
+import os
+import threading
+from collections import Counter
+
+# Characters that start a new "word" inside a repo name or path
+SEPARATORS = set("-_./ :@")
+_EMPTY = frozenset()
+# Paths are indexed below the home directory, which every repo would match
+HOME = os.path.expanduser("~")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_starts(name):
+    # One- and two-letter prefixes of every word in name
+    starts = set()
+    for i, c in enumerate(name):
+        if i == 0 or name[i - 1] in SEPARATORS:
+            starts.add(c)
+            starts.add(name[i:i + 2])
+    return starts
+
+
+def subsequence_gaps(query, text):
+    # Characters skipped to match query as a subsequence of text, or None
+    gaps = 0
+    pos = 0
+    for c in query:
+        found = text.find(c, pos)
+        if found < 0:
+            return None
+        if pos:
+            gaps += found - pos
+        pos = found + 1
+    return gaps
+
+
+def edit_distance(query, text):
+    # Fewest substitutions, insertions, deletions or adjacent swaps turning
+    # query into some substring of text
+    before = None
+    prev = [0] * (len(text) + 1)
+    for i, q in enumerate(query, 1):
+        row = [i] + [0] * len(text)
+        for j, t in enumerate(text, 1):
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + (q != t))
+            if before is not None and j > 1 and q == text[j - 2] and query[i - 2] == t:
+                row[j] = min(row[j], before[j - 2] + 1)
+        before, prev = prev, row
+    return min(prev)
+
+
+def initials_match(query, name):
+    # True if every character of query starts a word of name, in order
+    pos = 0
+    for c in query:
+        while True:
+            found = name.find(c, pos)
+            if found < 0:
+                return False
+            pos = found + 1
+            if found == 0 or name[found - 1] in SEPARATORS:
+                break
+    return True
+
+
+def score(query, name, path, url, branch):
+    # Higher is better, 0 means no match. Bands: name 601-1000, branch, URL
+    # or path 301-600, name abbreviation 201-300 (word initials score 300).
+    i = name.find(query)
+    if i == 0:
+        return 1000 if name == query else 900 - min(len(name), 99)
+    if i > 0:
+        return (800 if name[i - 1] in SEPARATORS else 700) - min(len(name), 99)
+    return score_other(query, name, path, url, branch)
+
+
+def score_other(query, name, path, url, branch):
+    # score() for a name already known not to contain query
+    if query in branch:
+        return 600 - min(len(branch), 99)
+    if query in url:
+        return 500
+    i = path.rfind(query)
+    if i >= 0:
+        # Prefer matches near the leaf directory
+        return 400 - min(len(path) - i, 99)
+    gaps = subsequence_gaps(query, name)
+    if gaps is not None:
+        return 300 if initials_match(query, name) else 299 - min(gaps, 98)
+    return 0
+
+
+class SearchIndex:
+    """In-memory fuzzy index over repository names, paths, remote URLs and
+    branches.
+
+    Candidates come from trigram indexes (a substring query must contain all
+    of its trigrams; a misspelt one still shares half of them, or is one
+    typo or swap away and shares at least one) and from the one- and
+    two-letter word starts of names, and only those candidates are scored.
+    Queries too short for trigrams also scan every name for the query
+    inside a word. Repositories are added and updated one at a time as they
+    are discovered and their status arrives.
+    """
+
+    def __init__(self):
+        self._ids = {}  # repo: doc id
+        self._docs = []  # doc id: (repo, name, path, url, branch) or None once removed
+        self._grams = {}  # trigram: doc ids
+        self._name_grams = {}  # trigram of a name: doc ids
+        self._starts = {}  # one/two-letter word start of a name: doc ids
+        self._lock = threading.Lock()
+        self.version = 0  # bumped on every change
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids)
+
+    def _keys(self, doc):
+        _, name, path, url, branch = doc
+        name_grams = trigrams(name)
+        grams = name_grams | trigrams(path) | trigrams(url) | trigrams(branch)
+        return grams, name_grams, word_starts(name)
+
+    def update(self, repo, name=None, url="", branch=""):
+        # Returns True if anything was (re)indexed
+        path = "~" + repo[len(HOME):] if repo.startswith(HOME + os.sep) else repo
+        doc = (repo, (name or os.path.basename(repo)).lower(), path.lower(),
+               (url or "").lower(), (branch or "").lower())
+        with self._lock:
+            doc_id = self._ids.get(repo)
+            if doc_id is not None:
+                if self._docs[doc_id] == doc:
+                    return False
+                self._unindex(doc_id)
+                self._docs[doc_id] = doc
+            else:
+                doc_id = self._ids[repo] = len(self._docs)
+                self._docs.append(doc)
+            grams, name_grams, starts = self._keys(doc)
+            for gram in grams:
+                self._grams.setdefault(gram, set()).add(doc_id)
+            for gram in name_grams:
+                self._name_grams.setdefault(gram, set()).add(doc_id)
+            for start in starts:
+                self._starts.setdefault(start, set()).add(doc_id)
+            self.version += 1
+        return True
+
+    def _unindex(self, doc_id):
+        grams, name_grams, starts = self._keys(self._docs[doc_id])
+        for gram in grams:
+            self._grams[gram].discard(doc_id)
+        for gram in name_grams:
+            self._name_grams[gram].discard(doc_id)
+        for start in starts:
+            self._starts[start].discard(doc_id)
+
+    def remove(self, repo):
+        with self._lock:
+            doc_id = self._ids.pop(repo, None)
+            if doc_id is None:
+                return
+            self._unindex(doc_id)
+            self._docs[doc_id] = None
+            self.version += 1
+
+    def clear(self):
+        with self._lock:
+            self._ids = {}
+            self._docs = []
+            self._grams = {}
+            self._name_grams = {}
+            self._starts = {}
+            self.version += 1
+
+    def search(self, query, limit=200):
+        # [(repo, score)], best first. Candidate sets are tried in score-band
+        # order and the search stops once ``limit`` results beat every band
+        # still to come. Misspellings (1-100) are only offered when almost
+        # nothing else matched.
+        query = query.strip().lower()
+        if not query:
+            return []
+        grams = trigrams(query)
+        scored = []
+        seen = set()
+        with self._lock:
+            docs = self._docs
+            for candidates, next_best, rate in self._tiers(query, grams):
+                for doc_id in candidates:
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    doc = docs[doc_id]
+                    if doc is None:
+                        continue
+                    s = rate(query, doc[1], doc[2], doc[3], doc[4])
+                    if s > 0:
+                        scored.append((-s, len(doc[1]), doc[0]))
+                if sum(1 for entry in scored if -entry[0] > next_best) >= limit:
+                    break
+            if len(scored) < 10 and len(grams) >= 2:
+                for doc_id, s in self._misspelt(query, grams):
+                    if doc_id not in seen:
+                        scored.append((-s, len(docs[doc_id][1]), docs[doc_id][0]))
+        scored.sort()
+        return [(repo, -s) for s, _, repo in scored[:limit]]
+
+    def _intersect(self, index, grams):
+        postings = sorted((index.get(g, _EMPTY) for g in grams), key=len)
+        found = set(postings[0])
+        for p in postings[1:]:
+            if not found:
+                break
+            found &= p
+        return found
+
+    def _tiers(self, query, grams):
+        # Yields (candidate doc ids, best score any later tier can reach,
+        # scoring function). Names in the trigram tiers after the first were
+        # already ruled out as containing the query.
+        docs = self._docs
+        if not grams:
+            # Too short for trigrams: word starts, then the query inside a
+            # word of any name, then abbreviations such as "lk" over names
+            # sharing its first letter
+            yield self._starts.get(query, _EMPTY), 700, score
+            yield [doc_id for doc_id, doc in enumerate(docs)
+                   if doc is not None and query in doc[1]], 300, score
+            if len(query) > 1:
+                yield [doc_id for doc_id in self._starts.get(query[0], _EMPTY)
+                       if subsequence_gaps(query, docs[doc_id][1]) is not None], 0, score
+            return
+        yield self._intersect(self._name_grams, grams), 600, score
+        yield self._intersect(self._grams, grams), 300, score_other
+        if len(query) <= 16:
+            # Abbreviations such as "gcmp" share no trigram with their target
+            yield [doc_id for doc_id in self._starts.get(query[0], _EMPTY)
+                   if subsequence_gaps(query, docs[doc_id][1]) is not None], 0, score_other
+
+    def _misspelt(self, query, grams):
+        # (doc id, score) for names one typo or swap away from containing
+        # query (100), or sharing half its trigrams (less, by how many)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._name_grams.get(gram, _EMPTY))
+        need = (len(grams) + 1) // 2 if len(grams) >= 3 else len(grams) + 1
+        # One typo or swap touches at most four trigrams
+        near = max(1, len(grams) - 4)
+        found = []
+        checks = 50  # edit distances worked out, for the closest names first
+        for doc_id, n in counts.most_common():
+            doc = self._docs[doc_id]
+            if doc is None or n < min(need, near):
+                continue
+            typo = False
+            if n >= near and checks > 0:
+                checks -= 1
+                typo = edit_distance(query, doc[1]) <= 1
+            if typo:
+                found.append((doc_id, 100))
+            elif n >= need:
+                found.append((doc_id, 100 * n // len(grams)))
+        return found
@@ -0,0 +1,277 @@
+import os
+import time
+import threading
+import subprocess
+from functools import lru_cache
+
+import tracing
+from gitcmd import run_git
+from gitfs import remote_url
+
+CHANGE_LABELS = {
+    "M": ("✏️", "Modified"),
+    "T": ("✏️", "Type changed"),
+    "A": ("➕", "Added"),
+    "D": ("🗑️", "Deleted"),
+    "R": ("🔀", "Renamed"),
+    "C": ("📄", "Copied"),
+}
+
+
+def truncate_path(path):
+    if len(path) > 38:
+        path = "..." + path[-35:]
+    return path
+
+
+def plural(n, word):
+    return f"{n} {word}{'s' if n != 1 else ''}"
+
+
+@lru_cache(maxsize=None)
+def describe_change(xy):
+    # Maps a porcelain XY code to (icon, label) for the changed files table;
+    # there are only a few dozen codes, so every result is kept
+    if xy == "??":
+        return "❔", "Untracked"
+    if xy == "!!":
+        return "🚫", "Ignored"
+    if "U" in xy or xy in ("AA", "DD"):
+        return "⚠️", "Conflict"
+    x, y = xy[0], xy[1]
+    parts = []
+    if x != ".":
+        parts.append(CHANGE_LABELS.get(x, ("", x))[1] + " (staged)")
+    if y != ".":
+        parts.append(CHANGE_LABELS.get(y, ("", y))[1])
+    icon = CHANGE_LABELS.get(y if y != "." else x, ("•", ""))[0]
+    return icon, ", ".join(parts)
+
+
+class RepoStatus:
+    __slots__ = ("path", "name", "branch", "oid", "upstream", "ahead", "behind",
+                 "staged", "unstaged", "untracked", "conflicted", "files", "error", "checked", "partial")
+
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.branch = None
+        self.oid = None
+        self.upstream = None
+        self.ahead = 0
+        self.behind = 0
+        self.staged = 0
+        self.unstaged = 0
+        self.untracked = 0
+        self.conflicted = 0
+        self.files = None  # [(xy, path)]; None until a status has been read
+        self.error = None
+        self.checked = 0.0  # time.time() when this status was read
+        self.partial = False  # untracked files were not scanned (quick tier)
+
+    @property
+    def loaded(self):
+        return self.files is not None or self.error is not None
+
+    @property
+    def changed(self):
+        return len(self.files) if self.files else 0
+
+    @property
+    def clean(self):
+        return (self.loaded and not self.error and not self.changed
+                and not self.conflicted and not self.ahead)
+
+    @property
+    def short_path(self):
+        return truncate_path(self.path)
+
+    @property
+    def emoji(self):
+        if self.error:
+            return "❓"
+        if not self.loaded:
+            return "⏳"
+        if self.conflicted:
+            return "⚠️"
+        if self.changed and self.ahead:
+            return "✏️⬆️"
+        if self.changed:
+            return "✏️"
+        if self.ahead:
+            return "⬆️"
+        return "✅"
+
+    @property
+    def message(self):
+        if self.error:
+            return "Unknown"
+        if not self.loaded:
+            return "Loading..."
+        parts = []
+        if self.conflicted:
+            parts.append(f"{plural(self.conflicted, 'conflict')}")
+        if self.changed:
+            parts.append(f"{plural(self.changed, 'file')} modified")
+        if self.ahead:
+            parts.append(f"{plural(self.ahead, 'commit')} ahead")
+        if self.behind:
+            parts.append(f"{plural(self.behind, 'commit')} behind")
+        message = ", ".join(parts) or "Clean"
+        if self.partial:
+            message += " (checking untracked files...)"
+        return message
+
+    def is_stale(self, max_age):
+        return not self.loaded or self.error is not None or time.time() - self.checked > max_age
+
+    def file_rows(self):
+        # (icon, file, status) rows for the changed files table
+        rows = []
+        for xy, path in self.files or ():
+            icon, label = describe_change(xy)
+            rows.append((icon, path, label))
+        return rows
+
+
+def commit_message(files):
+    # Auto-generated commit message naming every changed path
+    return "Update files: " + ", ".join(path for _, path in files)
+
+
+def parse_porcelain_v2(data, status):
+    # Fills ``status`` from ``git status --porcelain=v2 --branch -z`` output
+    files = []
+    records = data.split(b"\0")
+    i = 0
+    while i < len(records):
+        rec = records[i]
+        i += 1
+        if not rec:
+            continue
+        kind = rec[:1]
+        if kind == b"#":
+            key, _, value = rec[2:].decode("utf-8", "replace").partition(" ")
+            if key == "branch.oid":
+                status.oid = None if value == "(initial)" else value
+            elif key == "branch.head":
+                status.branch = None if value == "(detached)" else value
+            elif key == "branch.upstream":
+                status.upstream = value
+            elif key == "branch.ab":
+                ahead, behind = value.split()
+                status.ahead = int(ahead)
+                status.behind = -int(behind)
+        elif kind == b"1":
+            fields = rec.split(b" ", 8)
+            xy = fields[1].decode()
+            files.append((xy, os.fsdecode(fields[8])))
+            if xy[0] != ".":
+                status.staged += 1
+            if xy[1] != ".":
+                status.unstaged += 1
+        elif kind == b"2":
+            fields = rec.split(b" ", 9)
+            xy = fields[1].decode()
+            # The original path follows as its own NUL-terminated field
+            i += 1
+            files.append((xy, os.fsdecode(fields[9])))
+            if xy[0] != ".":
+                status.staged += 1
+            if xy[1] != ".":
+                status.unstaged += 1
+        elif kind == b"u":
+            fields = rec.split(b" ", 10)
+            files.append((fields[1].decode(), os.fsdecode(fields[10])))
+            status.conflicted += 1
+        elif kind == b"?":
+            files.append(("??", os.fsdecode(rec[2:])))
+            status.untracked += 1
+    status.files = files
+    return status
+
+
+_names = {}
+_names_lock = threading.Lock()
+
+
+def repo_display_name(repo_path):
+    # Remote-derived name, looked up once per repo
+    with _names_lock:
+        name = _names.get(repo_path)
+    if name is not None:
+        return name
+    name = os.path.basename(repo_path)
+    try:
+        url = (remote_url(repo_path) or "").strip()
+        if url:
+            name = url.rstrip("/").split("/")[-1].split(":")[-1]
+            if name.endswith(".git"):
+                name = name[:-4]
+    except Exception:
+        pass
+    with _names_lock:
+        _names[repo_path] = name
+    return name
+
+
+def status_signature(status):
+    # What a refresh can change that is worth showing
+    return (status.name, status.branch, status.oid, status.upstream, status.ahead, status.behind,
+            status.files, status.error, status.partial)
+
+
+def supersedes(new, old):
+    # A quick-tier result never replaces a complete status read after it
+    return not (new.partial and old is not None and old.loaded
+                and not old.partial and old.checked > new.checked)
+
+
+def repo_status(repo_path, clean_cache=None, untracked=True, timeout=None, git_config=(), costs=None):
+    # clean_cache is an optional fastpath.CleanCache consulted before forking git.
+    # untracked=False is the quick tier: the result is marked partial. With a
+    # timeout, None is returned if git has not finished in time. costs is an
+    # optional tiered.StatusCosts told how long full statuses take.
+    if not tracing.enabled:
+        return _repo_status(repo_path, clean_cache, untracked, timeout, git_config, costs)
+    with tracing.span("repo_status", "status", repo=repo_path, untracked=untracked):
+        return _repo_status(repo_path, clean_cache, untracked, timeout, git_config, costs)
+
+
+def _repo_status(repo_path, clean_cache, untracked, timeout, git_config, costs):
+    status = RepoStatus(repo_path, repo_display_name(repo_path))
+    status.checked = time.time()
+    if clean_cache is not None and clean_cache.check(status):
+        if tracing.enabled:
+            tracing.count("status:fastpath hit")
+        return status
+    if tracing.enabled:
+        tracing.count("status:git status" if untracked else "status:quick status")
+    args = []
+    for item in git_config:
+        args.extend(["-c", item])
+    args.extend(["status", "--porcelain=v2", "--branch", "-z"])
+    if not untracked:
+        args.append("--untracked-files=no")
+        status.partial = True
+    # A run that may be killed at its deadline must not hold index.lock
+    env = {"GIT_OPTIONAL_LOCKS": "0"} if timeout else None
+    started_ns = time.time_ns()
+    started = time.perf_counter()
+    try:
+        result = run_git(repo_path, *args, text=False, timeout=timeout, env=env)
+        if result.returncode != 0:
+            status.error = result.stderr.decode("utf-8", "replace").strip() or "git status failed"
+        else:
+            parse_porcelain_v2(result.stdout, status)
+    except subprocess.TimeoutExpired:
+        if costs is not None:
+            costs.record(repo_path, time.perf_counter() - started, at_least=True)
+        return None
+    except Exception as e:
+        status.error = str(e)
+    if untracked and costs is not None and status.error is None:
+        costs.record(repo_path, time.perf_counter() - started)
+    if clean_cache is not None and not status.partial:
+        clean_cache.remember(status, started_ns)
+    return status
@@ -0,0 +1,212 @@
+import re
+import time
+import threading
+import subprocess
+
+from gitcmd import run_git
+from gitfs import git_dir, read_head, resolve_ref, upstream_ref, read_config, config_get
+
+FETCH = "fetch"
+PULL = "pull"
+
+# scp-like "user@host:path"; a single letter before ":" is a Windows drive
+SCP_RE = re.compile(r"^(?:[^@/]+@)?([^:/]{2,}):")
+URL_RE = re.compile(r"^[a-z][a-z0-9+.-]*://(?:[^@/]*@)?(\[[^\]]+\]|[^:/]+)", re.I)
+
+
+def remote_host(url):
+    # Host a remote URL talks to; local paths and file:// URLs share "local"
+    if not url or url.lower().startswith("file:"):
+        return "local"
+    match = URL_RE.match(url)
+    if match:
+        return match.group(1).lower()
+    match = SCP_RE.match(url)
+    if match and "/" not in url.split(":", 1)[0]:
+        return match.group(1).lower()
+    return "local"
+
+
+def default_sync_workers():
+    return 8
+
+
+class SyncItem:
+    __slots__ = ("repo", "branch", "remote", "url", "host", "upstream",
+                 "ok", "skipped", "updated", "message", "elapsed")
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.branch = None
+        self.remote = None
+        self.url = None
+        self.host = "local"
+        self.upstream = None  # "origin/main"
+        self.ok = False
+        self.skipped = False
+        self.updated = False
+        self.message = ""
+        self.elapsed = 0.0
+
+
+def plan_item(repo):
+    # Reads branch, upstream and remote from the repo's files, without git
+    item = SyncItem(repo)
+    gitdir = git_dir(repo)
+    if not gitdir:
+        item.skipped = True
+        item.message = "Not a git repository"
+        return item
+    config = read_config(gitdir)
+    item.branch, _ = read_head(gitdir)
+    if item.branch:
+        item.remote = config_get(config, f"branch.{item.branch}.remote")
+        ref = upstream_ref(gitdir, item.branch)
+        if ref and ref.startswith("refs/remotes/"):
+            item.upstream = ref[len("refs/remotes/"):]
+    if item.remote in (None, "."):
+        item.remote = "origin" if config_get(config, "remote.origin.url") else None
+    if item.remote:
+        item.url = config_get(config, f"remote.{item.remote}.url")
+        item.host = remote_host(item.url)
+    return item
+
+
+def plan(repos, mode=FETCH):
+    # Items grouped by host and remote URL so work against the same server
+    # (and the same upstream) is handed out together
+    items = [plan_item(repo) for repo in repos]
+    for item in items:
+        if item.skipped:
+            continue
+        if not item.url:
+            item.skipped = True
+            item.message = "No remote"
+        elif mode == PULL and not item.upstream:
+            item.skipped = True
+            item.message = "No upstream branch"
+    items.sort(key=lambda i: (i.skipped, i.host, i.url or "", i.upstream or "", i.repo))
+    return items
+
+
+class BulkSync:
+    """Fetches or fast-forward pulls many repositories in parallel.
+
+    At most ``max_workers`` git processes run at once and at most
+    ``per_host`` of them talk to the same remote host. Workers take the
+    next item whose host has a free slot, so one slow server does not
+    hold up the others. ``on_result(item)`` is called from worker threads
+    as each repository finishes (skipped items are reported up front).
+    """
+
+    def __init__(self, repos, mode=FETCH, max_workers=None, per_host=2,
+                 on_result=None, timeout=300):
+        self.mode = mode
+        self.items = plan(repos, mode)
+        self.max_workers = max_workers or default_sync_workers()
+        self.per_host = max(1, per_host)
+        self.on_result = on_result
+        self.timeout = timeout
+        self._queue = [i for i in self.items if not i.skipped]
+        self._active = {}  # host: running count
+        self._cancelled = False
+        self._cond = threading.Condition()
+
+    @property
+    def total(self):
+        return len(self.items)
+
+    def cancel(self):
+        with self._cond:
+            self._cancelled = True
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def run(self):
+        # Blocks until every item has been handled; returns the items
+        if self.on_result:
+            for item in self.items:
+                if item.skipped:
+                    self.on_result(item)
+        threads = [threading.Thread(target=self._work, daemon=True)
+                   for _ in range(min(self.max_workers, len(self._queue)))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.items
+
+    def _take(self):
+        with self._cond:
+            while True:
+                if self._cancelled or not self._queue:
+                    return None
+                for n, item in enumerate(self._queue):
+                    if self._active.get(item.host, 0) < self.per_host:
+                        del self._queue[n]
+                        self._active[item.host] = self._active.get(item.host, 0) + 1
+                        return item
+                self._cond.wait()
+
+    def _release(self, item):
+        with self._cond:
+            self._active[item.host] -= 1
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            item = self._take()
+            if item is None:
+                return
+            try:
+                self._sync(item)
+            finally:
+                self._release(item)
+            if self.on_result:
+                self.on_result(item)
+
+    def _sync(self, item):
+        gitdir = git_dir(item.repo)
+        if self.mode == PULL:
+            ref = "HEAD"
+            args = ["pull", "--ff-only", "--quiet"]
+        else:
+            ref = f"refs/remotes/{item.upstream}" if item.upstream else None
+            args = ["fetch", "--prune", "--quiet", item.remote]
+        before = resolve_ref(gitdir, ref) if ref else None
+        started = time.monotonic()
+        try:
+            result = run_git(item.repo, *args, timeout=self.timeout, env={"GIT_TERMINAL_PROMPT": "0"})
+        except subprocess.TimeoutExpired:
+            item.message = f"Timed out after {self.timeout}s"
+            item.elapsed = time.monotonic() - started
+            return
+        item.elapsed = time.monotonic() - started
+        if result.returncode != 0:
+            lines = [l for l in result.stderr.strip().splitlines() if l.strip()]
+            item.message = lines[-1] if lines else f"git {args[0]} failed"
+            return
+        item.ok = True
+        after = resolve_ref(gitdir, ref) if ref else None
+        item.updated = before != after
+        item.message = "Updated" if item.updated else "Up to date"
+
+
+def summarize(items):
+    counts = {"updated": 0, "up_to_date": 0, "failed": 0, "skipped": 0}
+    for item in items:
+        if item.skipped:
+            counts["skipped"] += 1
+        elif not item.ok:
+            counts["failed"] += 1
+        elif item.updated:
+            counts["updated"] += 1
+        else:
+            counts["up_to_date"] += 1
+    return counts
+
+
+def summary_text(items):
+    counts = summarize(items)
+    return (f"{counts['updated']} updated, {counts['up_to_date']} up to date, "
+            f"{counts['failed']} failed, {counts['skipped']} skipped")
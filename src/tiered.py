@@ -0,0 +1,138 @@
+import os
+import sys
+import json
+import threading
+
+import tracing
+from config import cache_path
+from gitfs import git_dir, read_config, config_get
+from status import repo_status
+
+# Weight of the newest sample in a repository's running cost estimate
+COST_ALPHA = 0.3
+
+
+class StatusCosts:
+    """Learned wall time of a full ``git status`` per repository, in seconds.
+
+    Each sample moves the estimate part of the way towards it, so one slow
+    run after a checkout does not mark a repository slow for good. A run cut
+    off at its deadline only says the cost is at least that much.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or cache_path("status_costs.json")
+        self.costs = {}  # repo: seconds
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.costs = json.load(f)
+        except (OSError, ValueError):
+            self.costs = {}
+        return self
+
+    def save(self):
+        with self.lock:
+            data = dict(self.costs)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def estimate(self, repo):
+        with self.lock:
+            return self.costs.get(repo)
+
+    def record(self, repo, seconds, at_least=False):
+        with self.lock:
+            old = self.costs.get(repo)
+            if at_least:
+                self.costs[repo] = max(old or 0.0, seconds)
+            elif old is None:
+                self.costs[repo] = seconds
+            else:
+                self.costs[repo] = old + COST_ALPHA * (seconds - old)
+
+    def forget(self, repo):
+        with self.lock:
+            self.costs.pop(repo, None)
+
+
+def accelerated(repo):
+    # True when the repository itself turns on the untracked cache or fsmonitor
+    gitdir = git_dir(repo)
+    if not gitdir:
+        return False
+    config = read_config(gitdir)
+    fsmonitor = config_get(config, "core.fsmonitor", "false").lower()
+    untracked_cache = config_get(config, "core.untrackedCache", "keep").lower()
+    return fsmonitor not in ("false", "no", "off", "0", "") or untracked_cache in ("true", "yes", "on", "1")
+
+
+def acceleration_config():
+    # ``-c`` settings for slow repositories that do not configure these
+    # themselves. The builtin fsmonitor daemon exists only on macOS and Windows.
+    config = ["core.untrackedCache=true"]
+    if sys.platform in ("darwin", "win32"):
+        config.append("core.fsmonitor=true")
+    return config
+
+
+class TieredStatus:
+    """Status worker that keeps slow repositories from holding up their row.
+
+    A repository whose learned full-status cost is within ``deadline`` gets a
+    normal ``git status``. A slower one first gets a quick pass with untracked
+    scanning off, returned as a partial status, and its full pass is handed to
+    ``resubmit`` to run behind everything more urgent; if even the quick pass
+    misses the deadline, None is returned and only the full pass follows. A
+    repository with no estimate yet gets a full pass cut off at the deadline;
+    if that runs out, it is treated as slow. Repositories that enable the untracked cache or
+    fsmonitor are never cut off, since git refreshes those caches as part of
+    the run. With ``accelerate``, slow repositories that do not enable them
+    get them for their full pass.
+    """
+
+    def __init__(self, costs, clean_cache=None, deadline=0.5, resubmit=None, accelerate=False):
+        self.costs = costs
+        self.clean_cache = clean_cache
+        self.deadline = deadline
+        self.resubmit = resubmit
+        self.accelerate = accelerate
+        self._full_due = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, repo):
+        with self._lock:
+            full_due = repo in self._full_due
+            self._full_due.discard(repo)
+        if full_due:
+            return self.full(repo)
+        estimate = self.costs.estimate(repo)
+        if estimate is None:
+            if accelerated(repo):
+                return self.full(repo)
+            status = repo_status(repo, self.clean_cache, timeout=self.deadline, costs=self.costs)
+            if status is not None:
+                return status
+            if tracing.enabled:
+                tracing.count("status:deadline missed")
+        elif estimate <= self.deadline:
+            return self.full(repo)
+        status = repo_status(repo, self.clean_cache, untracked=False, timeout=self.deadline)
+        if status is None and tracing.enabled:
+            tracing.count("status:quick deadline missed")
+        if (status is None or status.partial) and self.resubmit is not None:
+            with self._lock:
+                self._full_due.add(repo)
+            self.resubmit(repo)
+        return status
+
+    def full(self, repo):
+        git_config = ()
+        estimate = self.costs.estimate(repo)
+        if self.accelerate and estimate is not None and estimate > self.deadline and not accelerated(repo):
+            git_config = acceleration_config()
+        return repo_status(repo, self.clean_cache, git_config=git_config, costs=self.costs)
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import atexit
+import threading
+from collections import deque
+
+# Opt-in instrumentation for git subprocesses, discovery, status and GUI
+# refreshes. Switched on by GITCOMPASS_TRACE (1, or a file to write the
+# trace to at exit) or the "trace" setting. Call sites check ``enabled``
+# first, so a disabled tracer costs one global lookup.
+#
+# Spans are kept as Chrome trace-event "complete" events (chrome://tracing,
+# ui.perfetto.dev) in a bounded buffer; counters aggregate count, total and
+# max duration per name and survive the buffer dropping old spans.
+
+ENV_VAR = "GITCOMPASS_TRACE"
+MAX_EVENTS = 200_000
+SLOW_COMMANDS = 50
+
+enabled = False
+_lock = threading.Lock()
+_events = deque(maxlen=MAX_EVENTS)
+_counters = {}  # name: [count, total_ns, max_ns]
+_repos = {}  # repo: [git calls, total_ns, max_ns]
+_slowest = []  # [(duration_ns, command, repo, returncode, output bytes)], longest first
+_threads = {}  # thread ident: small tid
+_epoch_ns = time.perf_counter_ns()
+_wall_epoch = time.time()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    global _epoch_ns, _wall_epoch
+    with _lock:
+        _events.clear()
+        _counters.clear()
+        _repos.clear()
+        del _slowest[:]
+        _epoch_ns = time.perf_counter_ns()
+        _wall_epoch = time.time()
+
+
+def _tid():
+    ident = threading.get_ident()
+    tid = _threads.get(ident)
+    if tid is None:
+        tid = _threads[ident] = len(_threads) + 1
+    return tid
+
+
+def _count(name, duration_ns):
+    counter = _counters.get(name)
+    if counter is None:
+        _counters[name] = [1, duration_ns, duration_ns]
+    else:
+        counter[0] += 1
+        counter[1] += duration_ns
+        if duration_ns > counter[2]:
+            counter[2] = duration_ns
+
+
+def record(name, cat, start_ns, end_ns, args=None):
+    # A finished span; start/end come from time.perf_counter_ns()
+    duration = end_ns - start_ns
+    event = {"name": name, "cat": cat, "ph": "X", "ts": (start_ns - _epoch_ns) / 1000,
+             "dur": duration / 1000, "pid": os.getpid()}
+    with _lock:
+        event["tid"] = _tid()
+        if args:
+            event["args"] = args
+        _events.append(event)
+        _count(f"{cat}:{name}", duration)
+
+
+def count(name, value=1):
+    # Plain counter with no duration, e.g. cache hits
+    with _lock:
+        counter = _counters.setdefault(name, [0, 0, 0])
+        counter[0] += value
+
+
+def record_git(args, repo, start_ns, end_ns, returncode, output_bytes):
+    command = " ".join(args[:2]) if args and args[0] == "-c" else (args[0] if args else "git")
+    duration = end_ns - start_ns
+    record(f"git {command}", "git", start_ns, end_ns,
+           {"repo": repo, "argv": list(args), "exit": returncode, "bytes": output_bytes})
+    with _lock:
+        if repo:
+            stats = _repos.setdefault(repo, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+        if len(_slowest) < SLOW_COMMANDS or duration > _slowest[-1][0]:
+            _slowest.append((duration, " ".join(args), repo, returncode, output_bytes))
+            _slowest.sort(key=lambda s: -s[0])
+            del _slowest[SLOW_COMMANDS:]
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+    args = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, cat="app", **args):
+    # ``with tracing.span("walk", "discovery"):``; a shared no-op when disabled
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, cat, args or None)
+
+
+def traced(cat):
+    # Decorator form of span for methods on hot GUI paths
+    def wrap(func):
+        name = func.__qualname__
+
+        def inner(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, cat, start, time.perf_counter_ns())
+        inner.__name__ = func.__name__
+        inner.__qualname__ = func.__qualname__
+        inner.__doc__ = func.__doc__
+        return inner
+    return wrap
+
+
+def counters():
+    # {name: (count, total_ms, max_ms)}
+    with _lock:
+        return {name: (c, total / 1e6, peak / 1e6) for name, (c, total, peak) in _counters.items()}
+
+
+def slowest_repos(limit=20):
+    # [(repo, git calls, total_ms, max_ms)] by total git time
+    with _lock:
+        rows = [(repo, c, total / 1e6, peak / 1e6) for repo, (c, total, peak) in _repos.items()]
+    rows.sort(key=lambda r: -r[2])
+    return rows[:limit]
+
+
+def slowest_commands(limit=SLOW_COMMANDS):
+    # [(duration_ms, command, repo, exit code, output bytes)]
+    with _lock:
+        return [(d / 1e6, cmd, repo, rc, size) for d, cmd, repo, rc, size in _slowest[:limit]]
+
+
+def export_chrome(path):
+    # Writes a Chrome/Perfetto trace; returns the number of spans written
+    with _lock:
+        events = list(_events)
+        names = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                  "args": {"name": f"thread {tid}"}} for tid in _threads.values()]
+        totals = {name: {"count": c, "total_ms": total / 1e6, "max_ms": peak / 1e6}
+                  for name, (c, total, peak) in _counters.items()}
+    data = {"traceEvents": names + events, "displayTimeUnit": "ms",
+            "otherData": {"started": _wall_epoch, "counters": totals}}
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+    return len(events)
+
+
+def default_trace_path():
+    from config import cache_path
+    return cache_path("trace.json")
+
+
+def _setup_from_env():
+    value = os.environ.get(ENV_VAR, "").strip()
+    if not value or value == "0":
+        return
+    enable()
+    path = default_trace_path() if value in ("1", "true", "yes") else os.path.abspath(os.path.expanduser(value))
+    atexit.register(lambda: export_chrome(path))
+
+
+_setup_from_env()
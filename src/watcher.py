@@ -0,0 +1,351 @@
+import os
+import sys
+import time
+import select
+import struct
+import threading
+from collections import deque
+
+from discovery import DEFAULT_IGNORE
+from gitfs import git_dir, common_dir
+from fastpath import repo_index, IndexUnsupported
+
+# Files directly inside the git dir whose changes affect status
+GIT_FILES = {"HEAD", "index", "packed-refs", "FETCH_HEAD", "MERGE_HEAD", "ORIG_HEAD"}
+
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.ctypes = ctypes
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(self.ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def remove(self, wd):
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + EVENT.size <= len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, pos)
+            pos += EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def inotify_available():
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        Inotify().close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+def watch_targets(repo, max_dirs):
+    # [(kind, directory)] to watch for one repository
+    gitdir = git_dir(repo)
+    if not gitdir:
+        return []
+    targets = [("git", gitdir)]
+    common = common_dir(gitdir)
+    if common != gitdir:
+        targets.append(("git", common))
+    for sub in ("heads", "remotes"):
+        for root, dirs, _ in os.walk(os.path.join(common, "refs", sub)):
+            targets.append(("refs", root))
+    tree = [repo]
+    count = 0
+    while tree and count < max_dirs:
+        path = tree.pop()
+        targets.append(("tree", path))
+        count += 1
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name in DEFAULT_IGNORE or not entry.is_dir(follow_symlinks=False):
+                        continue
+                    if os.path.lexists(os.path.join(entry.path, ".git")):
+                        continue  # nested repo, watched on its own
+                    tree.append(entry.path)
+        except OSError:
+            pass
+    return targets
+
+
+class RepoWatcher:
+    """Watches repositories and reports each changed repo once per burst.
+
+    Uses inotify on Linux (git dir, refs and working-tree directories) and
+    otherwise polls the mtimes of the git metadata and the top of the tree,
+    plus, every ``tracked_every`` polls, the mtime and size of up to
+    ``poll_files`` tracked files listed in the index (edits to existing files
+    change no directory).
+    Events are coalesced per repository: ``on_change(repo)`` fires once the
+    repo has been quiet for ``debounce`` seconds, or after ``max_delay`` if
+    it keeps changing.
+    """
+
+    def __init__(self, on_change, backend="auto", debounce=0.3, max_delay=2.0,
+                 poll_interval=3.0, max_dirs=2000, poll_dirs=64, tracked_every=5, poll_files=20000):
+        self.on_change = on_change
+        if backend == "auto":
+            backend = "inotify" if inotify_available() else "poll"
+        self.backend = backend
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.max_dirs = max_dirs
+        self.poll_dirs = poll_dirs
+        self.tracked_every = tracked_every
+        self.poll_files = poll_files
+        self._polls = 0
+        self._inotify = None
+        self._wds = {}  # wd: (repo, kind, directory)
+        self._repo_wds = {}  # repo: {wd}
+        self._polled = {}  # repo: {path: mtime_ns}
+        self._tracked = {}  # repo: fingerprint of its tracked files' stat data
+        self._pending = {}  # repo: (first event, last event)
+        self._requests = deque()
+        self._wake_r, self._wake_w = os.pipe()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self.backend == "inotify":
+            self._inotify = Inotify()
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join()
+        if self._inotify:
+            self._inotify.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def watch(self, repo):
+        self._requests.append(("watch", repo))
+        self._wake()
+
+    def unwatch(self, repo):
+        self._requests.append(("unwatch", repo))
+        self._wake()
+
+    def clear(self):
+        self._requests.append(("clear", None))
+        self._wake()
+
+    def watched(self):
+        return set(self._repo_wds) | set(self._polled)
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def _loop(self):
+        next_poll = time.monotonic() + self.poll_interval
+        while self._running:
+            now = time.monotonic()
+            timeout = next_poll - now if self._polled else None
+            for first, last in self._pending.values():
+                due = min(last + self.debounce, first + self.max_delay) - now
+                timeout = due if timeout is None else min(timeout, due)
+            fds = [self._wake_r] + ([self._inotify.fd] if self._inotify else [])
+            readable, _, _ = select.select(fds, [], [], None if timeout is None else max(0.0, timeout))
+            if self._wake_r in readable:
+                os.read(self._wake_r, 4096)
+            self._handle_requests()
+            if self._inotify and self._inotify.fd in readable:
+                self._handle_events(self._inotify.read())
+            now = time.monotonic()
+            if self._polled and now >= next_poll:
+                self._poll()
+                next_poll = now + self.poll_interval
+            self._flush(time.monotonic())
+
+    def _handle_requests(self):
+        while self._requests:
+            action, repo = self._requests.popleft()
+            if action == "watch":
+                self._add_repo(repo)
+            elif action == "unwatch":
+                self._remove_repo(repo)
+            else:
+                for r in list(self.watched()):
+                    self._remove_repo(r)
+                self._pending.clear()
+
+    def _add_repo(self, repo):
+        if repo in self._repo_wds or repo in self._polled:
+            return
+        if self._inotify is None:
+            self._polled[repo] = self._poll_snapshot(repo)
+            self._tracked[repo] = self._tracked_fingerprint(repo)
+            return
+        wds = self._repo_wds.setdefault(repo, set())
+        for kind, path in watch_targets(repo, self.max_dirs):
+            if not self._add_watch(repo, kind, path) and kind != "tree":
+                # Out of watches for the git metadata: poll this repo instead
+                self._remove_repo(repo)
+                self._polled[repo] = self._poll_snapshot(repo)
+                self._tracked[repo] = self._tracked_fingerprint(repo)
+                return
+        if not wds:
+            del self._repo_wds[repo]
+
+    def _add_watch(self, repo, kind, path):
+        try:
+            wd = self._inotify.add(path)
+        except OSError:
+            return False
+        self._wds[wd] = (repo, kind, path)
+        self._repo_wds.setdefault(repo, set()).add(wd)
+        return True
+
+    def _remove_repo(self, repo):
+        for wd in self._repo_wds.pop(repo, ()):
+            if self._wds.pop(wd, None) is not None:
+                self._inotify.remove(wd)
+        self._polled.pop(repo, None)
+        self._tracked.pop(repo, None)
+        self._pending.pop(repo, None)
+
+    def _handle_events(self, events):
+        now = time.monotonic()
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # Lost events: assume every repo changed
+                for repo in self.watched():
+                    self._mark(repo, now)
+                continue
+            target = self._wds.get(wd)
+            if target is None:
+                continue
+            repo, kind, path = target
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                self._repo_wds.get(repo, set()).discard(wd)
+                continue
+            if name.endswith(".lock"):
+                continue
+            if kind == "git" and name not in GIT_FILES:
+                continue
+            if kind == "tree" and name in DEFAULT_IGNORE:
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and kind != "git":
+                self._add_watch(repo, kind, os.path.join(path, name))
+            self._mark(repo, now)
+
+    def _mark(self, repo, now):
+        first = self._pending.get(repo, (now, now))[0]
+        self._pending[repo] = (first, now)
+
+    def _flush(self, now):
+        due = [repo for repo, (first, last) in self._pending.items()
+               if now - last >= self.debounce or now - first >= self.max_delay]
+        for repo in due:
+            del self._pending[repo]
+            self.on_change(repo)
+
+    def _poll_snapshot(self, repo):
+        snap = {}
+        targets = watch_targets(repo, self.poll_dirs)
+        paths = [path for _, path in targets]
+        for kind, path in targets:
+            if kind == "git":
+                paths.extend(os.path.join(path, name) for name in GIT_FILES)
+        for path in paths:
+            try:
+                snap[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                snap[path] = None
+        return snap
+
+    def _tracked_fingerprint(self, repo):
+        gitdir = git_dir(repo)
+        if not gitdir:
+            return None
+        try:
+            entries = repo_index(gitdir)
+        except (OSError, IndexUnsupported, struct.error, ValueError):
+            return None
+        root = os.fsencode(repo)
+        stats = []
+        for entry in entries[:self.poll_files]:
+            try:
+                st = os.lstat(os.path.join(root, entry[0]))
+                stats.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stats.append(None)
+        return hash(tuple(stats))
+
+    def _poll(self):
+        now = time.monotonic()
+        self._polls += 1
+        check_tracked = self._polls % self.tracked_every == 0
+        for repo, snap in list(self._polled.items()):
+            changed = False
+            for path, mtime in snap.items():
+                try:
+                    current = os.stat(path).st_mtime_ns
+                except OSError:
+                    current = None
+                if current != mtime:
+                    changed = True
+                    break
+            if changed:
+                self._polled[repo] = self._poll_snapshot(repo)
+                self._tracked[repo] = self._tracked_fingerprint(repo)
+                self._mark(repo, now)
+            elif check_tracked:
+                fingerprint = self._tracked_fingerprint(repo)
+                if fingerprint != self._tracked.get(repo):
+                    self._tracked[repo] = fingerprint
+                    self._mark(repo, now)
@@ -0,0 +1,128 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from commitcache import CachedLogReader, CommitCache, CommitHistory, read_records  # noqa: E402
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture(autouse=True)
+def git_env(monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for kind in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{kind}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{kind}_EMAIL", "test@example.com")
+
+
+def commit(repo, subject, author="Test <test@example.com>"):
+    git(repo, "commit", "-q", "--allow-empty", "-m", subject, f"--author={author}")
+
+
+def log(repo, *args):
+    return git(repo, "log", "--format=%H", *args).split()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = str(tmp_path / "repo")
+    git(tmp_path, "init", "-q", "-b", "main", repo)
+    for n in range(5):
+        commit(repo, f"commit {n}", "Alice <alice@example.com>" if n % 2 else "Bob <bob@example.com>")
+    # A merge, so parents point both ways
+    git(repo, "checkout", "-q", "-b", "side", "HEAD~2")
+    commit(repo, "side work")
+    git(repo, "checkout", "-q", "main")
+    git(repo, "merge", "-q", "--no-ff", "-m", "merge side", "side")
+    return repo
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CommitCache(root=str(tmp_path / "cache"))
+
+
+def test_read_records_streams_in_git_order(repo):
+    records = list(read_records(repo, "HEAD", chunk_size=7))  # records span chunks
+    assert [r[0] for r in records] == log(repo)
+    assert [r[0] for r in read_records(repo, "HEAD", reverse=True)] == log(repo, "--reverse")
+    oid, parents, name, email, at, subject = records[0]
+    assert (subject, name, len(parents)) == ("merge side", "Test", 2)
+    with pytest.raises(RuntimeError):
+        list(read_records(repo, "no-such-rev"))
+
+
+def test_build_matches_git(repo, cache):
+    history = cache.build(repo)
+    assert history.tip == git(repo, "rev-parse", "HEAD")
+    assert [history.oid(i) for i in history.matching()] == log(repo)
+    for i in range(len(history)):
+        assert history.parent_oids(i) == git(repo, "log", "-1", "--format=%P", history.oid(i)).split()
+    assert [history.subject(i) for i in history.matching(author="alice")] == ["commit 3", "commit 1"]
+
+
+def test_get_appends_new_commits(repo, cache):
+    history = cache.build(repo)
+    before = len(history)
+    commit(repo, "six")
+    commit(repo, "seven")
+    updated = cache.get(repo)
+    assert updated is history  # extended in place
+    assert len(updated) == before + 2
+    assert updated.tip == git(repo, "rev-parse", "HEAD")
+    assert [updated.oid(i) for i in updated.matching()] == log(repo)
+    assert updated.parent_oids(len(updated) - 1) == [updated.oid(len(updated) - 2)]
+    # Saved: a fresh cache loads the extended history from disk
+    reloaded = CommitCache(root=cache.root).get(repo)
+    assert [reloaded.oid(i) for i in reloaded.matching()] == log(repo)
+
+
+def test_rewritten_history_is_rebuilt(repo, cache):
+    cache.build(repo)
+    git(repo, "reset", "-q", "--hard", "HEAD~2")
+    commit(repo, "rewritten")
+    assert cache.get(repo) is None
+    history = cache.build(repo)
+    assert [history.oid(i) for i in history.matching()] == log(repo)
+    assert cache.get(repo) is history
+
+
+def test_round_trip(repo, cache):
+    history = cache.build(repo)
+    copy = CommitHistory.from_bytes(history.to_bytes())
+    assert [copy.commit(i).oid for i in copy.matching()] == log(repo)
+    assert copy.authors == history.authors
+    with pytest.raises(ValueError):
+        CommitHistory.from_bytes(history.to_bytes()[:-10])
+
+
+def test_cached_reader_pages(repo, cache):
+    cache.build(repo)
+    reader = CachedLogReader(cache, repo)
+    pages = []
+    while not reader.at_end:
+        pages.append([c.oid for c in reader.read(3)])
+    assert reader.cached
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert sum(pages, []) == log(repo)
+    first = CachedLogReader(cache, repo).read(1)[0]
+    assert first.refs == "HEAD -> main"
+    reader = CachedLogReader(cache, repo, author="bob")
+    assert [c.subject for c in reader.read(10)] == ["commit 4", "commit 2", "commit 0"]
+    assert reader.at_end
+
+
+def test_cached_reader_falls_back_to_git(repo, cache):
+    reader = CachedLogReader(cache, repo)
+    commits = reader.read(100)
+    assert not reader.cached
+    assert [c.oid for c in commits] == log(repo)
+    reader.close()
+    assert reader.read(1) == []
@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from fastpath import CleanCache, IndexUnsupported, read_index  # noqa: E402
+from status import RepoStatus, repo_status  # noqa: E402
+
+FILES = ["README.md", "src/app.py", "src/app/__init__.py", "src/app/core/engine.py",
+         "src/app/core/engine_test.py", "docs/read me.txt", "docs/ünïcode.md", "long/" + "z" * 200 + ".txt"]
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True).stdout
+
+
+@pytest.fixture(autouse=True)
+def git_env(monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for kind in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{kind}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{kind}_EMAIL", "test@example.com")
+
+
+def backdate(repo, seconds=10):
+    # Worktree older than any snapshot taken from now on
+    past = time.time() - seconds
+    for dirpath, dirnames, filenames in os.walk(repo):
+        dirnames[:] = [d for d in dirnames if d != ".git"]
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (past, past))
+        os.utime(dirpath, (past, past))
+    os.utime(os.path.join(repo, ".git", "info", "exclude"), (past, past))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = str(tmp_path / "repo")
+    git(tmp_path, "init", "-q", "-b", "main", repo)
+    for name in FILES:
+        path = os.path.join(repo, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(name)
+    os.chmod(os.path.join(repo, "src/app.py"), 0o755)
+    backdate(repo)
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "one")
+    return repo
+
+
+def index_entries(repo):
+    return [(os.fsdecode(e[0]), e[4], e[5]) for e in read_index(os.path.join(repo, ".git", "index"))]
+
+
+def ls_files(repo):
+    # (path, size on disk, mode) of every index entry, as git lists them
+    entries = []
+    for record in git(repo, "ls-files", "-s", "-z").split(b"\0"):
+        if record:
+            meta, _, name = record.partition(b"\t")
+            size = os.lstat(os.path.join(os.fsencode(repo), name)).st_size
+            entries.append((os.fsdecode(name), size, int(meta.split()[0], 8)))
+    return entries
+
+
+@pytest.mark.parametrize("version", [2, 4])
+def test_read_index_matches_ls_files(repo, version):
+    git(repo, "update-index", "--index-version", str(version))
+    with open(os.path.join(repo, ".git", "index"), "rb") as f:
+        assert f.read(8)[4:] == version.to_bytes(4, "big")
+    entries = index_entries(repo)
+    assert entries == ls_files(repo)
+    assert len(entries) == len(FILES)
+
+
+def test_read_index_v3_extended_flags(repo):
+    # Extended flags are the only reason git writes version 3
+    git(repo, "update-index", "--index-version", "3", "--skip-worktree", "README.md")
+    with open(os.path.join(repo, ".git", "index"), "rb") as f:
+        assert f.read(8)[4:] == (3).to_bytes(4, "big")
+    with pytest.raises(IndexUnsupported):
+        index_entries(repo)
+    git(repo, "update-index", "--no-skip-worktree", "README.md")
+    assert index_entries(repo) == ls_files(repo)
+
+
+def test_read_index_rejects_unmerged_entries(repo):
+    oid = git(repo, "rev-parse", "HEAD:README.md").decode().strip()
+    info = "".join(f"100644 {oid} {stage}\tREADME.md\n" for stage in (1, 2, 3))
+    subprocess.run(["git", "update-index", "--index-info"], cwd=repo, input=info.encode(), check=True)
+    with pytest.raises(IndexUnsupported):
+        index_entries(repo)
+
+
+def cached_status(repo, cache):
+    status = RepoStatus(repo)
+    return status if cache.check(status) else None
+
+
+def test_clean_cache_hit_and_edits(repo, tmp_path):
+    cache = CleanCache(str(tmp_path / "clean.json"))
+    assert repo_status(repo, clean_cache=cache).files == []
+    assert cached_status(repo, cache).files == []
+    with open(os.path.join(repo, "src/app/core/engine.py"), "a") as f:
+        f.write("changed")
+    assert cached_status(repo, cache) is None
+
+
+@pytest.mark.parametrize("where", ["", "src/app", "build", "build/nested/deeper"])
+def test_clean_cache_sees_new_untracked_file(repo, tmp_path, where):
+    # Empty directories hold no tracked files, and git status does not list
+    # them; a file created inside one must still miss the cache
+    os.makedirs(os.path.join(repo, "build", "nested", "deeper"))
+    past = time.time() - 10
+    for d in ["", "build", "build/nested", "build/nested/deeper"]:
+        os.utime(os.path.join(repo, d), (past, past))
+    cache = CleanCache(str(tmp_path / "clean.json"))
+    assert repo_status(repo, clean_cache=cache).files == []
+    assert cached_status(repo, cache) is not None
+    with open(os.path.join(repo, where, "new.txt"), "w") as f:
+        f.write("new")
+    assert cached_status(repo, cache) is None
+    assert repo_status(repo).untracked == 1  # and git agrees
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from githelper import HelperPool  # noqa: E402
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture(autouse=True)
+def git_env(monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for kind in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{kind}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{kind}_EMAIL", "test@example.com")
+
+
+def make_repo(path):
+    git(path.parent, "init", "-q", "-b", "main", str(path))
+    for n in range(2):
+        git(path, "commit", "-q", "--allow-empty", "-m", f"commit {n}")
+    return str(path)
+
+
+@pytest.fixture
+def pool():
+    pool = HelperPool(max_helpers=2)
+    yield pool
+    pool.close()
+
+
+def test_branch_names_need_no_helper(tmp_path, pool):
+    repo = make_repo(tmp_path / "repo")
+    assert pool.resolve(repo, "main") == git(repo, "rev-parse", "main")
+    assert pool.resolve(repo, "HEAD") == git(repo, "rev-parse", "HEAD")
+    assert len(pool) == 0
+
+
+def test_helper_is_reused_then_closed(tmp_path, pool):
+    repo = make_repo(tmp_path / "repo")
+    assert pool.resolve(repo, "HEAD~1") == git(repo, "rev-parse", "HEAD~1")
+    helper = pool.helper(repo)
+    proc = helper._proc
+    assert proc is not None and proc.poll() is None
+    assert pool.resolve(repo, "HEAD^{tree}") == git(repo, "rev-parse", "HEAD^{tree}")
+    assert pool.resolve(repo, "no-such-rev") is None
+    assert pool.helper(repo) is helper and helper._proc is proc
+    assert len(pool) == 1
+    pool.close()
+    assert len(pool) == 0
+    assert helper.closed and proc.poll() is not None
+
+
+def test_dead_helper_is_restarted(tmp_path, pool):
+    repo = make_repo(tmp_path / "repo")
+    pool.resolve(repo, "HEAD~1")
+    helper = pool.helper(repo)
+    dead = helper._proc
+    dead.kill()
+    dead.wait()
+    assert pool.resolve(repo, "HEAD~1") == git(repo, "rev-parse", "HEAD~1")
+    assert helper._proc is not dead
+
+
+def test_least_recently_used_is_evicted(tmp_path, pool):
+    repos = [make_repo(tmp_path / f"repo{n}") for n in range(3)]
+    helpers = []
+    for repo in repos:
+        pool.resolve(repo, "HEAD~1")
+        helpers.append(pool.helper(repo))
+    assert len(pool) == 2
+    assert helpers[0].closed and not helpers[2].closed
+
+
+def test_idle_helpers_are_reaped(tmp_path):
+    repo = make_repo(tmp_path / "repo")
+    pool = HelperPool(idle_timeout=0.2)
+    try:
+        pool.resolve(repo, "HEAD~1")
+        helper = pool.helper(repo)
+        deadline = time.monotonic() + 5
+        while len(pool) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(pool) == 0 and helper.closed
+    finally:
+        pool.close()
@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from scheduler import (StatusScheduler, PRIORITY_SELECTED, PRIORITY_VISIBLE,  # noqa: E402
+                       PRIORITY_NORMAL, PRIORITY_BACKGROUND)
+
+
+class FakeWorker:
+    # Records the repos it is called with; "hold" blocks until released, so
+    # the queue can be arranged while the only worker thread is busy
+    def __init__(self):
+        self.calls = []
+        self.results = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def __call__(self, repo):
+        with self.lock:
+            self.calls.append(repo)
+        if repo == "hold":
+            self.started.set()
+            assert self.release.wait(5)
+        if repo == "boom":
+            raise RuntimeError(repo)
+        return f"status of {repo}"
+
+    def on_result(self, result):
+        with self.lock:
+            self.results.append(result)
+
+
+@pytest.fixture
+def worker():
+    return FakeWorker()
+
+
+@pytest.fixture
+def scheduler(worker):
+    scheduler = StatusScheduler(worker, on_result=worker.on_result, max_workers=1)
+    yield scheduler
+    worker.release.set()
+    scheduler.shutdown()
+
+
+def hold(scheduler, worker):
+    scheduler.submit("hold", PRIORITY_SELECTED)
+    assert worker.started.wait(5)
+
+
+def test_priority_order_fifo_within_priority(scheduler, worker):
+    hold(scheduler, worker)
+    scheduler.submit("a", PRIORITY_BACKGROUND)
+    scheduler.submit("b", PRIORITY_NORMAL)
+    scheduler.submit("c", PRIORITY_SELECTED)
+    scheduler.submit("d", PRIORITY_NORMAL)
+    scheduler.submit("e", PRIORITY_VISIBLE)
+    worker.release.set()
+    assert scheduler.join(5)
+    assert worker.calls == ["hold", "c", "e", "b", "d", "a"]
+    assert worker.results == [f"status of {r}" for r in worker.calls]
+
+
+def test_resubmit_promotes_and_dedupes(scheduler, worker):
+    hold(scheduler, worker)
+    for repo in ["a", "b", "c"]:
+        scheduler.submit(repo, PRIORITY_BACKGROUND)
+    scheduler.submit("c", PRIORITY_SELECTED)  # moves forward
+    scheduler.submit("a", PRIORITY_BACKGROUND)  # already queued: no-op
+    scheduler.submit("c", PRIORITY_BACKGROUND)  # never demoted
+    assert scheduler.pending() == 3
+    worker.release.set()
+    assert scheduler.join(5)
+    assert worker.calls == ["hold", "c", "a", "b"]
+
+
+def test_prioritize_only_bumps_queued_repos(scheduler, worker):
+    hold(scheduler, worker)
+    scheduler.submit("a", PRIORITY_BACKGROUND)
+    scheduler.submit("b", PRIORITY_BACKGROUND)
+    scheduler.prioritize(["b", "unknown"], PRIORITY_VISIBLE)
+    assert scheduler.pending() == 2
+    worker.release.set()
+    assert scheduler.join(5)
+    assert worker.calls == ["hold", "b", "a"]
+
+
+def test_cancel_drops_queue_and_in_flight_result(scheduler, worker):
+    hold(scheduler, worker)
+    scheduler.submit("a")
+    scheduler.submit("b")
+    scheduler.cancel()
+    assert scheduler.pending() == 0
+    worker.release.set()
+    assert scheduler.join(5)
+    assert worker.calls == ["hold"]
+    assert worker.results == []
+    scheduler.submit("c")  # still usable afterwards
+    assert scheduler.join(5)
+    assert worker.results == ["status of c"]
+
+
+def test_worker_errors_are_skipped(scheduler, worker):
+    scheduler.submit("boom")
+    scheduler.submit("a")
+    assert scheduler.join(5)
+    assert worker.results == ["status of a"]
+
+
+def test_group_members_run_together(worker):
+    groups = {"a1": "A", "a2": "A", "b1": "B"}
+    scheduler = StatusScheduler(worker, on_result=worker.on_result, max_workers=1, group_of=groups.get)
+    try:
+        hold(scheduler, worker)
+        scheduler.submit("a1")
+        scheduler.submit("b1")
+        scheduler.submit("a2")
+        worker.release.set()
+        assert scheduler.join(5)
+        assert worker.calls == ["hold", "a1", "a2", "b1"]
+    finally:
+        scheduler.shutdown()
+
+
+def test_pool_is_bounded_and_idle_workers_exit(worker):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(repo):
+        with lock:
+            running.append(repo)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(repo)
+        return repo
+
+    scheduler = StatusScheduler(slow, max_workers=3, idle_timeout=0.1)
+    for n in range(12):
+        scheduler.submit(f"r{n}")
+    assert scheduler.worker_count() <= 3
+    assert scheduler.join(5)
+    assert max(peak) <= 3
+    deadline = time.monotonic() + 5
+    while scheduler.worker_count() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert scheduler.worker_count() == 0
+    scheduler.shutdown()
+    assert scheduler.submit("late") is False
@@ -0,0 +1,111 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from search import SearchIndex, edit_distance  # noqa: E402
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    for repo in ["/a/linux", "/a/linux-kernel", "/a/flux-cd", "/a/tux", "/a/lake",
+                 "/a/gitcompass", "/a/menu", "/a/area"]:
+        index.update(repo)
+    return index
+
+
+def repos(results):
+    return [repo for repo, _ in results]
+
+
+def test_prefix_ranks_exact_then_shorter_names(index):
+    assert repos(index.search("linux")) == ["/a/linux", "/a/linux-kernel"]
+    assert repos(index.search("li")) == ["/a/linux", "/a/linux-kernel"]
+    assert repos(index.search("LIN")) == ["/a/linux", "/a/linux-kernel"]
+
+
+def test_word_start_beats_infix(index):
+    results = dict(index.search("kernel"))
+    assert results["/a/linux-kernel"] > 700
+    index.update("/a/mykernel")
+    assert repos(index.search("kernel")) == ["/a/linux-kernel", "/a/mykernel"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ux", ["/a/tux", "/a/linux", "/a/flux-cd", "/a/linux-kernel"]),
+    ("nu", ["/a/menu", "/a/linux", "/a/linux-kernel"]),
+    ("ea", ["/a/area"]),
+    ("x", ["/a/tux", "/a/linux", "/a/flux-cd", "/a/linux-kernel"]),
+    ("linu", ["/a/linux", "/a/linux-kernel"]),
+    ("omp", ["/a/gitcompass"]),
+])
+def test_infix(index, query, expected):
+    assert repos(index.search(query)) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("lk", ["/a/linux-kernel", "/a/lake"]),  # word initials first
+    ("gcmp", ["/a/gitcompass"]),
+    ("fcd", ["/a/flux-cd"]),
+])
+def test_abbreviation(index, query, expected):
+    assert repos(index.search(query)) == expected
+
+
+@pytest.mark.parametrize("query", ["gitcompas", "gitcompasss", "gitcmpass", "compsas", "gticompass"])
+def test_misspelling(index, query):
+    assert repos(index.search(query))[:1] == ["/a/gitcompass"]
+
+
+def test_no_match(index):
+    assert index.search("zzzz") == []
+    assert index.search("  ") == []
+
+
+def test_branch_url_and_path_rank_below_name():
+    index = SearchIndex()
+    index.update("/a/tools", branch="feature/search")
+    index.update("/a/search")
+    index.update("/a/other", url="https://example.com/search.git")
+    index.update("/search/nested")
+    assert repos(index.search("search")) == ["/a/search", "/a/tools", "/a/other", "/search/nested"]
+
+
+def test_update_reindexes_and_bumps_version(index):
+    version = index.version
+    assert not index.update("/a/tux")  # unchanged
+    assert index.version == version
+    assert index.update("/a/tux", branch="penguin")
+    assert index.version == version + 1
+    assert repos(index.search("penguin")) == ["/a/tux"]
+    index.update("/a/tux", name="mascot")
+    assert repos(index.search("mascot")) == ["/a/tux"]
+    assert dict(index.search("tux"))["/a/tux"] < 600  # only the path matches now
+    assert index.search("penguin") == []
+
+
+def test_remove_and_clear(index):
+    version = index.version
+    index.remove("/a/linux")
+    assert index.version == version + 1
+    assert repos(index.search("linux")) == ["/a/linux-kernel"]
+    assert "/a/linux" not in repos(index.search("ux"))
+    index.remove("/a/linux")  # unknown: no change
+    assert index.version == version + 1
+    assert len(index) == 7
+    index.clear()
+    assert len(index) == 0
+    assert index.version == version + 2
+    assert index.search("linux") == []
+    index.update("/a/linux")
+    assert repos(index.search("lin")) == ["/a/linux"]
+
+
+def test_edit_distance():
+    assert edit_distance("compass", "gitcompass") == 0
+    assert edit_distance("compsas", "gitcompass") == 1  # swap
+    assert edit_distance("compas", "gitcompxss") == 1  # substitution
+    assert edit_distance("abc", "xyz") == 3
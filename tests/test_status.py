@@ -0,0 +1,98 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from status import RepoStatus, parse_porcelain_v2, repo_status  # noqa: E402
+
+OID = "1234567890abcdef1234567890abcdef12345678"
+OID2 = "abcdef1234567890abcdef1234567890abcdef12"
+ZERO = "0" * 40
+
+
+def z(*records):
+    return "".join(record + "\0" for record in records).encode()
+
+
+CASES = {
+    "clean with upstream": (
+        z(f"# branch.oid {OID}", "# branch.head main", "# branch.upstream origin/main", "# branch.ab +2 -3"),
+        {"oid": OID, "branch": "main", "upstream": "origin/main", "ahead": 2, "behind": 3, "files": []},
+    ),
+    "unborn branch": (
+        z("# branch.oid (initial)", "# branch.head main", "? new.txt"),
+        {"oid": None, "branch": "main", "upstream": None, "ahead": 0, "behind": 0,
+         "files": [("??", "new.txt")], "untracked": 1},
+    ),
+    "detached HEAD": (
+        z(f"# branch.oid {OID}", "# branch.head (detached)"),
+        {"oid": OID, "branch": None, "upstream": None, "files": []},
+    ),
+    "ordinary entries": (
+        z(f"# branch.oid {OID}", "# branch.head dev",
+          f"1 .M N... 100644 100644 100644 {OID} {OID} src/app.py",
+          f"1 A. N... 000000 100644 100644 {ZERO} {OID2} docs/read me.md",
+          f"1 MM N... 100644 100644 100644 {OID} {OID2} both.txt"),
+        {"branch": "dev", "files": [(".M", "src/app.py"), ("A.", "docs/read me.md"), ("MM", "both.txt")],
+         "staged": 2, "unstaged": 2},
+    ),
+    "rename with spaces": (
+        z(f"# branch.oid {OID}", "# branch.head main",
+          f"2 R. N... 100644 100644 100644 {OID} {OID} R100 new name.txt", "old name.txt",
+          f"1 .M N... 100644 100644 100644 {OID} {OID} after.txt"),
+        {"files": [("R.", "new name.txt"), (".M", "after.txt")], "staged": 1, "unstaged": 1},
+    ),
+    "unmerged and untracked": (
+        z(f"# branch.oid {OID}", "# branch.head main",
+          f"u UU N... 100644 100644 100644 100644 {OID} {OID2} {OID} conflict file.c",
+          "? scratch dir/notes.txt"),
+        {"files": [("UU", "conflict file.c"), ("??", "scratch dir/notes.txt")],
+         "conflicted": 1, "untracked": 1, "staged": 0, "unstaged": 0},
+    ),
+}
+
+
+@pytest.mark.parametrize("data, expected", CASES.values(), ids=CASES.keys())
+def test_parse_porcelain_v2(data, expected):
+    status = parse_porcelain_v2(data, RepoStatus("/repo"))
+    assert {key: getattr(status, key) for key in expected} == expected
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture(autouse=True)
+def git_env(monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for kind in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{kind}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{kind}_EMAIL", "test@example.com")
+
+
+def test_repo_status_rename_with_spaces(tmp_path):
+    repo = str(tmp_path)
+    git(repo, "init", "-q", "-b", "main")
+    with open(os.path.join(repo, "old name.txt"), "w") as f:
+        f.write("content\n" * 10)
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "one")
+    git(repo, "mv", "old name.txt", "new name.txt")
+    status = repo_status(repo)
+    assert status.error is None
+    assert (status.branch, status.files, status.staged) == ("main", [("R.", "new name.txt")], 1)
+
+
+def test_repo_status_unborn_and_detached(tmp_path):
+    repo = str(tmp_path)
+    git(repo, "init", "-q", "-b", "trunk")
+    status = repo_status(repo)
+    assert (status.branch, status.oid, status.files) == ("trunk", None, [])
+    git(repo, "commit", "-q", "--allow-empty", "-m", "one")
+    git(repo, "checkout", "-q", "--detach")
+    status = repo_status(repo)
+    assert status.branch is None and len(status.oid) == 40
@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import sync  # noqa: E402
+from sync import BulkSync, FETCH, PULL, summarize, summary_text  # noqa: E402
+from status import repo_status  # noqa: E402
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture(autouse=True)
+def git_env(monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for kind in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{kind}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{kind}_EMAIL", "test@example.com")
+
+
+def commit(repo, name):
+    with open(os.path.join(repo, name), "w") as f:
+        f.write(name)
+    git(repo, "add", name)
+    git(repo, "commit", "-q", "-m", name)
+
+
+@pytest.fixture
+def remote(tmp_path):
+    # A bare remote, a clone that pushed a second commit to it, and clones
+    # still at the first commit
+    bare = str(tmp_path / "remote.git")
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", bare)
+    seed = str(tmp_path / "seed")
+    git(tmp_path, "clone", "-q", bare, seed)
+    git(seed, "checkout", "-q", "-b", "main")
+    commit(seed, "one")
+    git(seed, "push", "-q", "origin", "main")
+    clones = []
+    for n in range(4):
+        clone = str(tmp_path / f"clone{n}")
+        git(tmp_path, "clone", "-q", bare, clone)
+        clones.append(clone)
+    commit(seed, "two")
+    git(seed, "push", "-q", "origin", "main")
+    return clones
+
+
+def test_fetch_leaves_clone_behind(remote):
+    items = BulkSync(remote[:1], mode=FETCH).run()
+    assert [(i.ok, i.updated, i.message) for i in items] == [(True, True, "Updated")]
+    assert repo_status(remote[0]).behind == 1
+
+
+def test_pull_fast_forwards(remote):
+    items = BulkSync(remote[:1], mode=PULL).run()
+    assert [(i.ok, i.updated) for i in items] == [(True, True)]
+    status = repo_status(remote[0])
+    assert (status.ahead, status.behind) == (0, 0)
+    assert os.path.exists(os.path.join(remote[0], "two"))
+    items = BulkSync(remote[:1], mode=PULL).run()
+    assert items[0].message == "Up to date"
+
+
+def test_repo_without_remote_is_skipped_and_listed_last(remote, tmp_path):
+    local = str(tmp_path / "local")
+    git(tmp_path, "init", "-q", local)
+    commit(local, "only")
+    reported = []
+    bulk = BulkSync([local, *remote[:2]], mode=FETCH, on_result=reported.append)
+    items = bulk.run()
+    assert [i.repo for i in items] == [*sorted(remote[:2]), local]
+    assert (items[-1].skipped, items[-1].message) == (True, "No remote")
+    assert reported[0].repo == local  # skipped items are reported up front
+    assert summarize(items) == {"updated": 2, "up_to_date": 0, "failed": 0, "skipped": 1}
+    assert summary_text(items) == "2 updated, 0 up to date, 0 failed, 1 skipped"
+
+
+def test_per_host_limit(remote, monkeypatch):
+    # Every clone's remote is a local path, so they all share one host
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    real_run_git = sync.run_git
+
+    def counting_run_git(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            time.sleep(0.1)
+            return real_run_git(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(sync, "run_git", counting_run_git)
+    items = BulkSync(remote, mode=FETCH, max_workers=8, per_host=2).run()
+    assert all(i.ok for i in items)
+    assert peak[0] == 2
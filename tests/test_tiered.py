@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import tiered  # noqa: E402
+from status import RepoStatus  # noqa: E402
+from tiered import StatusCosts, TieredStatus  # noqa: E402
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    # Every repo_status call as (untracked, timeout); a timed quick pass
+    # "runs out" for repos named slow-*
+    calls = []
+
+    def fake_repo_status(repo, clean_cache=None, untracked=True, timeout=None, git_config=(), costs=None):
+        calls.append((untracked, timeout))
+        if timeout is not None and repo.startswith("slow-"):
+            return None
+        status = RepoStatus(repo)
+        status.files = []
+        status.partial = not untracked
+        return status
+
+    monkeypatch.setattr(tiered, "repo_status", fake_repo_status)
+    monkeypatch.setattr(tiered, "accelerated", lambda repo: False)
+    return calls
+
+
+@pytest.fixture
+def costs(tmp_path):
+    return StatusCosts(str(tmp_path / "costs.json"))
+
+
+def test_known_slow_repo_quick_pass_has_deadline(calls, costs):
+    resubmitted = []
+    worker = TieredStatus(costs, deadline=0.5, resubmit=resubmitted.append)
+    costs.record("big", 3.0)
+    status = worker("big")
+    assert status.partial
+    assert calls == [(False, 0.5)]
+    assert resubmitted == ["big"]
+    assert not worker("big").partial  # the resubmitted full pass
+    assert calls[1] == (True, None)
+
+
+def test_quick_pass_past_deadline_goes_to_resubmit(calls, costs):
+    resubmitted = []
+    worker = TieredStatus(costs, deadline=0.5, resubmit=resubmitted.append)
+    costs.record("slow-repo", 3.0)
+    assert worker("slow-repo") is None
+    assert calls == [(False, 0.5)]
+    assert resubmitted == ["slow-repo"]
+    assert worker("slow-repo").partial is False
+
+
+def test_unknown_repo_full_pass_has_deadline(calls, costs):
+    worker = TieredStatus(costs, deadline=0.5)
+    assert worker("fast").partial is False
+    assert calls == [(True, 0.5)]
+    calls.clear()
+    costs.record("fast", 0.1)
+    worker("fast")
+    assert calls == [(True, None)]